@@ -28,6 +28,12 @@ from app.routes.employee_dashboard_routes import employee_dashboard_bp
 
 from app.utils.logger import logger
 from app.config import Config
+from app.models.database import release_connection
+from app.cli import db_cli
+from app import migrations
+from app.utils.db_maintenance import start_maintenance_thread
+from app.utils.punch_flusher import start_punch_flusher
+from app.utils.leave_accrual import start_accrual_thread
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 
@@ -44,6 +50,8 @@ def create_app(testing=False):
         app.config.from_object(Config)
 
     jwt.init_app(app)
+    app.teardown_appcontext(release_connection)
+    app.cli.add_command(db_cli)
     app.register_blueprint(user_bp)
     app.register_blueprint(profile_bp)
     app.register_blueprint(leave_bp)
@@ -57,6 +65,16 @@ def create_app(testing=False):
         # Enable CORS
     CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins — change this to specific origin if needed
 
+    # Bring the schema up to date once per process, before anything queries it.
+    # Deployments that run `flask db upgrade` themselves can set AUTO_MIGRATE=0.
+    if Config.AUTO_MIGRATE:
+        migrations.upgrade()
+
+    if not testing:
+        start_maintenance_thread()
+        start_punch_flusher()
+        start_accrual_thread()
+
     # Insert dummy admin user and profile
     with app.app_context():
         # from app.utils.seed import insert_dummy_admin
@@ -0,0 +1,97 @@
+# app/cli.py
+import click
+from flask.cli import AppGroup
+
+from app import migrations
+from app.utils.db_maintenance import run_maintenance
+from app.models.attendence import Attendence
+from app.utils.punch_flusher import flush_punches
+from app.models.leave import LEAVE_TYPES
+from app.models.leave_accrual import LeaveAccrual
+from app.utils.leave_accrual import run_due_accruals
+
+db_cli = AppGroup('db', help='Database schema commands.')
+
+
+@db_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop after this schema version.')
+def upgrade_command(target):
+    """Apply pending schema migrations."""
+    applied = migrations.upgrade(target=target)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(f'v{v:04d}' for v in applied)}")
+    else:
+        click.echo("Schema is up to date.")
+    click.echo(f"Current schema version: {migrations.current_version()}")
+
+
+@db_cli.command('current')
+def current_command():
+    """Show the current schema version."""
+    click.echo(migrations.current_version())
+
+
+@db_cli.command('history')
+def history_command():
+    """List applied and pending migrations."""
+    applied = {row['version']: row for row in migrations.history()}
+    for version, name, _ in migrations.discover():
+        row = applied.get(version)
+        state = f"applied {row['applied_at']}" if row else "pending"
+        click.echo(f"v{version:04d} {name:<40} {state}")
+
+
+@db_cli.command('maintenance')
+def maintenance_command():
+    """Checkpoint the WAL and run PRAGMA optimize."""
+    result = run_maintenance()
+    click.echo(f"wal_checkpoint: busy={result['busy']} log={result['log_frames']} "
+               f"checkpointed={result['checkpointed']}")
+
+
+@db_cli.command('flush-punches')
+def flush_punches_command():
+    """Write queued punch-in/punch-out events into attendance now."""
+    click.echo(f"Flushed {flush_punches()} punch events.")
+
+
+@db_cli.command('rollup-backfill')
+@click.option('--from', 'start_date', default=None, help='First date to rebuild (YYYY-MM-DD).')
+@click.option('--to', 'end_date', default=None, help='Last date to rebuild (YYYY-MM-DD).')
+def rollup_backfill_command(start_date, end_date):
+    """Rebuild attendance_daily_rollup from attendance (default: all history)."""
+    rows = Attendence().rebuild_daily_rollup(start_date, end_date)
+    click.echo(f"Rebuilt {rows} daily rollup rows.")
+
+
+@db_cli.command('accrue-leave')
+@click.option('--period', default=None, help='Month to accrue (YYYY-MM); default: every month not yet run.')
+def accrue_leave_command(period):
+    """Credit monthly leave accrual (idempotent per month)."""
+    try:
+        summaries = [LeaveAccrual().run(period)] if period else run_due_accruals()
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--period')
+    if not summaries:
+        click.echo("No leave policies configured; nothing to accrue.")
+    for summary in summaries:
+        if summary['status'] == 'skipped':
+            click.echo(f"{summary['period']}: already accrued, skipped.")
+        else:
+            click.echo(f"{summary['period']}: {summary['entries']} ledger entries for "
+                       f"{summary['employees']} employees in {summary['duration_ms']} ms.")
+
+
+@db_cli.command('leave-policy')
+@click.argument('leave_type', type=click.Choice(LEAVE_TYPES))
+@click.option('--monthly', type=float, required=True, help='Days credited each month.')
+@click.option('--max', 'max_balance', type=float, default=None, help='Accrual stops at this balance.')
+@click.option('--carry-over', 'carry_over_cap', type=float, default=None,
+              help='Balance kept into a new year (January runs trim to it).')
+def leave_policy_command(leave_type, monthly, max_balance, carry_over_cap):
+    """Create or replace the accrual policy for a leave type."""
+    accrual = LeaveAccrual()
+    accrual.set_policy(leave_type, monthly, max_balance, carry_over_cap)
+    for policy in accrual.get_policies():
+        click.echo(f"{policy['leave_type']:<10} monthly={policy['monthly_accrual']:g} "
+                   f"max={policy['max_balance']} carry_over={policy['carry_over_cap']}")
@@ -5,3 +5,98 @@ class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     DATABASE = os.path.join(BASE_DIR, '..', 'employees.db')
     SECRET_KEY = os.environ.get('SECRET_KEY', 'default-secret-key')
+
+    # Connections per process for each database file; see app/models/database.py
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+    # Apply pending schema migrations in create_app(); see app/migrations
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '1') == '1'
+
+    # Applied to every new SQLite connection. WAL lets the dashboards keep
+    # reading while punch-in/leave/payroll writers commit; NORMAL sync is
+    # durable across application crashes in WAL mode.
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),  # negative = KiB
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+    }
+
+    # Seconds between background wal_checkpoint/optimize runs (0 disables)
+    DB_MAINTENANCE_INTERVAL = int(os.environ.get('DB_MAINTENANCE_INTERVAL', 3600))
+
+    # Seconds a cached pagination total may be served; writes in this process
+    # invalidate immediately, the TTL covers writes from other workers
+    COUNT_CACHE_TTL = int(os.environ.get('COUNT_CACHE_TTL', 30))
+    # Same for the admin dashboard figures (stats, department counts, growth),
+    # which every open dashboard polls
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 15))
+    # GET /dashboard/stream: seconds between keep-alive comments, and how many
+    # recent events are kept for clients resuming with Last-Event-ID
+    DASHBOARD_STREAM_KEEPALIVE = float(os.environ.get('DASHBOARD_STREAM_KEEPALIVE', 15))
+    DASHBOARD_EVENT_BACKLOG = int(os.environ.get('DASHBOARD_EVENT_BACKLOG', 256))
+
+    # Leave durations: weekend days (Mon=0 ... Sun=6), the leave types counted
+    # in working days (weekends and holidays excluded; others count calendar
+    # days), and how long the holiday calendar is cached
+    LEAVE_WEEKEND_DAYS = tuple(int(d) for d in os.environ.get('LEAVE_WEEKEND_DAYS', '5,6').split(',') if d.strip())
+    LEAVE_WORKING_DAY_TYPES = frozenset(
+        t.strip().lower() for t in os.environ.get('LEAVE_WORKING_DAY_TYPES', '').split(',') if t.strip()
+    )
+    HOLIDAY_CACHE_TTL = int(os.environ.get('HOLIDAY_CACHE_TTL', 300))
+    # Seconds between checks for months still to accrue (0 disables; the job is
+    # idempotent per month, so several workers may run it)
+    LEAVE_ACCRUAL_INTERVAL = int(os.environ.get('LEAVE_ACCRUAL_INTERVAL', 0))
+    # Payroll runs: income tax brackets as "annual_upper:rate,..." (empty upper
+    # bound = top bracket; unset = no tax), a percentage deduction of gross
+    # pay, and "CUR:rate" conversions into PAYROLL_BASE_CURRENCY for totals
+    PAYROLL_TAX_BRACKETS = os.environ.get('PAYROLL_TAX_BRACKETS', '')
+    PAYROLL_DEDUCTION_RATE = float(os.environ.get('PAYROLL_DEDUCTION_RATE', 0))
+    PAYROLL_FX_RATES = os.environ.get('PAYROLL_FX_RATES', '')
+    PAYROLL_BASE_CURRENCY = os.environ.get('PAYROLL_BASE_CURRENCY', 'NZD')
+    # GET /salary/export: rows fetched from the cursor and written per chunk
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+    # Salary PDF export: rendered into a temp file that stays in memory up to
+    # PDF_SPOOL_MAX_BYTES; above PDF_ASYNC_THRESHOLD rows it becomes a
+    # background job (REPORT_JOB_WORKERS threads) whose file is kept in
+    # REPORT_JOB_DIR for REPORT_JOB_TTL seconds
+    PDF_SPOOL_MAX_BYTES = int(os.environ.get('PDF_SPOOL_MAX_BYTES', 8 * 1024 * 1024))
+    PDF_ASYNC_THRESHOLD = int(os.environ.get('PDF_ASYNC_THRESHOLD', 5000))
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS', 2))
+    REPORT_JOB_DIR = os.environ.get('REPORT_JOB_DIR', os.path.join(BASE_DIR, '..', 'reports'))
+    REPORT_JOB_TTL = int(os.environ.get('REPORT_JOB_TTL', 3600))
+    # Rendered payslips are cached on local disk up to PAYSLIP_CACHE_MAX_BYTES
+    # (least recently used evicted first). PAYSLIP_PRERENDER renders a month's
+    # payslips right after its payroll run, on PAYSLIP_PRERENDER_WORKERS
+    # threads (kept small so downloads are not starved).
+    PAYSLIP_CACHE_DIR = os.environ.get('PAYSLIP_CACHE_DIR', os.path.join(BASE_DIR, '..', 'payslip_cache'))
+    PAYSLIP_CACHE_MAX_BYTES = int(os.environ.get('PAYSLIP_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    PAYSLIP_PRERENDER = os.environ.get('PAYSLIP_PRERENDER', '1') == '1'
+    PAYSLIP_PRERENDER_WORKERS = int(os.environ.get('PAYSLIP_PRERENDER_WORKERS', 2))
+    # Filtered counts (name searches) stop counting here and report an estimate
+    COUNT_ESTIMATE_THRESHOLD = int(os.environ.get('COUNT_ESTIMATE_THRESHOLD', 10000))
+
+    # POST /users/bulk: rows written per transaction, and the process pool that
+    # hashes their passwords (0 workers = one per CPU). PASSWORD_HASH_METHOD is
+    # passed to werkzeug's generate_password_hash; unset keeps its default.
+    BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 500))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD')
+
+    # Employee ids each process reserves at a time (see app/models/sequence.py).
+    # 1 keeps EMP numbers dense; larger blocks save a write per new user but
+    # leave gaps when a worker restarts.
+    EMPLOYEE_ID_BLOCK_SIZE = int(os.environ.get('EMPLOYEE_ID_BLOCK_SIZE', 1))
+
+    # Opt-in write-behind for punch-in/punch-out: punches are acknowledged once
+    # they are in the local queue database and a background thread moves them
+    # into attendance every ATTENDANCE_FLUSH_INTERVAL seconds, in batches.
+    ATTENDANCE_WRITE_BEHIND = os.environ.get('ATTENDANCE_WRITE_BEHIND', '0') == '1'
+    ATTENDANCE_QUEUE_DATABASE = os.environ.get(
+        'ATTENDANCE_QUEUE_DATABASE', os.path.join(BASE_DIR, '..', 'attendance_queue.db')
+    )
+    ATTENDANCE_FLUSH_INTERVAL = float(os.environ.get('ATTENDANCE_FLUSH_INTERVAL', 0.5))
+    ATTENDANCE_FLUSH_BATCH = int(os.environ.get('ATTENDANCE_FLUSH_BATCH', 1000))
@@ -0,0 +1,95 @@
+# app/migrations/__init__.py
+"""
+Versioned schema migrations.
+
+Each migration is a module named ``v<NNNN>_<description>.py`` in this package
+with an ``upgrade(conn)`` function. Migrations run in version order, each in
+its own ``BEGIN IMMEDIATE`` transaction, and the applied versions are recorded
+in the ``schema_version`` table. ``upgrade()`` is called once at startup (see
+create_app) or by ``flask db upgrade`` on deploy - never per request.
+
+Migration functions must only use ``conn.execute``: ``executescript`` or an
+explicit commit would end the surrounding transaction early.
+"""
+import importlib
+import pkgutil
+import re
+
+from app.models.database import get_pool
+from app.utils.logger import logger
+
+_MODULE_PATTERN = re.compile(r'^v(\d{4})_(\w+)$')
+
+
+def discover():
+    """Return [(version, name, module)] for every migration, oldest first."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE_PATTERN.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f'{__name__}.{info.name}')
+        migrations.append((int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m[0])
+    return migrations
+
+
+def _ensure_version_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+
+def current_version(conn=None):
+    conn = conn or get_pool().connection()
+    _ensure_version_table(conn)
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def history(conn=None):
+    conn = conn or get_pool().connection()
+    _ensure_version_table(conn)
+    cursor = conn.execute('SELECT version, name, applied_at FROM schema_version ORDER BY version')
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def upgrade(conn=None, target=None):
+    """
+    Apply every pending migration up to `target` (default: latest).
+    Returns the list of versions applied by this call.
+    """
+    conn = conn or get_pool().connection()
+    _ensure_version_table(conn)
+    applied = []
+
+    for version, name, module in discover():
+        if target is not None and version > target:
+            break
+
+        # Several gunicorn workers may start at once: take the write lock
+        # first, then re-check whether another process got here already.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            done = conn.execute(
+                'SELECT 1 FROM schema_version WHERE version = ?', (version,)
+            ).fetchone()
+            if not done:
+                module.upgrade(conn)
+                conn.execute(
+                    'INSERT INTO schema_version (version, name) VALUES (?, ?)',
+                    (version, name)
+                )
+                applied.append(version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Migration v{version:04d}_{name} failed")
+            raise
+
+        if not done:
+            logger.info(f"Applied migration v{version:04d}_{name}")
+
+    return applied
@@ -0,0 +1,40 @@
+"""Secondary indexes for the WHERE / ORDER BY clauses the models run most."""
+
+INDEXES = [
+    # attendance: punch_out, get_by_employee, get_all_employee_records
+    'CREATE INDEX IF NOT EXISTS idx_attendance_employee_date ON attendance (employee_id, date)',
+    # attendance: admin dashboard "today" / "this week" lookups
+    'CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date)',
+    # attendance: manual request counts by approval status
+    'CREATE INDEX IF NOT EXISTS idx_attendance_manual_status ON attendance (is_manual, approval_status)',
+    # attendance: the pending-request queue only ever holds a handful of rows
+    """CREATE INDEX IF NOT EXISTS idx_attendance_pending_requests ON attendance (id)
+       WHERE is_manual = 1 AND approval_status = 'Pending'""",
+
+    # leaves: pending queue ordered by start date, per-employee history
+    'CREATE INDEX IF NOT EXISTS idx_leaves_status ON leaves (status)',
+    """CREATE INDEX IF NOT EXISTS idx_leaves_pending_start ON leaves (start_date)
+       WHERE status IS NULL OR status = 'Pending'""",
+    'CREATE INDEX IF NOT EXISTS idx_leaves_employee_start ON leaves (employee_id, start_date)',
+
+    # payroll_records: per-employee month lookups, month filters, admin listing
+    'CREATE INDEX IF NOT EXISTS idx_payroll_employee_month ON payroll_records (employee_id, salary_month)',
+    'CREATE INDEX IF NOT EXISTS idx_payroll_month ON payroll_records (salary_month)',
+    'CREATE INDEX IF NOT EXISTS idx_payroll_generated_at ON payroll_records (generated_at, id)',
+
+    # course_submissions: review queues and the case-insensitive resubmission check
+    'CREATE INDEX IF NOT EXISTS idx_course_submissions_status_id ON course_submissions (status, id)',
+    '''CREATE INDEX IF NOT EXISTS idx_course_submissions_employee_course
+       ON course_submissions (employee_id, LOWER(course_name))''',
+
+    # users: active headcount per department
+    'CREATE INDEX IF NOT EXISTS idx_users_status_department ON users (status, department)',
+
+    # reset_tokens: token lookup on password reset
+    'CREATE INDEX IF NOT EXISTS idx_reset_tokens_token ON reset_tokens (token)',
+]
+
+
+def upgrade(conn):
+    for statement in INDEXES:
+        conn.execute(statement)
@@ -0,0 +1,5 @@
+"""Index the remaining keyset pagination sort key (profiles are listed by name)."""
+
+
+def upgrade(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_name ON users (name)')
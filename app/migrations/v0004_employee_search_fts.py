@@ -0,0 +1,76 @@
+"""
+FTS5 index over users plus the free-text parts of their profile.
+
+employee_search keeps one row per user (rowid = users.id). Triggers on users
+and employee_profiles keep it in sync, so the search paths never fall back to
+LIKE '%x%' scans.
+"""
+
+# Text leaves of the profile JSON columns that are worth searching on
+# (job title, qualifications, nickname, ...). Salary and contact details stay out.
+PROFILE_TEXT = """(
+    SELECT group_concat(j.value, ' ')
+    FROM employee_profiles ep,
+         json_tree(json_array(
+             CASE WHEN json_valid(ep.personal_details) THEN json(ep.personal_details) END,
+             CASE WHEN json_valid(ep.job_details) THEN json(ep.job_details) END,
+             CASE WHEN json_valid(ep.qualifications) THEN json(ep.qualifications) END
+         )) j
+    WHERE ep.user_id = {user_id} AND j.type = 'text'
+)"""
+
+TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_employee_search_user_insert
+        AFTER INSERT ON users BEGIN
+            INSERT INTO employee_search (rowid, employee_id, name, email, department, profile)
+            VALUES (new.id, new.employee_id, new.name, new.email, new.department,
+                    {PROFILE_TEXT.format(user_id='new.employee_id')});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_employee_search_user_update
+        AFTER UPDATE OF employee_id, name, email, department ON users BEGIN
+            DELETE FROM employee_search WHERE rowid = old.id;
+            INSERT INTO employee_search (rowid, employee_id, name, email, department, profile)
+            VALUES (new.id, new.employee_id, new.name, new.email, new.department,
+                    {PROFILE_TEXT.format(user_id='new.employee_id')});
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_employee_search_user_delete
+        AFTER DELETE ON users BEGIN
+            DELETE FROM employee_search WHERE rowid = old.id;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_employee_search_profile_insert
+        AFTER INSERT ON employee_profiles BEGIN
+            UPDATE employee_search SET profile = {PROFILE_TEXT.format(user_id='new.user_id')}
+            WHERE rowid = (SELECT id FROM users WHERE employee_id = new.user_id);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_employee_search_profile_update
+        AFTER UPDATE ON employee_profiles BEGIN
+            UPDATE employee_search SET profile = {PROFILE_TEXT.format(user_id='new.user_id')}
+            WHERE rowid = (SELECT id FROM users WHERE employee_id = new.user_id);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_employee_search_profile_delete
+        AFTER DELETE ON employee_profiles BEGIN
+            UPDATE employee_search SET profile = NULL
+            WHERE rowid = (SELECT id FROM users WHERE employee_id = old.user_id);
+        END""",
+]
+
+
+def upgrade(conn):
+    # prefix='2 3' keeps short type-ahead prefixes off the slow full-term scan
+    conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS employee_search USING fts5(
+        employee_id, name, email, department, profile,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""")
+    # Default ranking: a name hit outweighs an email or id hit, which outweighs
+    # department and profile text. Column order matches the table above.
+    conn.execute("""INSERT INTO employee_search (employee_search, rank)
+                    VALUES ('rank', 'bm25(5.0, 10.0, 5.0, 1.0, 1.0)')""")
+
+    conn.execute(f"""INSERT INTO employee_search (rowid, employee_id, name, email, department, profile)
+        SELECT u.id, u.employee_id, u.name, u.email, u.department,
+               {PROFILE_TEXT.format(user_id='u.employee_id')}
+        FROM users u""")
+
+    for trigger in TRIGGERS:
+        conn.execute(trigger)
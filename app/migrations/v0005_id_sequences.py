@@ -0,0 +1,21 @@
+"""
+Named counters for human-facing ids (EMP0001, ...), replacing SELECT MAX(id).
+
+The employee_id counter starts after the highest existing EMP number (or
+users.id, which the old generator derived the number from).
+"""
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS id_sequences (
+        name TEXT PRIMARY KEY,
+        next_value INTEGER NOT NULL
+    )''')
+    conn.execute('''
+        INSERT OR IGNORE INTO id_sequences (name, next_value)
+        SELECT 'employee_id', MAX(
+            COALESCE((SELECT MAX(CAST(SUBSTR(employee_id, 4) AS INTEGER))
+                      FROM users WHERE employee_id LIKE 'EMP%'), 0),
+            COALESCE((SELECT MAX(id) FROM users), 0)
+        ) + 1
+    ''')
@@ -0,0 +1,102 @@
+"""
+Per-day, per-department attendance counts for the admin dashboard.
+
+attendance_daily_rollup is maintained by triggers, so dashboard reads cost
+O(days) instead of O(punches). Rows are attributed to the employee's current
+department: a department change moves that employee's counts, matching the
+old queries that joined users at read time.
+"""
+
+# Counter column -> how much one attendance row `{row}` contributes to it
+COUNTERS = {
+    'total': '1',
+    'present': "CASE WHEN {row}.approval_status = 'Approved' AND {row}.status NOT IN ('Leave', 'Absent') THEN 1 ELSE 0 END",
+    'late': "CASE WHEN {row}.status = 'Late' THEN 1 ELSE 0 END",
+    'on_leave': "CASE WHEN {row}.status = 'Leave' THEN 1 ELSE 0 END",
+    'pending': "CASE WHEN {row}.approval_status = 'Pending' THEN 1 ELSE 0 END",
+    'approved': "CASE WHEN {row}.approval_status = 'Approved' THEN 1 ELSE 0 END",
+    'rejected': "CASE WHEN {row}.approval_status = 'Rejected' THEN 1 ELSE 0 END",
+    'manual_pending': "CASE WHEN {row}.is_manual = 1 AND {row}.approval_status = 'Pending' THEN 1 ELSE 0 END",
+    'manual_approved': "CASE WHEN {row}.is_manual = 1 AND {row}.approval_status = 'Approved' THEN 1 ELSE 0 END",
+}
+
+COLUMNS = ', '.join(COUNTERS)
+ON_CONFLICT = 'ON CONFLICT (date, department) DO UPDATE SET ' + ', '.join(
+    f'{column} = {column} + excluded.{column}' for column in COUNTERS
+)
+
+
+def counter_sums(row):
+    """SUM() of every counter over the attendance rows aliased `row`, in COLUMNS order."""
+    return ', '.join(f'SUM({expr.format(row=row)})' for expr in COUNTERS.values())
+
+
+def _department_of(employee_id):
+    return f"COALESCE((SELECT department FROM users WHERE employee_id = {employee_id}), '')"
+
+
+def _apply_row(row, sign):
+    """Add (sign '+') or remove (sign '-') one attendance row's contribution."""
+    values = ', '.join(f'{sign}({expr.format(row=row)})' for expr in COUNTERS.values())
+    return f"""INSERT INTO attendance_daily_rollup (date, department, {COLUMNS})
+               VALUES ({row}.date, {_department_of(f'{row}.employee_id')}, {values})
+               {ON_CONFLICT};"""
+
+
+def _apply_employee(employee_id, department, sign):
+    """Add or remove every attendance row of one employee, per day."""
+    sums = ', '.join(f'{sign}SUM({expr.format(row="a")})' for expr in COUNTERS.values())
+    return f"""INSERT INTO attendance_daily_rollup (date, department, {COLUMNS})
+               SELECT a.date, COALESCE({department}, ''), {sums}
+               FROM attendance a WHERE a.employee_id = {employee_id}
+               GROUP BY a.date
+               {ON_CONFLICT};"""
+
+
+TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_attendance_rollup_insert
+        AFTER INSERT ON attendance BEGIN
+            {_apply_row('new', '+')}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_attendance_rollup_update
+        AFTER UPDATE OF date, status, approval_status, is_manual, employee_id ON attendance BEGIN
+            {_apply_row('old', '-')}
+            {_apply_row('new', '+')}
+        END""",
+    # When the user is being deleted, trg_users_rollup_delete already removed
+    # their rows before the cascade got here
+    f"""CREATE TRIGGER IF NOT EXISTS trg_attendance_rollup_delete
+        AFTER DELETE ON attendance
+        WHEN EXISTS (SELECT 1 FROM users WHERE employee_id = old.employee_id) BEGIN
+            {_apply_row('old', '-')}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_users_rollup_department
+        AFTER UPDATE OF department ON users
+        WHEN old.department IS NOT new.department BEGIN
+            {_apply_employee('old.employee_id', 'old.department', '-')}
+            {_apply_employee('new.employee_id', 'new.department', '+')}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_users_rollup_delete
+        BEFORE DELETE ON users BEGIN
+            {_apply_employee('old.employee_id', 'old.department', '-')}
+        END""",
+]
+
+
+def upgrade(conn):
+    counters = ',\n        '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in COUNTERS)
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS attendance_daily_rollup (
+        date TEXT NOT NULL,
+        department TEXT NOT NULL,
+        {counters},
+        PRIMARY KEY (date, department)
+    ) WITHOUT ROWID''')
+
+    # Backfill existing history; `flask db rollup-backfill` redoes this later
+    conn.execute(f'''INSERT INTO attendance_daily_rollup (date, department, {COLUMNS})
+        SELECT a.date, COALESCE(u.department, ''), {counter_sums('a')}
+        FROM attendance a LEFT JOIN users u ON u.employee_id = a.employee_id
+        GROUP BY a.date, COALESCE(u.department, '')''')
+
+    for trigger in TRIGGERS:
+        conn.execute(trigger)
@@ -0,0 +1,9 @@
+"""Index employees by creation date for the employee growth chart."""
+
+
+def upgrade(conn):
+    # Leading with status gives the planner an equality plus a range to match,
+    # so it prefers this over idx_users_status_department even without
+    # ANALYZE statistics; partial on role to match the growth query's filter
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_users_status_created_at ON users (status, created_at)
+                    WHERE role != 'Admin\'''')
@@ -0,0 +1,18 @@
+"""
+Public holidays for working-day leave counting, and the leave duration
+stored on each request so approval does not recount it.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS holidays (
+        date TEXT PRIMARY KEY,
+        name TEXT NOT NULL
+    ) WITHOUT ROWID''')
+
+    conn.execute('ALTER TABLE leaves ADD COLUMN days REAL')
+    conn.execute('ALTER TABLE leaves ADD COLUMN start_half INTEGER NOT NULL DEFAULT 0')
+    conn.execute('ALTER TABLE leaves ADD COLUMN end_half INTEGER NOT NULL DEFAULT 0')
+    # Existing requests were counted in calendar days
+    conn.execute('''UPDATE leaves
+        SET days = MAX(julianday(end_date) - julianday(start_date) + 1, 0)''')
@@ -0,0 +1,56 @@
+"""
+Append-only leave balance ledger.
+
+Every change to a leave_balances column is recorded in leave_ledger with
+the resulting balance, so leave_balances is a cached running total of the
+ledger and each employee has a full balance history. New balance rows get
+their opening entries from a trigger; updates and deletes of ledger rows are
+refused (except the cascade when the employee is deleted).
+"""
+
+LEAVE_TYPES = ('annual', 'casual', 'sick', 'maternity')
+
+
+def _opening_entries(source):
+    return ' UNION ALL '.join(
+        f"SELECT employee_id, '{leave_type}', {leave_type}, {leave_type}, 'opening' FROM {source}"
+        for leave_type in LEAVE_TYPES
+    )
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS leave_ledger (
+        id INTEGER PRIMARY KEY,
+        employee_id TEXT NOT NULL,
+        leave_type TEXT NOT NULL,
+        delta REAL NOT NULL,
+        balance REAL NOT NULL,
+        entry_type TEXT NOT NULL,
+        leave_id INTEGER,
+        created_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(employee_id) REFERENCES users(employee_id) ON DELETE CASCADE
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_leave_ledger_employee ON leave_ledger (employee_id, id)')
+
+    conn.execute(f'''INSERT INTO leave_ledger (employee_id, leave_type, delta, balance, entry_type)
+        {_opening_entries('leave_balances')}''')
+
+    opening = ';\n'.join(
+        f"""INSERT INTO leave_ledger (employee_id, leave_type, delta, balance, entry_type)
+            VALUES (new.employee_id, '{leave_type}', new.{leave_type}, new.{leave_type}, 'opening')"""
+        for leave_type in LEAVE_TYPES
+    )
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_leave_balances_opening
+        AFTER INSERT ON leave_balances BEGIN
+            {opening};
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_leave_ledger_no_update
+        BEFORE UPDATE ON leave_ledger BEGIN
+            SELECT RAISE(ABORT, 'leave_ledger is append-only');
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_leave_ledger_no_delete
+        BEFORE DELETE ON leave_ledger
+        WHEN EXISTS (SELECT 1 FROM users WHERE employee_id = old.employee_id) BEGIN
+            SELECT RAISE(ABORT, 'leave_ledger is append-only');
+        END''')
@@ -0,0 +1,38 @@
+"""
+R*Tree index over leave date ranges.
+
+leave_intervals holds one box per leave: its day span (julian day numbers)
+by the employee's users.id, kept in sync with leaves by triggers. Overlap
+checks for one employee and "who is off between X and Y" calendar queries
+then visit only the intersecting leaves instead of scanning the history.
+"""
+
+DAY = "CAST(julianday({}) AS INTEGER)"
+USER = "(SELECT id FROM users WHERE employee_id = {})"
+
+
+def _box(row):
+    user = USER.format(f'{row}.employee_id')
+    return f"{row}.id, {DAY.format(f'{row}.start_date')}, {DAY.format(f'{row}.end_date')}, {user}, {user}"
+
+
+def upgrade(conn):
+    conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS leave_intervals USING rtree_i32(
+        id, start_day, end_day, user_lo, user_hi
+    )''')
+    conn.execute(f'''INSERT INTO leave_intervals (id, start_day, end_day, user_lo, user_hi)
+        SELECT {_box('leaves')} FROM leaves''')
+
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_leave_intervals_insert
+        AFTER INSERT ON leaves BEGIN
+            INSERT INTO leave_intervals (id, start_day, end_day, user_lo, user_hi) VALUES ({_box('new')});
+        END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_leave_intervals_update
+        AFTER UPDATE OF start_date, end_date, employee_id ON leaves BEGIN
+            DELETE FROM leave_intervals WHERE id = old.id;
+            INSERT INTO leave_intervals (id, start_day, end_day, user_lo, user_hi) VALUES ({_box('new')});
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_leave_intervals_delete
+        AFTER DELETE ON leaves BEGIN
+            DELETE FROM leave_intervals WHERE id = old.id;
+        END''')
@@ -0,0 +1,28 @@
+"""
+Leave accrual policies and the record of accrual runs.
+
+leave_policies holds, per leave type, the days credited each month, the
+balance accrual stops at, and how much carries over into a new year.
+leave_accrual_runs has one row per processed month; the job inserts it in
+the same transaction as the credits, so a period is applied exactly once.
+"""
+
+LEAVE_TYPES = ('annual', 'casual', 'sick', 'maternity')
+
+
+def upgrade(conn):
+    types = ', '.join(f"'{leave_type}'" for leave_type in LEAVE_TYPES)
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS leave_policies (
+        leave_type TEXT PRIMARY KEY CHECK (leave_type IN ({types})),
+        monthly_accrual REAL NOT NULL DEFAULT 0,
+        max_balance REAL,
+        carry_over_cap REAL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS leave_accrual_runs (
+        period TEXT PRIMARY KEY,
+        employees INTEGER NOT NULL,
+        entries INTEGER NOT NULL,
+        duration_ms REAL,
+        run_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
@@ -0,0 +1,20 @@
+"""
+Record of company-wide payroll runs.
+
+payroll_runs has one row per salary month processed by POST /salary/run. The
+run inserts it in the same transaction as the payroll_records rows, so a
+month is paid out exactly once however often the run is retried.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS payroll_runs (
+        salary_month TEXT PRIMARY KEY,
+        employees INTEGER NOT NULL,
+        inserted INTEGER NOT NULL,
+        existing INTEGER NOT NULL,
+        missing INTEGER NOT NULL,
+        duration_ms REAL,
+        run_by TEXT,
+        run_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
@@ -0,0 +1,24 @@
+"""
+Background report jobs.
+
+report_jobs tracks exports too large to render inside a request (see
+POST /salary/export-pdf/jobs): the worker that accepts a job renders it to a
+file and records the path, so any worker on the host can serve the result.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS report_jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending'
+            CHECK (status IN ('pending', 'running', 'done', 'failed')),
+        rows INTEGER,
+        path TEXT,
+        error TEXT,
+        requested_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    ) WITHOUT ROWID''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_report_jobs_created_at ON report_jobs (created_at)')
@@ -1,4 +1,6 @@
+from app.migrations.v0006_attendance_daily_rollup import COUNTERS
 from app.models.database import Database
+from datetime import date
 from typing import List, Dict
 
 class AdminDashboard(Database):
@@ -7,36 +9,48 @@ class AdminDashboard(Database):
 
     # Returns active users
     def get_total_active_employees(self):
-        cur = self.conn.execute('SELECT COUNT(*) as total FROM users WHERE status = "Active"')
+        cur = self.conn.execute("SELECT COUNT(*) as total FROM users WHERE status = 'Active'")
         return cur.fetchone()['total']
 
+    def get_dashboard_stats(self) -> Dict[str, int]:
+        """
+        All dashboard stat cards in one round trip: active employees from
+        users, the attendance figures from attendance_daily_rollup.
+        """
+        cur = self.conn.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM users WHERE status = 'Active') as total_employees,
+                COALESCE(SUM(manual_pending), 0) as pending_requests,
+                COALESCE(SUM(manual_approved), 0) as approved_requests,
+                COALESCE(SUM(CASE WHEN date = ? THEN on_leave ELSE 0 END), 0) as employees_on_leave
+            FROM attendance_daily_rollup
+        ''', (date.today().isoformat(),))
+        return dict(cur.fetchone())
+
+    # Attendance figures come from attendance_daily_rollup (kept current by
+    # triggers), so they cost one row per day/department, not one per punch.
+
     def get_pending_attendance_requests(self):
-        cur = self.conn.execute('SELECT COUNT(*) as total FROM attendance WHERE is_manual = 1 AND approval_status = "Pending"')
+        cur = self.conn.execute("SELECT COALESCE(SUM(manual_pending), 0) as total FROM attendance_daily_rollup")
         return cur.fetchone()['total']
 
     def get_approved_attendance_requests(self):
-        cur = self.conn.execute('SELECT COUNT(*) as total FROM attendance WHERE is_manual = 1 AND approval_status = "Approved"')
+        cur = self.conn.execute("SELECT COALESCE(SUM(manual_approved), 0) as total FROM attendance_daily_rollup")
         return cur.fetchone()['total']
     
     def get_employees_on_leave_today(self):
         cur = self.conn.execute('''
-            SELECT COUNT(*) as total FROM attendance 
-            WHERE date = DATE('now')
-        ''')
+            SELECT COALESCE(SUM(on_leave), 0) as total FROM attendance_daily_rollup
+            WHERE date = ?
+        ''', (date.today().isoformat(),))
         return cur.fetchone()['total']
     
     def get_employees_present_today(self):
         """Get count of employees who are present today (not on leave)"""
         cur = self.conn.execute('''
-            SELECT COUNT(*) as present 
-            FROM employees e
-            WHERE NOT EXISTS (
-                SELECT 1 FROM attendance 
-                WHERE employee_id = e.id 
-                AND status = 'Leave' 
-                AND date = DATE('now')
-            )
-        ''')
+            SELECT COALESCE(SUM(present), 0) as present FROM attendance_daily_rollup
+            WHERE date = ?
+        ''', (date.today().isoformat(),))
         return cur.fetchone()['present']
     
     def get_weekly_attendance_for_chart(self, department: str = None) -> List[Dict[str, any]]:
@@ -45,84 +59,50 @@ class AdminDashboard(Database):
         Args:
             department: Optional department filter
         Returns:
-            List of dictionaries with:
+            Seven dictionaries (the last 7 days, Mon-Sun order) with:
             - name: Day name (Mon-Sun)
             - present: Count of present employees
             - absent: Count of absent/leave employees
+            - attendance_rate: present as a percentage of all records
+            - date: The day (YYYY-MM-DD)
         """
-        # Base query - gets last 7 days including today
-        query = """
-            SELECT 
-                strftime('%w', a.date) as day_num,
-                strftime('%Y-%m-%d', a.date) as date,
-                COUNT(CASE WHEN a.status = 'Present' THEN 1 END) as present,
-                COUNT(CASE WHEN a.status IN ('Absent', 'Leave') THEN 1 END) as absent
-            FROM attendance a
-            JOIN users u ON a.employee_id = u.employee_id
-            WHERE a.date >= date('now', '-6 days')
-            AND a.date <= date('now')
-            AND u.status = 'Active'
+        today = date.today().isoformat()
+        # The rollup has no employee status, so the week is counted from
+        # attendance (seven days off idx_attendance_date), for active users
+        # only, with the rollup's definition of present. The recursive CTE
+        # yields all 7 days, so days without records come back as zeros.
+        present = COUNTERS['present'].format(row='a')
+        department_filter = " AND u.department = ?" if department else ""
+        query = f"""
+            WITH RECURSIVE days(day) AS (
+                SELECT date(?, '-6 days')
+                UNION ALL
+                SELECT date(day, '+1 day') FROM days WHERE day < ?
+            ),
+            week AS (
+                SELECT a.date, COUNT(*) AS total, SUM({present}) AS present
+                FROM attendance a
+                JOIN users u ON u.employee_id = a.employee_id
+                WHERE a.date BETWEEN date(?, '-6 days') AND ?
+                AND u.status = 'Active'{department_filter}
+                GROUP BY a.date
+            )
+            SELECT
+                substr('SunMonTueWedThuFriSat', 1 + 3 * strftime('%w', d.day), 3) as name,
+                COALESCE(w.present, 0) as present,
+                COALESCE(w.total - w.present, 0) as absent,
+                COALESCE(ROUND(100.0 * w.present / NULLIF(w.total, 0), 2), 0.0) as attendance_rate,
+                d.day as date
+            FROM days d
+            LEFT JOIN week w ON w.date = d.day
+            ORDER BY (strftime('%w', d.day) + 6) % 7
         """
-        
-        params = []
+        params = [today, today, today, today]
         if department:
-            query += " AND u.department = ?"
             params.append(department)
-        
-        query += " GROUP BY a.date ORDER BY a.date"
-        
+
         cur = self.conn.execute(query, params)
-        db_results = [dict(row) for row in cur.fetchall()]
-        
-        # Day mapping (SQLite %w returns 0=Sunday to 6=Saturday)
-        day_map = {
-            '0': {'name': 'Sun', 'order': 6},
-            '1': {'name': 'Mon', 'order': 0},
-            '2': {'name': 'Tue', 'order': 1},
-            '3': {'name': 'Wed', 'order': 2},
-            '4': {'name': 'Thu', 'order': 3},
-            '5': {'name': 'Fri', 'order': 4},
-            '6': {'name': 'Sat', 'order': 5}
-        }
-        
-        # Process results
-        chart_data = []
-        for result in db_results:
-            day_info = day_map[result['day_num']]
-            chart_data.append({
-                'name': day_info['name'],
-                'present': result['present'],
-                'absent': result['absent'],
-                'date': result['date'],
-                '_order': day_info['order']  # For sorting
-            })
-        
-        # Ensure all 7 days are present (fill missing days with zeros)
-        full_week = []
-        for day_num in ['1', '2', '3', '4', '5', '6', '0']:  # Mon-Sun order
-            day_info = day_map[day_num]
-            existing_day = next((d for d in chart_data if d['name'] == day_info['name']), None)
-            
-            if existing_day:
-                full_week.append(existing_day)
-            else:
-                # Create empty day record
-                full_week.append({
-                    'name': day_info['name'],
-                    'present': 0,
-                    'absent': 0,
-                    'date': '',  # No date for missing days
-                    '_order': day_info['order']
-                })
-        
-        # Sort by weekday order (Mon-Sun)
-        full_week.sort(key=lambda x: x['_order'])
-        
-        # Remove temporary sorting key
-        for day in full_week:
-            day.pop('_order', None)
-        
-        return full_week
+        return [dict(row) for row in cur.fetchall()]
     
     def get_monthly_employee_counts(self) -> Dict[str, int]:
         """
@@ -142,23 +122,39 @@ class AdminDashboard(Database):
         cur = self.conn.execute(query)
         return {row['month']: row['count'] for row in cur.fetchall()}
     
-    def get_employee_growth_data(self) -> List[Dict[str, any]]:
+    def get_employee_growth_data(self, limit: int = 12) -> List[Dict[str, any]]:
         """
-        Get raw employee growth data sorted by creation date
+        Get cumulative active employee counts for the last `limit` months
         Returns:
-            List of dictionaries with:
-            - date: Employee creation date (YYYY-MM-DD)
-            - employee_id: Unique employee identifier
+            `limit` dictionaries, oldest first, with:
+            - month: Month name (e.g., 'Jan')
+            - employees: Active non-admin employees created up to that month
         """
-        cur = self.conn.execute('''
-            SELECT 
-                strftime('%Y-%m-%d', created_at) as date,
-                employee_id
-            FROM users 
-            WHERE role != 'Admin' 
-            AND status = 'Active'
-            ORDER BY created_at ASC
-        ''')
+        # One index range count per month over idx_users_status_created_at;
+        # the oldest bucket has no lower bound, so the running total includes
+        # everyone hired before the window. The current month is the local one
+        # (date('now') in SQLite is UTC)
+        cur = self.conn.execute("""
+            WITH RECURSIVE months(month, n) AS (
+                SELECT date(?, 'start of month'), 1
+                UNION ALL
+                SELECT date(month, '-1 month'), n + 1 FROM months WHERE n < ?
+            ),
+            buckets AS (
+                SELECT month, date(month, '+1 month') as next_month,
+                       CASE WHEN n = ? THEN '' ELSE month END as lower_bound
+                FROM months
+            )
+            SELECT
+                substr('JanFebMarAprMayJunJulAugSepOctNovDec', 3 * strftime('%m', b.month) - 2, 3) as month,
+                SUM((
+                    SELECT COUNT(*) FROM users
+                    WHERE role != 'Admin' AND status = 'Active'
+                    AND created_at >= b.lower_bound AND created_at < b.next_month
+                )) OVER (ORDER BY b.month) as employees
+            FROM buckets b
+            ORDER BY b.month
+        """, (date.today().isoformat(), limit, limit))
         return [dict(row) for row in cur.fetchall()]
     
     def get_employee_counts_by_department(self) -> Dict[str, int]:
@@ -175,21 +171,3 @@ class AdminDashboard(Database):
             GROUP BY department
         ''')
         return {row['department']: row['count'] for row in cur.fetchall()}
-    
-    def get_present_employees_this_week(self):
-        try:
-            cur = self.conn.execute('''
-                SELECT *
-                FROM attendance
-                WHERE date >= date('now', '-6 days')
-            ''')
-            rows = [dict(row) for row in cur.fetchall()]
-            for row in rows:
-                print(row)
-            return rows
-        except Exception as e:
-            print(f"Error fetching attendance debug data: {str(e)}")
-            return []
-        
-
-        
\ No newline at end of file
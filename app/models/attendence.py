@@ -1,4 +1,6 @@
+from app.migrations.v0006_attendance_daily_rollup import COLUMNS as ROLLUP_COLUMNS, counter_sums
 from app.models.database import Database
+from app.utils.search import match_expression
 from datetime import datetime
 
 class Attendence(Database):
@@ -13,6 +15,7 @@ class Attendence(Database):
                 INSERT INTO attendance (employee_id, punch_in, date)
                 VALUES (?, ?, ?)
             ''', (employee_id, now, date_str))
+        self.invalidate('attendance')
 
     def punch_out(self, employee_id):
         date_str = datetime.now().strftime('%Y-%m-%d')
@@ -22,6 +25,57 @@ class Attendence(Database):
                 UPDATE attendance SET punch_out = ?
                 WHERE employee_id = ? AND date = ?
             ''', (now, employee_id, date_str))
+        self.invalidate('attendance')
+
+    def apply_punches(self, events):
+        """
+        Write queued punch events (see PunchQueue) in one transaction, in
+        arrival order. Replays are harmless: a punch-in that is already
+        recorded is skipped, and a punch-out just sets the same time again.
+        """
+        with self.transaction() as conn:
+            for event in events:
+                if event['kind'] == 'in':
+                    conn.execute('''
+                        INSERT INTO attendance (employee_id, punch_in, date)
+                        SELECT ?, ?, ?
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM attendance
+                            WHERE employee_id = ? AND date = ? AND punch_in = ?
+                        )
+                    ''', (event['employee_id'], event['at'], event['date'],
+                          event['employee_id'], event['date'], event['at']))
+                else:
+                    conn.execute('''
+                        UPDATE attendance SET punch_out = ?
+                        WHERE employee_id = ? AND date = ?
+                    ''', (event['at'], event['employee_id'], event['date']))
+        self.invalidate('attendance')
+
+    def rebuild_daily_rollup(self, start_date=None, end_date=None):
+        """
+        Recompute attendance_daily_rollup from attendance for a date range
+        (default: all history) in one transaction. The triggers from migration
+        0006 keep it current afterwards; this is for backfills and repairs.
+        Returns the number of (date, department) rows written.
+        """
+        start_date = start_date or '0000-00-00'
+        end_date = end_date or '9999-99-99'
+        with self.transaction() as conn:
+            conn.execute(
+                'DELETE FROM attendance_daily_rollup WHERE date BETWEEN ? AND ?',
+                (start_date, end_date)
+            )
+            # Same counters as the rollup triggers
+            cursor = conn.execute(f'''
+                INSERT INTO attendance_daily_rollup (date, department, {ROLLUP_COLUMNS})
+                SELECT a.date, COALESCE(u.department, ''), {counter_sums('a')}
+                FROM attendance a LEFT JOIN users u ON u.employee_id = a.employee_id
+                WHERE a.date BETWEEN ? AND ?
+                GROUP BY a.date, COALESCE(u.department, '')
+            ''', (start_date, end_date))
+        self.invalidate('attendance')
+        return cursor.rowcount
 
     def manual_request(self, employee_id, data):
         with self.conn:
@@ -39,6 +93,7 @@ class Attendence(Database):
                 data.get('approval_status', 'Pending'),
                 data.get('reason', None)
             ))
+        self.invalidate('attendance')
 
     def approve_manual(self, record_id, approver_id):
         attendance_records = self.get_employee_id_for_record(record_id)
@@ -52,6 +107,7 @@ class Attendence(Database):
                     UPDATE attendance SET approval_status = 'Approved'
                     WHERE id = ?
                 ''', (record_id,))
+            self.invalidate('attendance')
             return {"message": "Attendance request approved"}, 200
 
     # def get_by_employee(self, employee_id):
@@ -73,9 +129,10 @@ class Attendence(Database):
         return [dict(row) for row in cur.fetchall()]
     
     def get_pending_count(self):
-        cur = self.conn.execute('''SELECT COUNT(*) as total FROM attendance WHERE is_manual = 1 AND approval_status = 'Pending' ''')
-        row = cur.fetchone()
-        return row['total'] if row else 0
+        return self.cached_count(
+            'attendance_pending', ('attendance',),
+            '''SELECT COUNT(*) as total FROM attendance WHERE is_manual = 1 AND approval_status = 'Pending' '''
+        )
     
     def get_by_employee(self, employee_id, start_date=None, end_date=None, sort_by="punch_in", order="asc"):
         query = "SELECT * FROM attendance WHERE employee_id = ?"
@@ -115,31 +172,46 @@ class Attendence(Database):
             """
             self.conn.execute(query, (reason, record_id))
             self.conn.commit()
+            self.invalidate('attendance')
             return {"message": "Attendance request rejected"}, 200
 
     def getAttendenceNameAndPeriod(self, name, start_date, end_date):
+        match = match_expression(name, column='name')
+        if match is None:
+            return []
         query = """
             SELECT a.*, u.name 
-            FROM 
-            attendance a JOIN users u 
-            ON 
-            a.employee_id = u.employee_id
-            WHERE u.name LIKE ? AND a.date BETWEEN ? AND ?
+            FROM employee_search s
+            JOIN users u ON u.id = s.rowid
+            JOIN attendance a ON a.employee_id = u.employee_id
+            WHERE employee_search MATCH ? AND a.date BETWEEN ? AND ?
         """
-        params = [f"%{name}%", start_date, end_date]
+        params = [match, start_date, end_date]
         cursor = self.conn.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
     
-    def get_all_employee_records(self, employee_id, page=1, per_page=10):
-        cursor = self.conn.execute(
-            '''
-            SELECT * FROM attendance 
-            WHERE employee_id = ? 
-            ORDER BY date DESC 
-            LIMIT ? OFFSET ?
-            ''',
-            (employee_id, per_page, (page - 1) * per_page)
-        )
+    def get_all_employee_records(self, employee_id, page=1, per_page=10, after=None):
+        if after is not None:
+            # keyset cursor: (date, id) of the last row already returned
+            cursor = self.conn.execute(
+                '''
+                SELECT * FROM attendance
+                WHERE employee_id = ? AND (date, id) < (?, ?)
+                ORDER BY date DESC, id DESC
+                LIMIT ?
+                ''',
+                (employee_id, after[0], after[1], per_page)
+            )
+        else:
+            cursor = self.conn.execute(
+                '''
+                SELECT * FROM attendance 
+                WHERE employee_id = ? 
+                ORDER BY date DESC, id DESC
+                LIMIT ? OFFSET ?
+                ''',
+                (employee_id, per_page, (page - 1) * per_page)
+            )
         records = [dict(row) for row in cursor.fetchall()]
         return records
 
@@ -154,16 +226,14 @@ class Attendence(Database):
         
     def get_all_employee_records_of_employee(self, employee_id):
         # Get the total count for pagination
-        total_cursor = self.conn.execute(
+        return self.cached_count(
+            'attendance_by_employee', ('attendance',),
             '''
             SELECT COUNT(*) as total FROM attendance 
             WHERE employee_id = ?
             ''',
             (employee_id,)
         )
-        total = total_cursor.fetchone()["total"]
-
-        return total
 
 
 
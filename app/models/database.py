@@ -1,158 +1,236 @@
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from app.config import Config
+from app.utils.cache import count_cache, invalidate_tables
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection frees up within the pool timeout."""
+
+
+def apply_pragmas(conn, pragmas):
+    """Apply a PRAGMA profile such as Config.SQLITE_PRAGMAS to `conn`."""
+    # busy_timeout goes first so that switching journal_mode waits out
+    # other workers' locks instead of failing straight away.
+    for name, value in sorted(pragmas.items(), key=lambda item: item[0] != 'busy_timeout'):
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of SQLite connections for one database file.
+
+    Each thread checks a connection out on first use and keeps it until
+    release() is called (the Flask app releases at the end of every request),
+    so the module-level model instances can be shared between threads without
+    sharing a connection. ':memory:' databases only exist per connection, so
+    they are served from a single shared connection instead.
+    """
+
+    def __init__(self, database, size=5, timeout=30.0, pragmas=None):
+        self.database = database
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._idle = []
+        self._owners = {}  # thread ident -> (thread, connection)
+        self._open = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._reclaimed = 0
+        self._shared = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        apply_pragmas(conn, self.pragmas)
+        return conn
+
+    def connection(self):
+        """Return the connection checked out by the calling thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        if self.database == ':memory:':
+            with self._cond:
+                if self._shared is None:
+                    self._shared = self._connect()
+                    self._open = 1
+                self._checkouts += 1
+                conn = self._shared
+        else:
+            conn = self._checkout()
+
+        self._local.conn = conn
+        return conn
+
+    def _checkout(self):
+        thread = threading.current_thread()
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    conn = self._connect()
+                    self._open += 1
+                    break
+                if self._reclaim_dead_owners():
+                    continue
+
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.size})"
+                    )
+                self._cond.wait(remaining)
+
+            self._owners[thread.ident] = (thread, conn)
+            self._checkouts += 1
+            return conn
+
+    def _reclaim_dead_owners(self):
+        # Threads that exit without releasing (e.g. outside a request) would
+        # otherwise hold their connection forever.
+        dead = [ident for ident, (thread, _) in self._owners.items() if not thread.is_alive()]
+        for ident in dead:
+            _, conn = self._owners.pop(ident)
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append(conn)
+            self._reclaimed += 1
+        return bool(dead)
+
+    def holds_connection(self):
+        """Whether the calling thread has a connection checked out."""
+        return getattr(self._local, 'conn', None) is not None
+
+    def release(self):
+        """Return the calling thread's connection to the pool."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+
+        if conn is self._shared:
+            return
+
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            self._owners.pop(threading.get_ident(), None)
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection (used when the process shuts down)."""
+        with self._cond:
+            for conn in self._idle:
+                conn.close()
+                self._open -= 1
+            self._idle = []
+
+    def stats(self):
+        with self._cond:
+            return {
+                'database': self.database,
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': len(self._owners) if self._shared is None else self._open,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'reclaimed': self._reclaimed,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database=None):
+    """Return the shared pool for `database` (defaults to Config.DATABASE)."""
+    database = database or Config.DATABASE
+    key = database if database == ':memory:' else os.path.abspath(database)
+
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    key,
+                    size=Config.DB_POOL_SIZE,
+                    timeout=Config.DB_POOL_TIMEOUT,
+                    pragmas=Config.SQLITE_PRAGMAS,
+                )
+                _pools[key] = pool
+    return pool
+
+
+def release_connection(exc=None):
+    """Flask teardown hook: hand this thread's connections back to their pools."""
+    for pool in list(_pools.values()):
+        pool.release()
+
 
 class Database:
 
     def __init__(self):
-        self.conn = sqlite3.connect(Config.DATABASE, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self.create_table()
-
-    def create_table(self):
-        self.conn.execute("PRAGMA foreign_keys = ON")
-
-        if self.conn.execute("PRAGMA database_list").fetchone()[2] == ":memory:":
-            tables = [
-                'performance_reviews','users', 'reset_tokens', 'leaves', 'leave_balances', 'employee_profiles',
-                'attendance', 'payroll_records', 'courses', 'course_submissions'
-            ]
-            for table in tables:
-                self.conn.execute(f'DROP TABLE IF EXISTS {table}')
-
-        with self.conn:
-            # --- USERS TABLE ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,
-                employee_id TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                department TEXT,
-                role TEXT NOT NULL,
-                password_hash TEXT NOT NULL,
-                status TEXT DEFAULT 'Active',
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )''')
-
-            # --- RESET TOKENS TABLE ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS reset_tokens (
-                user_id INTEGER,
-                token TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-            )''')
-
-            # --- LEAVES TABLE ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS leaves (
-                id INTEGER PRIMARY KEY,
-                employee_id TEXT NOT NULL,
-                leave_type TEXT NOT NULL,
-                start_date TEXT NOT NULL,
-                end_date TEXT NOT NULL,
-                reason TEXT NOT NULL,
-                status TEXT DEFAULT 'Pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                reviewed_by TEXT,
-                reviewed_at TIMESTAMP,
-                FOREIGN KEY(employee_id) REFERENCES users(employee_id) ON DELETE CASCADE
-            )''')
-
-            # --- LEAVE BALANCES ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS leave_balances (
-                employee_id TEXT PRIMARY KEY,
-                annual INTEGER DEFAULT 21,
-                casual INTEGER DEFAULT 10,
-                sick INTEGER DEFAULT 8,
-                maternity INTEGER DEFAULT 90,
-                FOREIGN KEY(employee_id) REFERENCES users(employee_id) ON DELETE CASCADE
-            )''')
-
-            # # --- PERFORMANCE REVIEWS ---
-            # self.conn.execute('''CREATE TABLE IF NOT EXISTS performance_reviews (
-            #     id INTEGER PRIMARY KEY,
-            #     employee_id TEXT NOT NULL,
-            #     rating INTEGER NOT NULL,
-            #     comments TEXT NOT NULL,
-            #     reviewer_id TEXT NOT NULL,
-            #     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            #     FOREIGN KEY(employee_id) REFERENCES users(employee_id) ON DELETE CASCADE,
-            #     FOREIGN KEY(reviewer_id) REFERENCES users(employee_id) ON DELETE CASCADE
-
-            # )''')
-
-            # --- EMPLOYEE PROFILES ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS employee_profiles (
-                id INTEGER PRIMARY KEY,
-                user_id TEXT UNIQUE NOT NULL,
-                personal_details TEXT,
-                contact_details TEXT,
-                emergency_contacts TEXT,
-                dependents TEXT,
-                job_details TEXT,
-                salary_details TEXT,
-                report_to TEXT,
-                qualifications TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(employee_id) ON DELETE CASCADE
-            )''')
-
-            # --- ATTENDANCE ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY,
-                employee_id TEXT NOT NULL,
-                punch_in TEXT NOT NULL,
-                punch_out TEXT,
-                date TEXT NOT NULL,
-                status TEXT DEFAULT 'On Time',
-                is_manual INTEGER DEFAULT 0,
-                approval_status TEXT DEFAULT 'Approved',
-                rejection_reason TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (employee_id) REFERENCES users(employee_id) ON DELETE CASCADE
-            )''')
-
-            # --- PAYROLL ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS payroll_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                employee_id TEXT NOT NULL,
-                salary_month TEXT NOT NULL,
-                basic_salary REAL NOT NULL,
-                bonus REAL DEFAULT 0,
-                deductions REAL DEFAULT 0,
-                net_salary REAL NOT NULL,
-                currency TEXT DEFAULT 'NZD',
-                pay_frequency TEXT DEFAULT 'Monthly',
-                direct_deposit_amount REAL,
-                generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(employee_id) REFERENCES users(employee_id) ON DELETE CASCADE
-            )''')
-
-            # --- COURSES TABLE ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS courses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                department TEXT NOT NULL UNIQUE,
-                course_name TEXT NOT NULL
-            )''')
-
-            # --- COURSE SUBMISSIONS TABLE ---
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS course_submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                employee_id TEXT NOT NULL,
-                department TEXT NOT NULL,
-                course_name TEXT NOT NULL,
-                completion_note TEXT,
-                file_path TEXT,
-                completed_at TIMESTAMP,
-                status TEXT DEFAULT 'Pending',
-                rating TEXT,
-                admin_comment TEXT,
-                reviewed_by TEXT,
-                reviewed_at TIMESTAMP,
-                FOREIGN KEY(employee_id) REFERENCES users(employee_id) ON DELETE CASCADE
-            )''')
-
-
+        self.pool = get_pool(Config.DATABASE)
+
+    @property
+    def conn(self):
+        return self.pool.connection()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes from any models into one write transaction. The models
+        share this thread's pooled connection, so batch methods that do not
+        commit themselves can be combined inside the block.
+        """
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def invalidate(self, *tables):
+        """Call after writing to `tables` so cached counts/aggregates are dropped."""
+        invalidate_tables(*tables)
+
+    def cached_count(self, key, tables, query, params=()):
+        """Run a COUNT(*) query through the shared count cache."""
+        return count_cache.get_or_set(
+            (self.pool.database, key, tuple(params)), tables,
+            lambda: self.conn.execute(query, tuple(params)).fetchone()[0]
+        )
+
+    def estimated_count(self, key, tables, query, params=()):
+        """
+        Count the rows of `query` (a SELECT) up to Config.COUNT_ESTIMATE_THRESHOLD.
+        Returns (count, is_estimate); past the threshold the count is a lower bound.
+        """
+        limit = Config.COUNT_ESTIMATE_THRESHOLD
+        count = self.cached_count(
+            key, tables, f'SELECT COUNT(*) FROM ({query} LIMIT ?)', tuple(params) + (limit,)
+        )
+        return count, count >= limit
@@ -4,6 +4,7 @@ from app.config import Config
 from datetime import datetime
 import json
 from app.models.database import Database
+from app.utils.search import match_expression
 
 class EmployeeProfile(Database):
 
@@ -114,6 +115,7 @@ class EmployeeProfile(Database):
             tuple(values)
         )
         self.conn.commit()
+        self.invalidate('employee_profiles')
 
     def create_profile(self, user_id, data):
         now = datetime.now().isoformat()
@@ -136,6 +138,23 @@ class EmployeeProfile(Database):
             now, now
         ))
         self.conn.commit()
+        self.invalidate('employee_profiles')
+
+    def create_empty_profiles(self, user_ids):
+        """Blank profiles (what create_profile(user_id, {}) stores) for many users; the caller commits and invalidates."""
+        now = datetime.now().isoformat()
+        empty_dict, empty_list = json.dumps({}), json.dumps([])
+        self.conn.executemany('''
+            INSERT OR IGNORE INTO employee_profiles (
+                user_id, personal_details, contact_details, emergency_contacts,
+                dependents, job_details, salary_details, report_to, qualifications,
+                created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (user_id, empty_dict, empty_dict, empty_list, empty_list,
+             empty_dict, empty_dict, empty_dict, empty_list, now, now)
+            for user_id in user_ids
+        ])
 
     # def get_all(self, limit, offset, key=''):
     #     key = key.strip().lower() 
@@ -156,34 +175,33 @@ class EmployeeProfile(Database):
         
     #     cursor = self.conn.execute(query, tuple(params))
     #     return [dict(row) for row in cursor.fetchall()]
-    def get_all(self, limit, page=1, key=''):
-        key = key.strip().lower()
-        offset = (page - 1) * limit
-        if key:
-            search_key = f'%{key}%'
-            query = '''
-                SELECT ep.*, u.employee_id, u.name, u.department, u.role
-                FROM employee_profiles ep
-                JOIN users u ON ep.user_id = u.employee_id
-                WHERE LOWER(u.name) LIKE ?
-                ORDER BY u.name ASC
-                LIMIT ? OFFSET ?
-            '''
-            params = (search_key, limit, offset)
-        else:
-            query = '''
-                SELECT ep.*, u.employee_id, u.name, u.department, u.role
-                FROM employee_profiles ep
-                JOIN users u ON ep.user_id = u.employee_id
-                ORDER BY u.name ASC
-                LIMIT ? OFFSET ?
-            '''
-            params = (limit, offset)
-        
-        cursor = self.conn.execute(query, params)
+    def get_all(self, limit, page=1, key='', after=None):
+        match = match_expression(key)
+        query = '''
+            SELECT ep.*, u.employee_id, u.name, u.department, u.role
+            FROM employee_profiles ep
+            JOIN users u ON ep.user_id = u.employee_id
+            WHERE 1=1
+        '''
+        params = []
+        if match:
+            # Keeps the (name, id) order so keyset cursors stay valid while filtering
+            query += ' AND u.id IN (SELECT rowid FROM employee_search WHERE employee_search MATCH ?)'
+            params.append(match)
+        if after is not None:
+            # keyset cursor: (name, profile id) of the last row already returned
+            query += ' AND (u.name, ep.id) > (?, ?)'
+            params.extend(after)
+
+        query += ' ORDER BY u.name ASC, ep.id ASC LIMIT ?'
+        params.append(limit)
+        if after is None:
+            query += ' OFFSET ?'
+            params.append((page - 1) * limit)
+
+        cursor = self.conn.execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
     
     def get_total_profile_count(self):
-        cursor = self.conn.execute('SELECT COUNT(*) FROM employee_profiles')
-        return cursor.fetchone()[0]
\ No newline at end of file
+        return self.cached_count('profiles_total', ('employee_profiles',), 'SELECT COUNT(*) FROM employee_profiles')
\ No newline at end of file
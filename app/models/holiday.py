@@ -0,0 +1,43 @@
+# app/models/holiday.py
+
+from app.config import Config
+from app.models.database import Database
+from app.utils.cache import calendar_cache
+from app.utils.leave_days import LeaveCalendar
+
+
+class Holiday(Database):
+    def __init__(self):
+        super().__init__()
+
+    def add(self, day, name):
+        self.conn.execute('''
+            INSERT INTO holidays (date, name) VALUES (?, ?)
+            ON CONFLICT (date) DO UPDATE SET name = excluded.name
+        ''', (str(day), name))
+        self.conn.commit()
+        self.invalidate('holidays')
+
+    def delete(self, day):
+        cursor = self.conn.execute('DELETE FROM holidays WHERE date = ?', (str(day),))
+        self.conn.commit()
+        self.invalidate('holidays')
+        return cursor.rowcount
+
+    def get_all(self, year=None):
+        if year is not None:
+            cursor = self.conn.execute(
+                'SELECT date, name FROM holidays WHERE date BETWEEN ? AND ? ORDER BY date',
+                (f'{year}-01-01', f'{year}-12-31')
+            )
+        else:
+            cursor = self.conn.execute('SELECT date, name FROM holidays ORDER BY date')
+        return [dict(row) for row in cursor.fetchall()]
+
+    def calendar(self):
+        """The LeaveCalendar for the configured weekend and all holidays (cached)."""
+        weekend = Config.LEAVE_WEEKEND_DAYS
+        return calendar_cache.get_or_set(
+            (self.pool.database, weekend), ('holidays',),
+            lambda: LeaveCalendar(weekend, [row[0] for row in self.conn.execute('SELECT date FROM holidays')])
+        )
@@ -1,25 +1,101 @@
 # app/models/leave.py
 
 from app.models.database import Database
+from app.utils.search import match_expression
 from datetime import datetime
 
+# leave_balances columns (one per leave type)
+LEAVE_TYPES = ('annual', 'casual', 'sick', 'maternity')
+# Ids per IN (...) query, well under SQLite's bound-parameter limit
+IN_CHUNK = 500
+
+
+class _ReviewRejected(Exception):
+    """Aborts a review transaction; `outcome` says why."""
+
+    def __init__(self, outcome):
+        super().__init__(outcome)
+        self.outcome = outcome
+
+
 class Leave(Database):
     def __init__(self):
         super().__init__()
 
-    def apply_leave(self, employee_id, leave_type, start_date, end_date, reason):
+    def apply_leave(self, employee_id, leave_type, start_date, end_date, reason,
+                    days=None, start_half=False, end_half=False):
+        """
+        Insert a leave request unless it overlaps one of the employee's
+        pending/approved leaves; check and insert share one transaction.
+        Returns (leave_id, None), or (None, overlapping_leave).
+        """
+        with self.transaction() as conn:
+            conflict = self.find_overlap(employee_id, start_date, end_date)
+            if conflict:
+                return None, conflict
+            cursor = conn.execute('''
+                INSERT INTO leaves (employee_id, leave_type, start_date, end_date, reason, days, start_half, end_half)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (employee_id, leave_type, start_date, end_date, reason, days, int(start_half), int(end_half)))
+        self.invalidate('leaves')
+        return cursor.lastrowid, None
+
+    # Overlap and calendar lookups go through the leave_intervals R*Tree
+    # (day span x users.id), so they only touch intersecting leaves
+
+    def find_overlap(self, employee_id, start_date, end_date):
+        """The employee's earliest pending/approved leave intersecting the range, or None."""
         cursor = self.conn.execute('''
-            INSERT INTO leaves (employee_id, leave_type, start_date, end_date, reason)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (employee_id, leave_type, start_date, end_date, reason))
-        self.conn.commit()
-        return cursor.lastrowid
+            SELECT l.* FROM leave_intervals r
+            JOIN leaves l ON l.id = r.id
+            WHERE r.start_day <= CAST(julianday(?) AS INTEGER)
+            AND r.end_day >= CAST(julianday(?) AS INTEGER)
+            AND r.user_lo <= (SELECT id FROM users WHERE employee_id = ?)
+            AND r.user_hi >= (SELECT id FROM users WHERE employee_id = ?)
+            AND (l.status IS NULL OR l.status != 'Rejected')
+            ORDER BY l.start_date
+            LIMIT 1
+        ''', (end_date, start_date, employee_id, employee_id))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_calendar(self, start_date, end_date, department=None):
+        """Pending/approved leaves intersecting the range, optionally for one department."""
+        query = '''
+            SELECT l.id, l.employee_id, u.name, u.department, l.leave_type, l.status,
+                   l.start_date, l.end_date, l.start_half, l.end_half
+            FROM leave_intervals r
+            JOIN leaves l ON l.id = r.id
+            JOIN users u ON u.employee_id = l.employee_id
+            WHERE r.start_day <= CAST(julianday(?) AS INTEGER)
+            AND r.end_day >= CAST(julianday(?) AS INTEGER)
+            AND (l.status IS NULL OR l.status != 'Rejected')
+        '''
+        params = [end_date, start_date]
+        if department:
+            query += ' AND u.department = ?'
+            params.append(department)
+        query += ' ORDER BY l.start_date, u.name'
+        cursor = self.conn.execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_by_id(self, leave_id):
         cursor = self.conn.execute('SELECT * FROM leaves WHERE id = ?', (leave_id,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
+    def get_by_ids(self, leave_ids):
+        """{id: leave} for the given ids, one IN (...) query per IN_CHUNK ids."""
+        leave_ids = list(dict.fromkeys(leave_ids))
+        leaves = {}
+        for i in range(0, len(leave_ids), IN_CHUNK):
+            chunk = leave_ids[i:i + IN_CHUNK]
+            cursor = self.conn.execute(
+                f"SELECT * FROM leaves WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            leaves.update((row['id'], dict(row)) for row in cursor.fetchall())
+        return leaves
+
     def update_status(self, leave_id, status, reviewed_by):
         self.conn.execute('''
             UPDATE leaves
@@ -27,26 +103,101 @@ class Leave(Database):
             WHERE id = ?
         ''', (status, reviewed_by, datetime.now().isoformat(), leave_id))
         self.conn.commit()
+        self.invalidate('leaves')
 
-    def get_pending(self, page=1, per_page=10):
-        offset = (page - 1) * per_page
-        cursor = self.conn.execute('''
+    def review(self, leave, status, reviewed_by, days=None):
+        """
+        Approve or reject a pending leave in one transaction. Approving with
+        `days` deducts them from the balance only if it covers them (one
+        conditional UPDATE, so concurrent approvals cannot overdraw) and appends
+        the debit to leave_ledger.
+        Returns 'reviewed', or 'not_pending' / 'insufficient_balance' with
+        nothing written.
+        """
+        try:
+            with self.transaction() as conn:
+                self._review(conn, leave, status, reviewed_by, days)
+        except _ReviewRejected as rejected:
+            return rejected.outcome
+        self.invalidate('leaves', 'leave_balances', 'leave_ledger')
+        return 'reviewed'
+
+    def review_many(self, reviews, reviewed_by):
+        """
+        review() for a list of (leave, status, days) in one transaction. Each
+        review runs in its own savepoint, so a refused one leaves the others
+        in place; later deductions see the balance left by earlier ones.
+        Returns one outcome per review, in order.
+        """
+        if not reviews:
+            return []
+        outcomes = []
+        with self.transaction() as conn:
+            for leave, status, days in reviews:
+                conn.execute('SAVEPOINT leave_review')
+                try:
+                    self._review(conn, leave, status, reviewed_by, days)
+                    outcomes.append('reviewed')
+                except _ReviewRejected as rejected:
+                    conn.execute('ROLLBACK TO leave_review')
+                    outcomes.append(rejected.outcome)
+                conn.execute('RELEASE leave_review')
+        self.invalidate('leaves', 'leave_balances', 'leave_ledger')
+        return outcomes
+
+    def _review(self, conn, leave, status, reviewed_by, days):
+        cursor = conn.execute('''
+            UPDATE leaves
+            SET status = ?, reviewed_by = ?, reviewed_at = ?
+            WHERE id = ? AND (status IS NULL OR status = 'Pending')
+        ''', (status, reviewed_by, datetime.now().isoformat(), leave['id']))
+        if cursor.rowcount == 0:
+            raise _ReviewRejected('not_pending')
+        if status != 'Approved' or not days:
+            return
+
+        leave_type = leave['leave_type'].lower()
+        if leave_type not in LEAVE_TYPES:
+            raise ValueError(f"Unsupported leave type: {leave['leave_type']}")
+        row = conn.execute(f'''
+            UPDATE leave_balances SET {leave_type} = {leave_type} - ?
+            WHERE employee_id = ? AND {leave_type} >= ?
+            RETURNING {leave_type}
+        ''', (days, leave['employee_id'], days)).fetchone()
+        if row is None:
+            raise _ReviewRejected('insufficient_balance')
+        conn.execute('''
+            INSERT INTO leave_ledger (employee_id, leave_type, delta, balance, entry_type, leave_id, created_by)
+            VALUES (?, ?, ?, ?, 'debit', ?, ?)
+        ''', (leave['employee_id'], leave_type, -days, row[0], leave['id'], reviewed_by))
+
+    def get_pending(self, page=1, per_page=10, after=None):
+        query = '''
         SELECT l.*, u.name, u.email, u.role
         FROM leaves l
         JOIN users u ON l.employee_id = u.employee_id
-        WHERE l.status IS NULL OR l.status = 'Pending'
-        ORDER BY l.start_date ASC
-        LIMIT ? OFFSET ?
-        ''', (per_page, offset))  # ✅ Now placeholders match bindings
+        WHERE (l.status IS NULL OR l.status = 'Pending')
+        '''
+        params = []
+        if after is not None:
+            # keyset cursor: (start_date, id) of the last row already returned
+            query += ' AND (l.start_date, l.id) > (?, ?)'
+            params.extend(after)
+        query += ' ORDER BY l.start_date ASC, l.id ASC LIMIT ?'
+        params.append(per_page)
+        if after is None:
+            query += ' OFFSET ?'
+            params.append((page - 1) * per_page)
+
+        cursor = self.conn.execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
     def get_pending_count(self):
-        cursor = self.conn.execute('''
+        return self.cached_count('leaves_pending', ('leaves',), '''
         SELECT COUNT(*) 
         FROM leaves 
         WHERE status IS NULL OR status = 'Pending'
         ''')
-        return cursor.fetchone()[0]
 
 
     def get_leave_balance(self, employee_id, leave_type):
@@ -56,13 +207,33 @@ class Leave(Database):
         row = cursor.fetchone()
         return row[0] if row else None
 
-    def deduct_leave_balance(self, employee_id, leave_type, days):
-        self.conn.execute(f'''
-            UPDATE leave_balances
-            SET {leave_type} = {leave_type} - ?
-            WHERE employee_id = ?
-        ''', (days, employee_id))
-        self.conn.commit()
+    def get_ledger(self, employee_id, leave_type=None, page=1, per_page=20, before=None):
+        """Balance history of one employee, newest entry first."""
+        query = 'SELECT * FROM leave_ledger WHERE employee_id = ?'
+        params = [employee_id]
+        if leave_type:
+            query += ' AND leave_type = ?'
+            params.append(leave_type)
+        if before is not None:
+            # keyset cursor: id of the last entry already returned
+            query += ' AND id < ?'
+            params.append(before)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(per_page)
+        if before is None:
+            query += ' OFFSET ?'
+            params.append((page - 1) * per_page)
+
+        cursor = self.conn.execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_ledger_count(self, employee_id, leave_type=None):
+        query = 'SELECT COUNT(*) FROM leave_ledger WHERE employee_id = ?'
+        params = [employee_id]
+        if leave_type:
+            query += ' AND leave_type = ?'
+            params.append(leave_type)
+        return self.cached_count('leave_ledger', ('leave_ledger',), query, params)
 
     def get_balance_by_employee(self, employee_id):
         cursor = self.conn.execute(
@@ -74,29 +245,35 @@ class Leave(Database):
     
     def get_leaves_by_employee_name_and_date(self, name, start_date, end_date, page, per_page):
         offset = (page - 1) * per_page
-        search_pattern = f'%{name}%'
+        match = match_expression(name, column='name')
+        if match is None:
+            return []
         cursor = self.conn.execute('''
         SELECT l.leave_type, l.start_date, l.end_date, l.reason, u.name
-        FROM leaves l
-        JOIN users u ON l.employee_id = u.employee_id
-        WHERE u.name LIKE ?
-        AND l.start_date >= ? AND l.end_date <= ?
+        FROM employee_search s
+        JOIN users u ON u.id = s.rowid
+        JOIN leaves l ON l.employee_id = u.employee_id
+        WHERE employee_search MATCH ?
+        AND l.start_date <= ? AND l.end_date >= ?
         ORDER BY l.start_date ASC
         LIMIT ? OFFSET ?
-        ''', (search_pattern, start_date, end_date, per_page, offset))
+        ''', (match, end_date, start_date, per_page, offset))
         return [dict(row) for row in cursor.fetchall()]
 
     def get_leaves_by_employee_name_and_date_count(self, name, start_date, end_date):
-        search_pattern = f'%{name}%'
-        cursor = self.conn.execute('''
-        SELECT COUNT(*) 
-        FROM leaves l
-        JOIN users u ON l.employee_id = u.employee_id
-        WHERE u.name LIKE ? 
-        AND l.start_date >= ? 
-        AND l.end_date <= ?
-        ''', (search_pattern, start_date, end_date))
-        return cursor.fetchone()[0]
+        """Returns (count, is_estimate) for the name/date search."""
+        match = match_expression(name, column='name')
+        if match is None:
+            return 0, False
+        return self.estimated_count('leaves_search', ('leaves', 'users'), '''
+        SELECT 1
+        FROM employee_search s
+        JOIN users u ON u.id = s.rowid
+        JOIN leaves l ON l.employee_id = u.employee_id
+        WHERE employee_search MATCH ?
+        AND l.start_date <= ?
+        AND l.end_date >= ?
+        ''', (match, end_date, start_date))
 
     
     def get_leaves_by_employee_id(self, employee_id, page, per_page):
@@ -112,12 +289,11 @@ class Leave(Database):
         return [dict(row) for row in cursor.fetchall()]
     
     def get_leaves_by_employee_id_count(self, employee_id):
-        cursor = self.conn.execute('''
+        return self.cached_count('leaves_by_employee', ('leaves', 'users'), '''
         SELECT COUNT(*) FROM leaves l
         JOIN users u ON l.employee_id = u.employee_id
         WHERE u.employee_id = ?
         ''', (employee_id,))
-        return cursor.fetchone()[0]
 
     def insert_leave_balance(self, employee_id):
         self.conn.execute('''
@@ -125,5 +301,13 @@ class Leave(Database):
             VALUES (?)
         ''', (employee_id,))
         self.conn.commit()
+        self.invalidate('leave_balances')
+
+    def insert_leave_balances(self, employee_ids):
+        """Default balances for many new employees; the caller commits and invalidates."""
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO leave_balances (employee_id) VALUES (?)',
+            [(employee_id,) for employee_id in employee_ids]
+        )
 
 
@@ -0,0 +1,120 @@
+# app/models/leave_accrual.py
+import re
+import time
+
+from app.models.database import Database
+from app.models.leave import LEAVE_TYPES
+
+PERIOD = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+# Active employees who had joined by the end of the period (:period_end)
+ELIGIBLE = '''
+    SELECT employee_id FROM users
+    WHERE status = 'Active' AND created_at < :period_end
+'''
+
+
+class LeaveAccrual(Database):
+    def __init__(self):
+        super().__init__()
+
+    def get_policies(self):
+        cursor = self.conn.execute('SELECT * FROM leave_policies ORDER BY leave_type')
+        return [dict(row) for row in cursor.fetchall()]
+
+    def set_policy(self, leave_type, monthly_accrual, max_balance=None, carry_over_cap=None):
+        if leave_type not in LEAVE_TYPES:
+            raise ValueError(f"Unsupported leave type: {leave_type}")
+        self.conn.execute('''
+            INSERT INTO leave_policies (leave_type, monthly_accrual, max_balance, carry_over_cap)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (leave_type) DO UPDATE SET
+                monthly_accrual = excluded.monthly_accrual,
+                max_balance = excluded.max_balance,
+                carry_over_cap = excluded.carry_over_cap,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (leave_type, monthly_accrual, max_balance, carry_over_cap))
+        self.conn.commit()
+
+    def get_runs(self, limit=12):
+        cursor = self.conn.execute('SELECT * FROM leave_accrual_runs ORDER BY period DESC LIMIT ?', (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def last_period(self):
+        row = self.conn.execute('SELECT MAX(period) FROM leave_accrual_runs').fetchone()
+        return row[0]
+
+    def run(self, period):
+        """
+        Apply the policies for `period` ('YYYY-MM') to every eligible employee.
+        A January run first trims balances to each policy's carry_over_cap
+        (year-end reset), then credits monthly_accrual up to max_balance; a
+        balance already above max_balance is left as it is. Each policy step
+        is two set-based statements - ledger entries from the old balances,
+        then the balance update - and the whole period commits with its
+        leave_accrual_runs row, so re-running a period changes nothing.
+        Returns a summary dict; status is 'applied' or 'skipped'.
+        """
+        if not PERIOD.match(period or ''):
+            raise ValueError("period must be YYYY-MM")
+        started = time.perf_counter()
+        params = {'period_end': next_month(period) + '-01', 'actor': f'accrual:{period}'}
+
+        with self.transaction() as conn:
+            if conn.execute('SELECT 1 FROM leave_accrual_runs WHERE period = ?', (period,)).fetchone():
+                return {'period': period, 'status': 'skipped'}
+
+            # Resolve the eligible set once; every statement below joins on it
+            conn.execute('DROP TABLE IF EXISTS temp.accrual_eligible')
+            conn.execute('''
+                CREATE TEMP TABLE accrual_eligible (employee_id TEXT PRIMARY KEY) WITHOUT ROWID
+            ''')
+            employees = conn.execute(f'INSERT INTO accrual_eligible {ELIGIBLE}', params).rowcount
+
+            entries = 0
+            for policy in conn.execute('SELECT * FROM leave_policies ORDER BY leave_type').fetchall():
+                column = policy['leave_type']
+                if period.endswith('-01') and policy['carry_over_cap'] is not None:
+                    entries += self._apply(conn, column, 'MIN({col}, :cap)', 'carry_over_reset',
+                                           dict(params, cap=policy['carry_over_cap']))
+                if policy['monthly_accrual'] > 0:
+                    # Accrual only ever adds: a balance already above max_balance is left alone
+                    new = ('{col} + :accrual' if policy['max_balance'] is None
+                           else 'MAX({col}, MIN({col} + :accrual, :max))')
+                    entries += self._apply(conn, column, new, 'accrual', dict(
+                        params, accrual=policy['monthly_accrual'], max=policy['max_balance']
+                    ))
+
+            conn.execute('DROP TABLE temp.accrual_eligible')
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            conn.execute('''
+                INSERT INTO leave_accrual_runs (period, employees, entries, duration_ms)
+                VALUES (?, ?, ?, ?)
+            ''', (period, employees, entries, duration_ms))
+        self.invalidate('leave_balances', 'leave_ledger')
+        return {'period': period, 'status': 'applied', 'employees': employees,
+                'entries': entries, 'duration_ms': duration_ms}
+
+    def _apply(self, conn, column, new_expr, entry_type, params):
+        """Move every eligible `column` balance to `new_expr`, ledgering each change."""
+        new = new_expr.format(col=f'b.{column}')
+        cursor = conn.execute(f'''
+            INSERT INTO leave_ledger (employee_id, leave_type, delta, balance, entry_type, created_by)
+            SELECT employee_id, '{column}', new - old, new, '{entry_type}', :actor
+            FROM (
+                SELECT b.employee_id, b.{column} as old, {new} as new
+                FROM leave_balances b
+                JOIN accrual_eligible e ON e.employee_id = b.employee_id
+            )
+            WHERE new != old
+        ''', params)
+        conn.execute(f'''
+            UPDATE leave_balances AS b SET {column} = {new}
+            WHERE b.employee_id IN accrual_eligible AND {new} != b.{column}
+        ''', params)
+        return cursor.rowcount
+
+
+def next_month(period):
+    year, month = map(int, period.split('-'))
+    return f'{year + month // 12}-{month % 12 + 1:02d}'
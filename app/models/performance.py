@@ -27,6 +27,7 @@ class Performance(Database):
             VALUES (?, ?)
         ''', (department, course_name))
         self.conn.commit()
+        self.invalidate('courses')
 
     def seed_default_courses(self):
         for dept, course in DEPARTMENT_COURSE_MAP.items():
@@ -41,6 +42,20 @@ class Performance(Database):
                 ) VALUES (?, ?, ?, 'Pending')
             ''', (employee_id, department, course))
             self.conn.commit()
+            self.invalidate('course_submissions')
+
+    def assign_courses_to_users(self, employees):
+        """
+        Batch form of assign_course_to_user_if_exists for (employee_id, department)
+        pairs; departments without a course are skipped. The caller commits and
+        invalidates.
+        """
+        self.conn.executemany('''
+            INSERT INTO course_submissions (employee_id, department, course_name, status)
+            SELECT ?, department, course_name, 'Pending'
+            FROM courses WHERE department = ?
+            LIMIT 1
+        ''', list(employees))
 
     # def submit_completion(self, employee_id, department, course_name, note, file_path, date):
     #     self.conn.execute('''
@@ -70,6 +85,7 @@ class Performance(Database):
             ) VALUES (?, ?, ?, ?, ?, ?)
         ''', (employee_id, department, course_name.strip(), note, file_path, date))
         self.conn.commit()
+        self.invalidate('course_submissions')
 
 
     def get_submissions_by_employee(self, employee_id, page, per_page):
@@ -84,10 +100,9 @@ class Performance(Database):
 
     
     def get_submissions_by_employee_count(self, employee_id):
-        cursor = self.conn.execute('''
+        return self.cached_count('submissions_by_employee', ('course_submissions',), '''
         SELECT COUNT(*) FROM course_submissions WHERE employee_id = ?
         ''', (employee_id,))
-        return cursor.fetchone()[0]
 
     def get_pending_submissions(self, page=1, per_page=10):
         offset = (page - 1) * per_page
@@ -101,10 +116,9 @@ class Performance(Database):
 
     
     def get_pending_submissions_count(self):
-        cursor = self.conn.execute('''
+        return self.cached_count('submissions_pending', ('course_submissions',), '''
         SELECT COUNT(*) FROM course_submissions WHERE status = 'Pending'
         ''')
-        return cursor.fetchone()[0]
 
     def review_submission(self, submission_id, status, rating, comment, admin_id):
         self.conn.execute('''
@@ -113,19 +127,28 @@ class Performance(Database):
             WHERE id = ?
         ''', (status, rating, comment, admin_id, datetime.now().isoformat(), submission_id))
         self.conn.commit()
-
-    def get_all_submissions(self, page=1, per_page=10):
-        offset = (page - 1) * per_page
-        cursor = self.conn.execute('''
-        SELECT * FROM course_submissions
-        ORDER BY id DESC
-        LIMIT ? OFFSET ?
-        ''', (per_page, offset))
+        self.invalidate('course_submissions')
+
+    def get_all_submissions(self, page=1, per_page=10, after=None):
+        if after is not None:
+            # keyset cursor: id of the last row already returned
+            cursor = self.conn.execute('''
+            SELECT * FROM course_submissions
+            WHERE id < ?
+            ORDER BY id DESC
+            LIMIT ?
+            ''', (after[0], per_page))
+        else:
+            offset = (page - 1) * per_page
+            cursor = self.conn.execute('''
+            SELECT * FROM course_submissions
+            ORDER BY id DESC
+            LIMIT ? OFFSET ?
+            ''', (per_page, offset))
         return [dict(row) for row in cursor.fetchall()]
     
     def get_all_submissions_count(self):
-        cursor = self.conn.execute('SELECT COUNT(*) FROM course_submissions')
-        return cursor.fetchone()[0]
+        return self.cached_count('submissions_total', ('course_submissions',), 'SELECT COUNT(*) FROM course_submissions')
 
     def get_rating_distribution(self, page=1, per_page=10):
         offset = (page - 1) * per_page
@@ -139,12 +162,11 @@ class Performance(Database):
         return [dict(row) for row in cursor.fetchall()]
 
     def get_rating_distribution_count(self):
-        cursor = self.conn.execute('''
+        return self.cached_count('submissions_ratings', ('course_submissions',), '''
         SELECT COUNT(DISTINCT rating)
         FROM course_submissions
         WHERE rating IS NOT NULL
         ''')
-        return cursor.fetchone()[0]
 
 
     def get_completion_by_department(self, page=1, per_page=10):
@@ -159,12 +181,11 @@ class Performance(Database):
         return [dict(row) for row in cursor.fetchall()]
 
     def get_completion_by_department_count(self):
-        cursor = self.conn.execute('''
+        return self.cached_count('submissions_completion', ('course_submissions',), '''
         SELECT COUNT(DISTINCT department)
         FROM course_submissions
         WHERE status = 'Approved'
         ''')
-        return cursor.fetchone()[0]
     
     def has_already_submitted_course(self, employee_id, course_name):
         cursor = self.conn.execute('''
@@ -0,0 +1,77 @@
+# app/models/punch_queue.py
+from datetime import datetime
+
+from app.config import Config
+from app.models.database import get_pool
+
+
+class PunchQueue:
+    """
+    Durable write-behind queue for punch-in/punch-out events.
+
+    Lives in its own SQLite file (Config.ATTENDANCE_QUEUE_DATABASE) so that
+    appending an event never waits on the main database's writer lock. The
+    event time is taken when the punch is accepted, not when it is flushed.
+    Events stay queued until the flusher has committed them to attendance,
+    so a crash replays them; Attendence.apply_punches is idempotent for that.
+    """
+
+    def __init__(self, database=None):
+        self.pool = get_pool(database or Config.ATTENDANCE_QUEUE_DATABASE)
+        # Local scratch database, not part of the versioned schema
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS punch_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id TEXT NOT NULL,
+                kind TEXT NOT NULL CHECK (kind IN ('in', 'out')),
+                at TEXT NOT NULL,
+                date TEXT NOT NULL
+            )''')
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_punch_queue_employee ON punch_queue (employee_id, id)'
+            )
+
+    @property
+    def conn(self):
+        return self.pool.connection()
+
+    def enqueue(self, employee_id, kind):
+        now = datetime.now()
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO punch_queue (employee_id, kind, at, date) VALUES (?, ?, ?, ?)',
+                (employee_id, kind, now.isoformat(), now.strftime('%Y-%m-%d'))
+            )
+
+    def peek(self, limit):
+        """The oldest `limit` events, in arrival order."""
+        cursor = self.conn.execute(
+            'SELECT * FROM punch_queue ORDER BY id LIMIT ?', (limit,)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def pending_for(self, employee_id):
+        cursor = self.conn.execute(
+            'SELECT * FROM punch_queue WHERE employee_id = ? ORDER BY id', (employee_id,)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def acknowledge(self, last_id):
+        """Drop every event up to and including `last_id` once it is flushed."""
+        with self.conn:
+            self.conn.execute('DELETE FROM punch_queue WHERE id <= ?', (last_id,))
+
+    def depth(self):
+        return self.conn.execute('SELECT COUNT(*) FROM punch_queue').fetchone()[0]
+
+
+_queues = {}
+
+
+def get_punch_queue(database=None):
+    """The process-wide PunchQueue for `database` (created on first use)."""
+    database = database or Config.ATTENDANCE_QUEUE_DATABASE
+    queue = _queues.get(database)
+    if queue is None:
+        queue = _queues[database] = PunchQueue(database)
+    return queue
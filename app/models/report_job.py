@@ -0,0 +1,51 @@
+# app/models/report_job.py
+import json
+import uuid
+
+from app.models.database import Database
+
+
+class ReportJob(Database):
+    def __init__(self):
+        super().__init__()
+
+    def create(self, kind, params, rows=None, requested_by=None):
+        job_id = uuid.uuid4().hex
+        self.conn.execute('''
+            INSERT INTO report_jobs (id, kind, params, rows, requested_by) VALUES (?, ?, ?, ?, ?)
+        ''', (job_id, kind, json.dumps(params), rows, requested_by))
+        self.conn.commit()
+        return job_id
+
+    def get(self, job_id):
+        row = self.conn.execute('SELECT * FROM report_jobs WHERE id = ?', (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def mark_running(self, job_id):
+        self.conn.execute("UPDATE report_jobs SET status = 'running' WHERE id = ?", (job_id,))
+        self.conn.commit()
+
+    def mark_done(self, job_id, path):
+        self.conn.execute('''
+            UPDATE report_jobs SET status = 'done', path = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?
+        ''', (path, job_id))
+        self.conn.commit()
+
+    def mark_failed(self, job_id, error):
+        self.conn.execute('''
+            UPDATE report_jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?
+        ''', (error, job_id))
+        self.conn.commit()
+
+    def delete_expired(self, max_age_seconds):
+        """Drop jobs created more than `max_age_seconds` ago; returns their file paths."""
+        cursor = self.conn.execute('''
+            DELETE FROM report_jobs WHERE created_at < datetime('now', ?) RETURNING path
+        ''', (f'-{int(max_age_seconds)} seconds',))
+        paths = [row['path'] for row in cursor.fetchall() if row['path']]
+        self.conn.commit()
+        return paths
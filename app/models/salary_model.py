@@ -1,5 +1,14 @@
+import time
+
 from app.models.database import Database
 
+INSERT_RECORD = '''
+    INSERT INTO payroll_records (
+        employee_id, salary_month, basic_salary, bonus, deductions, net_salary,
+        currency, pay_frequency, direct_deposit_amount
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 class SalaryModel(Database):
     def __init__(self):
         super().__init__()
@@ -7,15 +16,11 @@ class SalaryModel(Database):
     def add_salary_record(self, employee_id, salary_month, basic, bonus, deductions, net_salary,
                           currency='NZD', pay_frequency='Monthly', direct_deposit_amount=None):
         with self.conn:
-            self.conn.execute('''
-                INSERT INTO payroll_records (
-                    employee_id, salary_month, basic_salary, bonus, deductions, net_salary,
-                    currency, pay_frequency, direct_deposit_amount
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            self.conn.execute(INSERT_RECORD, (
                 employee_id, salary_month, basic, bonus, deductions, net_salary,
                 currency, pay_frequency, direct_deposit_amount
             ))
+        self.invalidate('payroll_records')
 
     # def get_salary_by_month(self, employee_id, month):
     #     cur = self.conn.execute('''
@@ -43,6 +48,16 @@ class SalaryModel(Database):
         row = cur.fetchone()
         return dict(row) if row else None
 
+    def get_payslip_record(self, employee_id, month):
+        """The employee's record for `month` with their name, as printed on the payslip."""
+        row = self.conn.execute('''
+            SELECT p.*, u.name FROM payroll_records p
+            JOIN users u ON u.employee_id = p.employee_id
+            WHERE p.employee_id = ? AND p.salary_month = ?
+            ORDER BY p.id LIMIT 1
+        ''', (employee_id, month)).fetchone()
+        return dict(row) if row else None
+
     # def get_all_salary(self, employee_id):
     #     cur = self.conn.execute('''
     #         SELECT * FROM payroll_records WHERE employee_id = ?
@@ -81,6 +96,56 @@ class SalaryModel(Database):
         return [dict(row) for row in rows]
 
 
+    EXPORT_COLUMNS = ('id', 'employee_id', 'name', 'salary_month', 'basic_salary', 'bonus', 'deductions',
+                      'net_salary', 'direct_deposit_amount', 'currency', 'pay_frequency', 'generated_at')
+
+    @staticmethod
+    def _export_filter(employee_id, month):
+        clauses, params = ['1=1'], []
+        if employee_id:
+            clauses.append('p.employee_id = ?')
+            params.append(employee_id)
+        if month:
+            clauses.append('p.salary_month = ?')
+            params.append(month)
+        return ' AND '.join(clauses), tuple(params)
+
+    def count_salary_records(self, employee_id=None, month=None):
+        """Number of rows iter_salary_records() would yield."""
+        where, params = self._export_filter(employee_id, month)
+        return self.conn.execute(f'''
+            SELECT COUNT(*) FROM payroll_records p
+            JOIN users u ON p.employee_id = u.employee_id
+            WHERE {where}
+        ''', params).fetchone()[0]
+
+    def iter_salary_records(self, employee_id=None, month=None, chunk_size=1000):
+        """
+        Yield the rows fetch_salary_records() would return, as lists of at
+        most `chunk_size` tuples (EXPORT_COLUMNS order). Rows are stepped out
+        of the cursor with fetchmany in the order of the index the filter
+        uses - id order, or (salary_month, id) for one employee over all
+        months - so no sort buffers the whole result.
+        """
+        where, params = self._export_filter(employee_id, month)
+        order = 'p.employee_id, p.salary_month, p.id' if employee_id and not month else 'p.id'
+        cursor = self.conn.execute(f'''
+            SELECT p.id, p.employee_id, u.name, p.salary_month, p.basic_salary, p.bonus, p.deductions,
+                   p.net_salary, p.direct_deposit_amount, p.currency, p.pay_frequency, p.generated_at
+            FROM payroll_records p
+            JOIN users u ON p.employee_id = u.employee_id
+            WHERE {where}
+            ORDER BY {order}
+        ''', params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+
     def get_latest_salary(self, employee_id):
         cur = self.conn.execute('''
             SELECT * FROM payroll_records 
@@ -91,14 +156,87 @@ class SalaryModel(Database):
         row = cur.fetchone()
         return dict(row) if row else None
     
-    def get_all(self, page=1, per_page=10):
-        offset = (page - 1) * per_page
-        cursor = self.conn.execute(
-            'SELECT * FROM payroll_records ORDER BY generated_at LIMIT ? OFFSET ?',
-            (per_page, offset)
-        )
+    def get_all(self, page=1, per_page=10, after=None):
+        if after is not None:
+            # keyset cursor: (generated_at, id) of the last row already returned
+            cursor = self.conn.execute(
+                '''SELECT * FROM payroll_records
+                   WHERE (generated_at, id) > (?, ?)
+                   ORDER BY generated_at, id LIMIT ?''',
+                (after[0], after[1], per_page)
+            )
+        else:
+            offset = (page - 1) * per_page
+            cursor = self.conn.execute(
+                'SELECT * FROM payroll_records ORDER BY generated_at, id LIMIT ? OFFSET ?',
+                (per_page, offset)
+            )
         return [dict(row) for row in cursor.fetchall()]
     
     def get_total_count(self):
-        cursor = self.conn.execute('SELECT COUNT(*) FROM payroll_records')
-        return cursor.fetchone()[0]
\ No newline at end of file
+        return self.cached_count('payroll_total', ('payroll_records',), 'SELECT COUNT(*) FROM payroll_records')
+
+    def get_payroll_run(self, salary_month):
+        row = self.conn.execute('SELECT * FROM payroll_runs WHERE salary_month = ?', (salary_month,)).fetchone()
+        return dict(row) if row else None
+
+    def payroll_inputs(self, salary_month, conn=None):
+        """
+        One row per active employee who had joined by the end of
+        `salary_month`: their salary_details JSON, the recurring fields of
+        their latest earlier payroll record, and whether they are already paid
+        for the month.
+        """
+        return (conn or self.conn).execute('''
+            SELECT u.employee_id, p.salary_details,
+                   r.basic_salary, r.deductions, r.currency, r.pay_frequency,
+                   EXISTS (
+                       SELECT 1 FROM payroll_records x
+                       WHERE x.employee_id = u.employee_id AND x.salary_month = :month
+                   ) AS paid
+            FROM users u
+            LEFT JOIN employee_profiles p ON p.user_id = u.employee_id
+            LEFT JOIN payroll_records r ON r.id = (
+                SELECT id FROM payroll_records
+                WHERE employee_id = u.employee_id AND salary_month < :month
+                ORDER BY salary_month DESC, id DESC LIMIT 1
+            )
+            WHERE u.status = 'Active' AND u.created_at < date(:month || '-01', '+1 month')
+        ''', {'month': salary_month}).fetchall()
+
+    def run_payroll(self, salary_month, compute, run_by=None):
+        """
+        Pay every employee in payroll_inputs() who has no record for
+        `salary_month` yet. Inputs are read and the rows written
+        under one write lock: `compute(inputs)` returns (records, missing) as
+        in app.utils.payroll.compute_payslips, the records go in with one
+        executemany, and the payroll_runs row commits with them. Returns
+        (summary, created); created is False if the month had already run.
+        """
+        started = time.perf_counter()
+        with self.transaction() as conn:
+            previous = conn.execute('SELECT * FROM payroll_runs WHERE salary_month = ?', (salary_month,)).fetchone()
+            if previous:
+                return dict(previous), False
+
+            inputs = self.payroll_inputs(salary_month, conn)
+            unpaid = [row for row in inputs if not row['paid']]
+
+            records, missing = compute(unpaid)
+            conn.executemany(INSERT_RECORD, records)
+
+            summary = {
+                'salary_month': salary_month,
+                'employees': len(inputs),
+                'inserted': len(records),
+                'existing': len(inputs) - len(unpaid),
+                'missing': len(missing),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+                'run_by': run_by
+            }
+            conn.execute('''
+                INSERT INTO payroll_runs (salary_month, employees, inserted, existing, missing, duration_ms, run_by)
+                VALUES (:salary_month, :employees, :inserted, :existing, :missing, :duration_ms, :run_by)
+            ''', summary)
+        self.invalidate('payroll_records')
+        return dict(summary, missing_employee_ids=missing), True
@@ -0,0 +1,57 @@
+# app/models/sequence.py
+import threading
+from app.models.database import Database
+
+# Per-process blocks of reserved values, keyed by (database, sequence name)
+_blocks = {}
+_blocks_lock = threading.Lock()
+
+
+class Sequence(Database):
+    """
+    A named counter in the id_sequences table.
+
+    reserve() advances the counter with a single UPDATE ... RETURNING, so
+    concurrent workers never see the same value and nothing has to scan the
+    table it numbers. next() hands values out of a per-process block of
+    `block_size` reserved values; unused values in a block are lost when the
+    process exits, so block_size > 1 trades dense numbering for fewer writes.
+    """
+
+    def __init__(self, name, block_size=1):
+        super().__init__()
+        self.name = name
+        self.block_size = max(1, block_size)
+
+    def reserve(self, count):
+        """
+        Reserve `count` consecutive values and return the first one. Inside an
+        open transaction the reservation joins it (and rolls back with it);
+        otherwise it is committed straight away.
+        """
+        conn = self.conn
+        owns_transaction = not conn.in_transaction
+        row = conn.execute(
+            'UPDATE id_sequences SET next_value = next_value + ? WHERE name = ? RETURNING next_value',
+            (count, self.name)
+        ).fetchone()
+        if owns_transaction:
+            conn.commit()
+        if row is None:
+            raise LookupError(f"Unknown sequence: {self.name}")
+        return row[0] - count
+
+    def next(self):
+        # A block reserved inside a caller's transaction could be rolled back
+        # after we cached it, so those callers get an exact reservation
+        if self.block_size == 1 or self.conn.in_transaction:
+            return self.reserve(1)
+
+        key = (self.pool.database, self.name)
+        with _blocks_lock:
+            next_value, end = _blocks.get(key, (0, 0))
+            if next_value >= end:
+                next_value = self.reserve(self.block_size)
+                end = next_value + self.block_size
+            _blocks[key] = (next_value + 1, end)
+        return next_value
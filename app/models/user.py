@@ -2,16 +2,28 @@ import sqlite3
 from app.config import Config
 from datetime import datetime
 from app.models.database import Database
+from app.models.sequence import Sequence
+from app.utils.search import match_expression
+
+# Tables whose rows go away (directly or by cascade) when a user is deleted
+USER_OWNED_TABLES = (
+    'users', 'attendance', 'leaves', 'leave_balances', 'leave_ledger', 'employee_profiles',
+    'payroll_records', 'course_submissions', 'reset_tokens'
+)
+
+
+def format_employee_id(number):
+    # Four digits up to EMP9999, then simply wider (EMP10000, ...)
+    return f"EMP{number:04d}"
+
 
 class User(Database):
     def __init__(self):
         super().__init__()
+        self.employee_ids = Sequence('employee_id', Config.EMPLOYEE_ID_BLOCK_SIZE)
     
     def generate_employee_id(self):
-        cursor = self.conn.execute('SELECT MAX(id) FROM users')
-        row = cursor.fetchone()
-        next_id = (row[0] or 0) + 1
-        return f"EMP{next_id:04d}"
+        return format_employee_id(self.employee_ids.next())
 
     def add(self, name, email, phone, department, role, password_hash, status='Active'):
         employee_id = self.generate_employee_id()
@@ -22,6 +34,7 @@ class User(Database):
                     role, password_hash, status
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (employee_id, name, email, phone, department, role, password_hash, status))
+        self.invalidate('users')
 
         #    # ✅ Safer: Check if leave balance exists before inserting
         #     balance_exists = self.conn.execute(
@@ -37,36 +50,83 @@ class User(Database):
             
         return cursor.lastrowid, employee_id
 
-    # In your User model (models/user_model.py)
-    def get_all(self, page=1, per_page=10):
-        offset = (page - 1) * per_page
+    def add_many(self, users):
+        """
+        Insert a batch of users (dicts with the add() fields) and return their
+        employee ids in order. Does not commit: run it inside transaction() so
+        the id reservation rolls back with the inserts, then invalidate 'users'.
+        """
+        start = self.employee_ids.reserve(len(users))
+        employee_ids = [format_employee_id(start + offset) for offset in range(len(users))]
+        self.conn.executemany('''
+            INSERT INTO users (
+                employee_id, name, email, phone, department,
+                role, password_hash, status
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (employee_id, user['name'], user['email'], user.get('phone'), user.get('department'),
+             user['role'], user['password_hash'], user.get('status', 'Active'))
+            for employee_id, user in zip(employee_ids, users)
+        ])
+        return employee_ids
+
+    def existing_emails(self, emails):
+        """The subset of `emails` that already belong to a user."""
+        emails = list(emails)
+        if not emails:
+            return set()
+        placeholders = ', '.join('?' * len(emails))
         cursor = self.conn.execute(
-            'SELECT * FROM users LIMIT ? OFFSET ?',
-            (per_page, offset)
+            f'SELECT email FROM users WHERE email IN ({placeholders})', emails
         )
+        return {row['email'] for row in cursor.fetchall()}
+
+    # In your User model (models/user_model.py)
+    def get_all(self, page=1, per_page=10, after=None):
+        # `after` is the keyset cursor (last id seen); it replaces OFFSET
+        if after is not None:
+            cursor = self.conn.execute(
+                'SELECT * FROM users WHERE id > ? ORDER BY id LIMIT ?',
+                (after[0], per_page)
+            )
+        else:
+            offset = (page - 1) * per_page
+            cursor = self.conn.execute(
+                'SELECT * FROM users ORDER BY id LIMIT ? OFFSET ?',
+                (per_page, offset)
+            )
         return [dict(row) for row in cursor.fetchall()]
 
     # Add count method for total pages calculation
     def get_total_count(self):
-        cursor = self.conn.execute('SELECT COUNT(*) FROM users')
-        return cursor.fetchone()[0]
+        return self.cached_count('users_total', ('users',), 'SELECT COUNT(*) FROM users')
 
     def get_total_search_count(self, name):
-        search_pattern = f"%{name}%"
-        cursor = self.conn.execute('''
-            SELECT COUNT(*) FROM users 
-            WHERE name LIKE ?
-        ''', (search_pattern,))
-        return cursor.fetchone()[0]
+        """Returns (count, is_estimate) for the name search."""
+        match = match_expression(name)
+        if match is None:
+            return self.get_total_count(), False
+        return self.estimated_count(
+            'users_search', ('users', 'employee_profiles'),
+            'SELECT 1 FROM employee_search WHERE employee_search MATCH ?', (match,)
+        )
 
     def search(self, name,page,per_page):
         offset = (page - 1) * per_page
-        search_pattern = f"%{name}%"
+        match = match_expression(name)
+        if match is None:
+            cursor = self.conn.execute(
+                'SELECT * FROM users ORDER BY id LIMIT ? OFFSET ?', (per_page, offset)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        # Prefix match over name, email, department, employee id and profile text, best hits first
         cursor = self.conn.execute('''
-            SELECT * FROM users 
-            WHERE name LIKE ? 
+            SELECT u.* FROM employee_search s
+            JOIN users u ON u.id = s.rowid
+            WHERE employee_search MATCH ?
+            ORDER BY s.rank
             LIMIT ? OFFSET ?
-        ''', (search_pattern, per_page, offset))
+        ''', (match, per_page, offset))
         
         # cursor = self.conn.execute('SELECT * FROM users WHERE name LIKE ?', (search_pattern,))
         return [dict(row) for row in cursor.fetchall()]
@@ -109,6 +169,7 @@ class User(Database):
                 f'''UPDATE users SET {', '.join(fields)} WHERE id = ?''',
                 tuple(values)
             )
+        self.invalidate('users')
 
     def inactive(self, employee_id):
         with self.conn:
@@ -116,10 +177,12 @@ class User(Database):
             'UPDATE users SET status = ?, updated_at = ? WHERE employee_id = ?',
             ('Inactive', datetime.now().isoformat(), employee_id)
         )
+        self.invalidate('users')
 
     def hard_delete_by_email(self, email):
         with self.conn:
             self.conn.execute("DELETE FROM users WHERE email = ?", (email,))
+        self.invalidate(*USER_OWNED_TABLES)
 
     # def hard_delete_by_employee_id(self, employee_id):
     #     with self.conn:
@@ -135,6 +198,7 @@ class User(Database):
 
         # Finally, delete the user
             self.conn.execute("DELETE FROM users WHERE employee_id = ?", (employee_id,))
+        self.invalidate(*USER_OWNED_TABLES)
 
 
 
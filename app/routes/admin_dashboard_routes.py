@@ -1,7 +1,10 @@
 from app.utils.auth import role_required
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.service.admin_dashboard_service import AdminDashboardService
-from flask import Blueprint, request, jsonify
+from app.service.admin_dashboard_service import EMPLOYEE_GROWTH_MAX_MONTHS, dashboard_service
+from app.config import Config
+from app.models.database import release_connection
+from app.utils.events import dashboard_events, format_sse
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 
 admin_bp = Blueprint('admin_bp', __name__)
 
@@ -9,17 +12,58 @@ admin_bp = Blueprint('admin_bp', __name__)
 @jwt_required()
 @role_required('Admin')
 def get_dashboard_stats():
-    service = AdminDashboardService()
-    stats = service.get_dashboard_stats()
+    stats = dashboard_service.get_dashboard_stats()
     return jsonify(stats), 200
 
+@admin_bp.route('/dashboard/stream', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def stream_dashboard():
+    """
+    Server-sent events for live dashboards. The first event is a `stats`
+    snapshot (from the shared dashboard cache); after that the stream carries
+    the deltas published by the attendance, leave and performance write paths
+    (punch, attendance_request, attendance_review, leave_request, leave_review,
+    course_submission, course_review). A `resync` event means updates were
+    missed and the client should refetch its figures.
+    """
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+    subscription = dashboard_events.subscribe(last_event_id)
+    stats = dashboard_service.get_dashboard_stats()
+    # The stream can stay open for hours; don't hold a pooled connection
+    release_connection()
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            if last_event_id is None:
+                yield format_sse('stats', stats)
+            while True:
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield format_sse('resync', {})
+                event = subscription.get(timeout=Config.DASHBOARD_STREAM_KEEPALIVE)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_sse(event['type'], dict(event['data'], at=event['at']), event['id'])
+        finally:
+            dashboard_events.unsubscribe(subscription)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 @admin_bp.route('/attendance/weekly-chart', methods=['GET'])
 @jwt_required()
 @role_required('Admin')
 def get_weekly_attendance_chart():
     department = request.args.get('department')  
-    service = AdminDashboardService()
-    data = service.get_weekly_attendance_for_chart(department)
+    data = dashboard_service.get_weekly_attendance_for_chart(department)
     return jsonify(data), 200
 
 @admin_bp.route('/dashboard/employee-growth', methods=['GET'])
@@ -29,8 +73,7 @@ def get_employee_growth():
     """Get employee growth data (monthly only)"""
     try:
         limit = int(request.args.get('limit', default=12))
-        service = AdminDashboardService()
-        growth_data = service.get_employee_growth_data(limit=limit)
+        growth_data = dashboard_service.get_employee_growth_data(limit=limit)
         
         return jsonify({
             'success': True,
@@ -41,7 +84,7 @@ def get_employee_growth():
     except ValueError:
         return jsonify({
             'success': False,
-            'error': 'Invalid limit parameter - must be a number'
+            'error': f'Invalid limit parameter - must be a number from 1 to {EMPLOYEE_GROWTH_MAX_MONTHS}'
         }), 400
     except Exception as e:
         return jsonify({
@@ -66,8 +109,7 @@ def get_department_counts():
         }
     """
     try:
-        service = AdminDashboardService()
-        department_counts = service.get_employee_counts_by_department()
+        department_counts = dashboard_service.get_employee_counts_by_department()
         
         return jsonify({
             'success': True,
@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.service import attendence_service
 from app.schemas.attendence_schema import ManualAttendanceSchema
 from app.utils.auth import role_required
+from app.utils.pagination import wants_total
 
 attendance_bp = Blueprint('attendance_bp', __name__)
 
@@ -54,10 +55,15 @@ def my_attendance():
 def all_my_attendance():
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
+    cursor = request.args.get('cursor')
+    include_total = wants_total(request.args)
 
     user = get_jwt_identity()
     employee_id = user["employee_id"]
-    records = attendence_service.get_all_employee_attendance(employee_id,page, per_page)
+    try:
+        records = attendence_service.get_all_employee_attendance(employee_id,page, per_page, cursor, include_total)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(records), 200
 
 @attendance_bp.route('/attendance/requests', methods=['GET'])
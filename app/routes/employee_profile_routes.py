@@ -4,6 +4,7 @@ from app.service import employee_profile_service, user_service
 from app.schemas.employee_profile_schema import EmployeeProfileSchema
 from flask_jwt_extended import jwt_required
 from app.utils.auth import role_required
+from app.utils.pagination import wants_total
 
 profile_bp = Blueprint('profile_routes', __name__)
 profile_schema = EmployeeProfileSchema()
@@ -44,11 +45,15 @@ def get_all_profiles():
         limit = int(request.args.get('limit', 50))
         offset = int(request.args.get('offset', 0))
         key = request.args.get('key', '').strip()
+        cursor = request.args.get('cursor')
+        include_total = wants_total(request.args)
         
-        profiles = employee_profile_service.get_all_profiles(limit, offset, key)
+        profiles = employee_profile_service.get_all_profiles(limit, offset, key, cursor, include_total)
 
         # No field removal — return full profile info
         return jsonify(profiles), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -4,7 +4,8 @@ from flask import Blueprint, request, jsonify
 from app.service.leave_service import LeaveService
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.auth import role_required
-from app.schemas.leave_schema import LeaveApplySchema, LeaveStatusUpdateSchema
+from app.utils.pagination import wants_total
+from app.schemas.leave_schema import HolidaySchema, LeaveApplySchema, LeaveDecisionSchema, LeaveStatusUpdateSchema
 
 leave_bp = Blueprint('leave_routes', __name__)
 leave_service = LeaveService()
@@ -27,7 +28,9 @@ def apply_leave():
         data['leave_type'],
         str(data['start_date']),
         str(data['end_date']),
-        data['reason']
+        data['reason'],
+        bool(data.get('start_half', False)),
+        bool(data.get('end_half', False))
     )
     return jsonify(result), code
 
@@ -44,6 +47,28 @@ def get_balance():
         return jsonify({'error': 'Balance not found'}), 404
     return jsonify(balance), 200
 
+@leave_bp.route('/leave/ledger', methods=['GET'])
+@jwt_required()
+def get_leave_ledger():
+    """Balance history (newest first); admins may pass ?employee_id= for anyone's."""
+    identity = get_jwt_identity()
+    employee_id = identity.get('employee_id')
+    if not employee_id:
+        return jsonify({'error': 'Invalid token: employee_id missing'}), 401
+    requested = request.args.get('employee_id')
+    if requested and requested != employee_id:
+        if identity.get('role') != 'Admin':
+            return jsonify({'error': 'Unauthorized access'}), 403
+        employee_id = requested
+
+    page = request.args.get('page', default=1, type=int)
+    per_page = request.args.get('per_page', default=20, type=int)
+    result, code = leave_service.get_ledger(
+        employee_id, request.args.get('leave_type'), page, per_page,
+        request.args.get('cursor'), wants_total(request.args)
+    )
+    return jsonify(result), code
+
 @leave_bp.route('/leave/my', methods=['GET'])
 @jwt_required()
 def get_my_leaves():
@@ -73,13 +98,43 @@ def update_leave_status(leave_id):
     result, code = leave_service.update_leave_status(leave_id, data['status'], approver_id)
     return jsonify(result), code
 
+@leave_bp.route('/leave/status/bulk', methods=['PUT'])
+@jwt_required()
+@role_required('Admin')
+def update_leave_statuses():
+    """
+    Body: {"decisions": [{"leave_id": 1, "status": "Approved"}, ...]}
+    or {"leave_ids": [1, 2, ...], "status": "Approved"}.
+    """
+    identity = get_jwt_identity()
+    approver_id = identity.get('employee_id')
+    if not approver_id:
+        return jsonify({'error': 'Invalid token: employee_id missing'}), 401
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get('leave_ids'), list):
+        decisions = [{'leave_id': leave_id, 'status': data.get('status')} for leave_id in data['leave_ids']]
+    else:
+        decisions = data.get('decisions') if isinstance(data, dict) else data
+    if not isinstance(decisions, list) or not decisions:
+        return jsonify({'error': 'Expected {"decisions": [...]} or {"leave_ids": [...], "status": ...}'}), 400
+    if (errors := LeaveDecisionSchema(many=True).validate(decisions)):
+        return jsonify({'errors': errors}), 400
+
+    result, code = leave_service.update_leave_statuses(decisions, approver_id)
+    if code == 200 and result['failed']:
+        code = 207 if result['reviewed'] else 400
+    return jsonify(result), code
+
 @leave_bp.route('/leave/pending', methods=['GET'])
 @jwt_required()
 @role_required('Admin')
 def get_pending_leaves():
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
-    result, code = leave_service.get_pending_leaves(page, per_page)
+    cursor = request.args.get('cursor')
+    include_total = wants_total(request.args)
+    result, code = leave_service.get_pending_leaves(page, per_page, cursor, include_total)
     return jsonify(result), code
 
 
@@ -92,12 +147,60 @@ def search_employee_leaves():
     end_date = request.args.get('end_date')
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
+    include_total = wants_total(request.args)
 
     if not name or not start_date or not end_date:
         return jsonify({'error': 'name, start_date, and end_date are required'}), 400
 
     result, code = leave_service.get_employee_leave_details(
-        name, start_date, end_date, page, per_page
+        name, start_date, end_date, page, per_page, include_total
     )
     return jsonify(result), code
 
+
+@leave_bp.route('/leave/calendar', methods=['GET'])
+@jwt_required()
+def get_leave_calendar():
+    """Who is off each day; employees see their own department, admins any (or all)."""
+    identity = get_jwt_identity()
+    start_date = request.args.get('from')
+    end_date = request.args.get('to')
+    if not start_date or not end_date:
+        return jsonify({'error': 'from and to are required'}), 400
+
+    department = request.args.get('department')
+    if identity.get('role') != 'Admin':
+        if department and department != identity.get('department'):
+            return jsonify({'error': 'Unauthorized access'}), 403
+        department = identity.get('department')
+
+    result, code = leave_service.get_calendar(start_date, end_date, department)
+    return jsonify(result), code
+
+
+@leave_bp.route('/leave/holidays', methods=['GET'])
+@jwt_required()
+def get_holidays():
+    year = request.args.get('year', type=int)
+    return jsonify(leave_service.get_holidays(year)), 200
+
+
+@leave_bp.route('/leave/holidays', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def add_holiday():
+    data = request.get_json()
+    schema = HolidaySchema()
+    if (errors := schema.validate(data)):
+        return jsonify({'errors': errors}), 400
+
+    result, code = leave_service.add_holiday(str(data['date']), data['name'])
+    return jsonify(result), code
+
+
+@leave_bp.route('/leave/holidays/<day>', methods=['DELETE'])
+@jwt_required()
+@role_required('Admin')
+def delete_holiday(day):
+    result, code = leave_service.delete_holiday(day)
+    return jsonify(result), code
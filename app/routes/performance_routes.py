@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.service.performance_service import performance_service
 from app.utils.auth import role_required
+from app.utils.pagination import wants_total
 
 performance_bp = Blueprint('performance_routes', __name__)
 
@@ -109,7 +110,12 @@ def review_submission(submission_id):
 def view_all_submissions():
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
-    result = performance_service.get_all_submissions(page, per_page)
+    cursor = request.args.get('cursor')
+    include_total = wants_total(request.args)
+    try:
+        result = performance_service.get_all_submissions(page, per_page, cursor, include_total)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(result), 200
 
 
@@ -1,18 +1,17 @@
-from flask import Blueprint, request, jsonify, send_file
+import os
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.config import Config
 from app.utils.auth import role_required
-from app.schemas.salary_schema import SalaryRecordSchema
-from app.service.salary_service import SalaryService
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from app.models.user import User
-import csv
+from app.utils.pagination import wants_total
+from app.schemas.salary_schema import PayrollSimulationSchema, SalaryRecordSchema
+from app.service.salary_service import EXPORT_FORMATS, SalaryService
 from datetime import datetime, timedelta, date
 
 salary_bp = Blueprint('salary', __name__)
 salary_service = SalaryService()
 salary_schema = SalaryRecordSchema()
+simulation_schema = PayrollSimulationSchema()
 
 @salary_bp.route('/salary/add', methods=['POST'])
 @jwt_required()
@@ -28,6 +27,25 @@ def add_salary_record():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@salary_bp.route('/salary/run', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def run_payroll():
+    identity = get_jwt_identity()
+    result, status = salary_service.run_payroll(request.args.get('month'), identity['employee_id'])
+    return jsonify(result), status
+
+@salary_bp.route('/salary/simulate', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def simulate_payroll():
+    data = request.get_json(silent=True) or {}
+    errors = simulation_schema.validate(data)
+    if errors:
+        return jsonify({"errors": errors}), 400
+    result, status = salary_service.simulate_payroll(request.args.get('month'), simulation_schema.load(data))
+    return jsonify(result), status
+
 @salary_bp.route('/salary/my-records', methods=['GET'])
 @jwt_required()
 def view_my_salary():
@@ -54,90 +72,26 @@ def download_payslip():
         return jsonify({"message": "Month (YYYY-MM) is required as a query parameter"}), 400
 
     identity = get_jwt_identity()
-    current_user_email = identity['email']
-
-    user_model = User()
-    user = user_model.get_by_email(current_user_email)
-
-    if not user:
-        return jsonify({"message": "Employee not found"}), 404
-
-    employee_id = user['employee_id']
-    records = salary_service.get_salary_by_month_payslip(employee_id, month)
-
-    if not records:
+    employee_id = identity['employee_id']
+    record = salary_service.get_payslip_record(employee_id, month)
+    if not record:
         return jsonify({"message": "No salary record found for the specified month"}), 404
 
-    # Generate PDF
-    pdf_buffer = BytesIO()
-    p = canvas.Canvas(pdf_buffer, pagesize=A4)
-    p.setFont("Helvetica", 12)
-
-    y = 800
-    p.drawString(50, y, f"Payslip for: {user['name']} ({employee_id})")
-    y -= 20
-
-    # total_basic = 0
-    # total_bonus = 0
-    # total_deductions = 0
-    # total_net = 0
-
-    # for i, rec in enumerate(records, start=1):
-    #     basic = rec['basic_salary']
-    #     bonus = rec['bonus']
-    #     deductions = rec['deductions']
-    #     net = rec['direct_deposit_amount']
-
-    #     total_basic += basic
-    #     total_bonus += bonus
-    #     total_deductions += deductions
-    #     total_net += net
-
-    #     p.drawString(50, y, f"Entry {i}: {rec['salary_month']} - {rec['pay_frequency']}")
-    #     y -= 20
-    #     p.drawString(50, y, f"Basic: {basic} {rec['currency']},")
-    #     y -= 20
-    #     p.drawString(50, y, f"Bonus: {bonus} {rec['currency']}, Deductions: {deductions} {rec['currency']}, Net: {net} {rec['currency']}")
-    #     y -= 30
-
-    # # Summary
-    # p.drawString(50, y, "-" * 45)
-    # y -= 20
-    # p.drawString(50, y, f"Total Basic: {total_basic}")
-    # y -= 20
-    # p.drawString(50, y, f"Total Bonus: {total_bonus}")
-    # y -= 20
-    # p.drawString(50, y, f"Total Deductions: {total_deductions}")
-    # y -= 20
-    # p.drawString(50, y, f"Total Net Pay: {total_net}")
-    basic = records['basic_salary']
-    bonus = records['bonus']
-    deductions = records['deductions']
-    net = records['direct_deposit_amount']
-
-    p.drawString(50, y, f"Month: {records['salary_month']} - {records['pay_frequency']}")
-    y -= 20
-    p.drawString(50, y, f"Basic: {basic} {records['currency']}")
-    y -= 20
-    p.drawString(50, y, f"Bonus: {bonus} {records['currency']}")
-    y -= 20
-    p.drawString(50, y, f"Deductions: {deductions} {records['currency']}")
-    y -= 20
-    p.drawString(50, y, f"Net Pay: {net} {records['currency']}")
-
-    p.showPage()
-    p.save()
-    pdf_buffer.seek(0)
-
-
-    filename = f"Payslip_{employee_id}_{month}.pdf"
+    # The ETag is the cache key, so a revalidation never touches the PDF
+    etag = record['etag']
+    if etag in request.if_none_match:
+        return '', 304, {'ETag': f'"{etag}"', 'Cache-Control': 'private, no-cache'}
 
-    return send_file(
-        pdf_buffer,
+    response = send_file(
+        salary_service.open_payslip(record),
         mimetype='application/pdf',
-        download_name=filename,
-        as_attachment=True
+        download_name=f"Payslip_{employee_id}_{month}.pdf",
+        as_attachment=True,
+        etag=etag
     )
+    # Per-employee document: browsers may keep it but must revalidate
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @salary_bp.route('/salary/employee/<employee_id>', methods=['GET'])
@@ -162,64 +116,91 @@ def get_all_salary_records():
      # Get pagination parameters from query string
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
+    cursor = request.args.get('cursor')
+    include_total = wants_total(request.args)
     # Get paginated results
-    result = salary_service.get_all_employees_salary_records(page, per_page)
+    try:
+        result = salary_service.get_all_employees_salary_records(page, per_page, cursor, include_total)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(result)
     
+@salary_bp.route('/salary/export', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def export_salary_records():
+    """Stream salary records (optionally ?employee_id= / ?month=) as CSV or NDJSON."""
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    chunks = salary_service.export_salary_records(fmt, request.args.get('employee_id'), request.args.get('month'))
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=salary_records_export.{fmt}',
+        'X-Accel-Buffering': 'no',
+    })
+
 @salary_bp.route('/salary/export-pdf', methods=['GET'])
 @jwt_required()
 @role_required('Admin')
 def export_salary_records_pdf():
+    """
+    Salary records report as a PDF. Up to Config.PDF_ASYNC_THRESHOLD rows it
+    is rendered in the request; larger exports are handed to a background
+    job and the response is 202 with the job to poll (as POST .../jobs).
+    """
     employee_id = request.args.get('employee_id')  # Optional
     month = request.args.get('month')  # Optional
 
-    records = salary_service.get_filtered_salary_records(employee_id, month)
-
-    if not records:
+    rows = salary_service.count_salary_records(employee_id, month)
+    if not rows:
         return jsonify({"message": "No records found"}), 404
+    if rows > Config.PDF_ASYNC_THRESHOLD:
+        return _start_pdf_job(employee_id, month, rows)
+
+    return send_file(
+        salary_service.salary_pdf(employee_id, month),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name='salary_records_export.pdf'
+    )
 
-    pdf_buffer = BytesIO()
-    p = canvas.Canvas(pdf_buffer, pagesize=A4)
-    width, height = A4
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(200, height - 40, "Salary Records Report")
-
-    p.setFont("Helvetica", 10)
-    y = height - 70
-    headers = ["Emp ID", "Name", "Month", "Basic", "Bonus", "Deductions", "Net Pay", "Currency"]
-    col_widths = [60, 100, 60, 50, 50, 60, 60, 50]
-    x_positions = [50, 110, 210, 270, 320, 370, 440, 500]
-
-    # Draw header
-    for i, header in enumerate(headers):
-        p.drawString(x_positions[i], y, header)
-    y -= 20
-
-    for record in records:
-        if y < 50:  # Start a new page if space runs out
-            p.showPage()
-            y = height - 50
-            p.setFont("Helvetica", 10)
-
-        values = [
-            record['employee_id'],
-            record.get('name', 'N/A'),
-            record['salary_month'],
-            str(record['basic_salary']),
-            str(record['bonus']),
-            str(record['deductions']),
-            str(record['direct_deposit_amount']),
-            record['currency']
-        ]
-        for i, value in enumerate(values):
-            p.drawString(x_positions[i], y, value)
-        y -= 20
-
-    p.save()
-    pdf_buffer.seek(0)
+def _start_pdf_job(employee_id, month, rows):
+    identity = get_jwt_identity()
+    job = salary_service.start_salary_pdf_job(employee_id, month, rows, identity['employee_id'])
+    location = url_for('salary.get_salary_pdf_job', job_id=job['id'])
+    return jsonify(dict(_public_job(job), url=location)), 202, {'Location': location}
+
+def _public_job(job):
+    return {key: value for key, value in job.items() if key != 'path'}
 
+@salary_bp.route('/salary/export-pdf/jobs', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def create_salary_pdf_job():
+    employee_id = request.args.get('employee_id')
+    month = request.args.get('month')
+    rows = salary_service.count_salary_records(employee_id, month)
+    if not rows:
+        return jsonify({"message": "No records found"}), 404
+    return _start_pdf_job(employee_id, month, rows)
+
+@salary_bp.route('/salary/export-pdf/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def get_salary_pdf_job(job_id):
+    """The finished PDF, or 202 with the job status while it is still rendering."""
+    job = salary_service.get_report_job(job_id)
+    if not job or job['kind'] != 'salary_pdf':
+        return jsonify({"error": "Export job not found"}), 404
+    if job['status'] == 'failed':
+        return jsonify(_public_job(job)), 500
+    if job['status'] != 'done':
+        return jsonify(_public_job(job)), 202
+    if not os.path.exists(job['path']):
+        return jsonify({"error": "Export has expired"}), 410
     return send_file(
-        pdf_buffer,
+        job['path'],
         mimetype='application/pdf',
         as_attachment=True,
         download_name='salary_records_export.pdf'
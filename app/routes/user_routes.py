@@ -7,7 +7,10 @@ from app.utils.token_util import generate_token
 from flask_jwt_extended import create_access_token
 from flask_jwt_extended import jwt_required
 from app.utils.auth import role_required
+from app.utils.pagination import wants_total
 import sqlite3
+import codecs
+import csv
 
 user_bp = Blueprint('user_routes', __name__)
 user_schema = UserSchema()
@@ -45,7 +48,32 @@ def add_user():
     except Exception as e:
         return jsonify(result), 400
 
- 
+
+@user_bp.route('/users/bulk', methods=['POST'])
+@jwt_required()
+@role_required("Admin")
+def bulk_add_users():
+    # CSV arrives as a text/csv body or a multipart "file" upload; it is read
+    # line by line instead of being buffered whole
+    if 'file' in request.files:
+        rows = csv.DictReader(codecs.iterdecode(request.files['file'].stream, 'utf-8-sig'))
+    elif request.mimetype == 'text/csv':
+        rows = csv.DictReader(codecs.iterdecode(request.stream, 'utf-8-sig'))
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get('users') if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            return jsonify({'error': 'Expected a JSON list of users, {"users": [...]} or a CSV upload'}), 400
+
+    report = user_service.bulk_create_users(rows)
+    if report['failed'] == 0:
+        code = 201
+    elif report['created']:
+        code = 207
+    else:
+        code = 400
+    return jsonify(report), code
+
 
 @jwt_required()
 @role_required("Admin")
@@ -54,9 +82,14 @@ def get_all_users():
     # Get pagination parameters from query string
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
+    cursor = request.args.get('cursor')
+    include_total = wants_total(request.args)
     
     # Get paginated results
-    result = user_service.get_users(page, per_page)
+    try:
+        result = user_service.get_users(page, per_page, cursor, include_total)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     
     # Remove passwords from the response
@@ -73,8 +106,9 @@ def search_user():
     page = request.args.get('page', default=1, type=int)
     per_page = request.args.get('per_page', default=10, type=int)
     name = request.args.get('name', '')
+    include_total = wants_total(request.args)
 
-    users = user_service.search_users(name,page, per_page)
+    users = user_service.search_users(name,page, per_page, include_total)
     
     # Remove password_hash from each user dict
     for user in users['items']:
@@ -7,6 +7,17 @@ class LeaveApplySchema(Schema):
     start_date = fields.Date(required=True)
     end_date = fields.Date(required=True)
     reason = fields.Str(required=True)
+    # Take the first/last day as half a day
+    start_half = fields.Bool(load_default=False)
+    end_half = fields.Bool(load_default=False)
 
 class LeaveStatusUpdateSchema(Schema):
     status = fields.Str(required=True)
+
+class LeaveDecisionSchema(Schema):
+    leave_id = fields.Int(required=True, strict=True)
+    status = fields.Str(required=True)
+
+class HolidaySchema(Schema):
+    date = fields.Date(required=True)
+    name = fields.Str(required=True)
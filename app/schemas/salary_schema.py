@@ -8,4 +8,16 @@ class SalaryRecordSchema(Schema):
     deductions = fields.Float(load_default=0)
     currency = fields.Str(load_default='NZD')
     pay_frequency = fields.Str(load_default='Monthly')
-    direct_deposit_amount = fields.Float(load_default=None)
\ No newline at end of file
+    direct_deposit_amount = fields.Float(load_default=None)
+
+
+class TaxBracketSchema(Schema):
+    upper = fields.Float(load_default=None, allow_none=True)  # None = top bracket
+    rate = fields.Float(required=True, validate=validate.Range(min=0, max=1))
+
+
+class PayrollSimulationSchema(Schema):
+    # Each field left out keeps the configured value (Config.PAYROLL_*)
+    tax_brackets = fields.List(fields.Nested(TaxBracketSchema))
+    deduction_rate = fields.Float(validate=validate.Range(min=0, max=1))
+    fx_rates = fields.Dict(keys=fields.Str(), values=fields.Float(validate=validate.Range(min=0, min_inclusive=False)))
@@ -1,20 +1,28 @@
 from app.models.admin_dashboard import AdminDashboard
+from app.utils.cache import dashboard_cache
+from app.utils.logger import logger
 from typing import Dict, Any, List
-from datetime import datetime
-from collections import defaultdict
+from datetime import date
+
+# Longest employee growth window (in months) a request may ask for
+EMPLOYEE_GROWTH_MAX_MONTHS = 120
 
 class AdminDashboardService:
     def __init__(self):
         self.model = AdminDashboard()
 
+    def _cached(self, key, tables, compute):
+        """
+        Serve a dashboard figure from the shared dashboard cache. Entries are
+        dropped when `tables` are written and expire after DASHBOARD_CACHE_TTL.
+        """
+        return dashboard_cache.get_or_set((self.model.pool.database,) + key, tables, compute)
+
     def get_dashboard_stats(self) -> Dict[str, Any]:
         """Get all admin dashboard statistics in a single call"""
-        return {
-            'total_employees': self.model.get_total_active_employees(),
-            'pending_requests': self.model.get_pending_attendance_requests(),
-            'approved_requests': self.model.get_approved_attendance_requests(),
-            'employees_on_leave': self.model.get_employees_on_leave_today()
-        }
+        # "On leave" is per day, so a new day gets a fresh entry
+        return self._cached(('stats', date.today().isoformat()), ('users', 'attendance'),
+                            self.model.get_dashboard_stats)
     
     # def get_weekly_attendance_for_chart(self, department: str = None) -> List[Dict[str, any]]:
     #     """
@@ -44,46 +52,14 @@ class AdminDashboardService:
 
 
     def get_weekly_attendance_for_chart(self, department: str = None) -> List[Dict[str, Any]]:
+        """
+        Get weekly attendance data for charts: one grouped query over the
+        week's attendance returns all seven days, zero-filled and Mon-Sun ordered.
+        """
         try:
-            raw_data = self.model.get_present_employees_this_week()
-
-            # Initialize summary dict with day names as keys and counts for present/absent
-            week_summary = defaultdict(lambda: {'present': 0, 'absent': 0, 'date': ''})
-
-            for record in raw_data:
-                date_str = record['date']  # e.g., '2025-07-07'
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                day_name = date_obj.strftime('%a')  # 'Mon', 'Tue', etc.
-
-                # Use full day name or abbreviated consistently (here abbreviated)
-                # Count present if approval_status is 'Approved', else absent
-                if record.get('approval_status') == 'Approved':
-                    week_summary[day_name]['present'] += 1
-                else:
-                    week_summary[day_name]['absent'] += 1
-
-                # Store the date string (last occurrence will be stored, which is fine)
-                week_summary[day_name]['date'] = date_str
-
-            # Ensure all days of the week are present in summary (Mon-Sun)
-            all_days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-            data = []
-            for day in all_days:
-                counts = week_summary.get(day, {'present': 0, 'absent': 0, 'date': ''})
-                total = counts['present'] + counts['absent']
-                attendance_rate = round((counts['present'] / total) * 100, 2) if total > 0 else 0.0
-                data.append({
-                    'name': day,
-                    'present': counts['present'],
-                    'absent': counts['absent'],
-                    'attendance_rate': attendance_rate,
-                    'date': counts['date']
-                })
-
-            return data
-
+            return self.model.get_weekly_attendance_for_chart(department)
         except Exception as e:
-            print(f"Error getting weekly attendance: {str(e)}")
+            logger.error(f"Error getting weekly attendance: {str(e)}")
             return self._get_empty_week_template()
 
 
@@ -109,43 +85,16 @@ class AdminDashboardService:
             List of dictionaries with:
             - month: Month name (e.g., 'Jan')
             - employees: Cumulative employee count
+        Raises ValueError unless 1 <= limit <= EMPLOYEE_GROWTH_MAX_MONTHS.
         """
+        if not 1 <= limit <= EMPLOYEE_GROWTH_MAX_MONTHS:
+            raise ValueError(f"limit must be between 1 and {EMPLOYEE_GROWTH_MAX_MONTHS}")
         try:
-            raw_data = self.model.get_employee_growth_data()
-            
-            if not raw_data:
-                return []
-
-            # Process into monthly cumulative counts
-            monthly_counts = {}
-            cumulative_count = 0
-            
-            for record in raw_data:
-                date = datetime.strptime(record['date'], '%Y-%m-%d')
-                month_key = date.strftime('%Y-%m')  # Group by month
-                
-                if month_key not in monthly_counts:
-                    monthly_counts[month_key] = {
-                        'count': 0,
-                        'label': date.strftime('%b')  # Jan, Feb, etc.
-                    }
-                monthly_counts[month_key]['count'] += 1
-            
-            # Convert to sorted list with cumulative counts
-            sorted_months = sorted(monthly_counts.items(), key=lambda x: x[0])
-            
-            processed_data = []
-            for month_key, data in sorted_months[-limit:]:
-                cumulative_count += data['count']
-                processed_data.append({
-                    'month': data['label'],
-                    'employees': cumulative_count
-                })
-            
-            return processed_data
-
+            # The window ends at the current month, so a new month gets a fresh entry
+            return self._cached(('employee_growth', limit, date.today().strftime('%Y-%m')), ('users',),
+                                lambda: self.model.get_employee_growth_data(limit))
         except Exception as e:
-            print(f"Error getting employee growth data: {str(e)}")
+            logger.error(f"Error getting employee growth data: {str(e)}")
             return []
 
     def _get_empty_week_template(self) -> List[Dict[str, any]]:
@@ -168,7 +117,11 @@ class AdminDashboardService:
             Example: {'HR': 5, 'IT': 12, 'Finance': 8}
         """
         try:
-            return self.model.get_employee_counts_by_department()
+            return self._cached(('department_counts',), ('users',),
+                                self.model.get_employee_counts_by_department)
         except Exception as e:
             print(f"Error getting department counts: {str(e)}")
-            return {}  # Return empty dict on error
\ No newline at end of file
+            return {}  # Return empty dict on error
+
+
+dashboard_service = AdminDashboardService()
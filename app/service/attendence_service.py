@@ -1,25 +1,88 @@
 # --- services/attendance_service.py ---
+from app.config import Config
 from app.models.attendence import Attendence
+from app.models.punch_queue import get_punch_queue
+from app.utils.events import publish
+from app.utils.pagination import decode_cursor, next_cursor, page_count
 
 attendance_model = Attendence()
 
 def punch_in(employee_id):
-    attendance_model.punch_in(employee_id)
+    if Config.ATTENDANCE_WRITE_BEHIND:
+        get_punch_queue().enqueue(employee_id, 'in')
+    else:
+        attendance_model.punch_in(employee_id)
+    publish('punch', employee_id=employee_id, kind='in')
 
 def punch_out(employee_id):
-    attendance_model.punch_out(employee_id)
+    if Config.ATTENDANCE_WRITE_BEHIND:
+        get_punch_queue().enqueue(employee_id, 'out')
+    else:
+        attendance_model.punch_out(employee_id)
+    publish('punch', employee_id=employee_id, kind='out')
 
 def manual_request(employee_id, data):
     attendance_model.manual_request(employee_id, data)
+    publish('attendance_request', employee_id=employee_id, date=data['date'],
+            approval_status=data.get('approval_status', 'Pending'))
 
 def approve_request(record_id,approver_id):
-   return attendance_model.approve_manual(record_id,approver_id)
+    res = attendance_model.approve_manual(record_id,approver_id)
+    if res[1] == 200:
+        publish('attendance_review', record_id=record_id, approval_status='Approved')
+    return res
 
 def reject_request(record_id, reason,approver_id):
-    return attendance_model.reject_request(record_id, reason,approver_id)
+    res = attendance_model.reject_request(record_id, reason,approver_id)
+    if res[1] == 200:
+        publish('attendance_review', record_id=record_id, approval_status='Rejected')
+    return res
 
 def get_employee_attendance(employee_id, start_date=None, end_date=None, sort_by="punch_in", order="asc"):
-    return attendance_model.get_by_employee(employee_id, start_date, end_date, sort_by, order)
+    # Read the queue before the table: an event flushed in between is then
+    # found in attendance (and skipped below) instead of being missed by both
+    pending = get_punch_queue().pending_for(employee_id) if Config.ATTENDANCE_WRITE_BEHIND else []
+    records = attendance_model.get_by_employee(employee_id, start_date, end_date, sort_by, order)
+    if pending:
+        records = _overlay_pending_punches(records, pending, start_date, end_date, sort_by, order)
+    return records
+
+
+def _overlay_pending_punches(records, pending, start_date, end_date, sort_by, order):
+    """Apply not-yet-flushed punches to `records` the way apply_punches will."""
+    recorded = {(record['date'], record['punch_in']) for record in records}
+    for event in pending:
+        if (start_date and event['date'] < start_date) or (end_date and event['date'] > end_date):
+            continue
+        if event['kind'] == 'in':
+            if (event['date'], event['at']) in recorded:
+                continue  # flushed after we read the queue
+            recorded.add((event['date'], event['at']))
+            records.append({
+                'id': None,
+                'employee_id': event['employee_id'],
+                'punch_in': event['at'],
+                'punch_out': None,
+                'date': event['date'],
+                'status': 'On Time',
+                'is_manual': 0,
+                'approval_status': 'Approved',
+                'rejection_reason': None,
+                'created_at': event['at'],
+                'updated_at': event['at'],
+                'pending': True
+            })
+        else:
+            for record in records:
+                if record['date'] == event['date']:
+                    record['punch_out'] = event['at']
+
+    if sort_by not in ["punch_in", "punch_out", "date"]:
+        sort_by = "punch_in"
+    # NULLs first, as SQLite orders them
+    records.sort(key=lambda record: (record[sort_by] is not None, record[sort_by] or ''),
+                 reverse=order.lower() == "desc")
+    return records
 
 
 def get_pending_requests(page=1, per_page=10):
@@ -40,15 +103,17 @@ def get_attendance_by_name_and_period(name, start_date, end_date):
 # def get_all_employee_attendance(employee_id):
 #     return attendance_model.get_all_employee_records(employee_id)
 
-def get_all_employee_attendance(employee_id, page=1, per_page=10):
+def get_all_employee_attendance(employee_id, page=1, per_page=10, cursor=None, include_total=True):
     # items, total = attendance_model.get_all_employee_records(employee_id, page, per_page)
-    items = attendance_model.get_all_employee_records(employee_id, page, per_page)
-    total = attendance_model.get_all_employee_records_of_employee(employee_id)
+    after = decode_cursor(cursor, 2) if cursor else None
+    items = attendance_model.get_all_employee_records(employee_id, page, per_page, after)
+    total = attendance_model.get_all_employee_records_of_employee(employee_id) if include_total else None
     return {
         'items': items,
         'total': total,
         'page': page,
         'per_page': per_page,
-        'total_pages': (total + per_page - 1)
+        'total_pages': page_count(total, per_page),
+        'next_cursor': next_cursor(items, per_page, 'date', 'id')
     }
 
@@ -1,5 +1,6 @@
 # app/service/employee_profile_service.py
 from app.models.employee_profile import EmployeeProfile
+from app.utils.pagination import decode_cursor, next_cursor, page_count
 
 profile_model = EmployeeProfile()
 
@@ -12,14 +13,16 @@ def get_profile_by_employee_id(employee_id):
 def update_profile(user_id, data):
     profile_model.update_profile(user_id, data)
 
-def get_all_profiles(limit=50, offset=1,key=''):
-    profiles = profile_model.get_all(limit, offset,key)
-    total = profile_model.get_total_profile_count()
+def get_all_profiles(limit=50, offset=1,key='', cursor=None, include_total=True):
+    after = decode_cursor(cursor, 2) if cursor else None
+    profiles = profile_model.get_all(limit, offset,key, after)
+    total = profile_model.get_total_profile_count() if include_total else None
     return {
         'items': profiles,
         'total': total,
         'page': offset // limit + 1,
         'per_page': limit,
-        'total_pages': (total + limit - 1) // limit
+        'total_pages': page_count(total, limit),
+        'next_cursor': next_cursor(profiles, limit, 'name', 'id')
     }
     # return profile_model.get_all(limit, offset,key)
@@ -1,18 +1,53 @@
 # app/service/leave_service.py
 
-from app.models.leave import Leave
+from app.config import Config
+from app.models.holiday import Holiday
+from app.models.leave import LEAVE_TYPES, Leave
 from app.models.user import User
-from dateutil.rrule import rrule, DAILY
+from app.utils.leave_days import parse_day
 from dateutil.parser import parse as parse_date
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
+from app.utils.events import publish
+from app.utils.pagination import decode_cursor, next_cursor, page_count
+
+# Longest range GET /leave/calendar expands day by day
+CALENDAR_MAX_DAYS = 366
+
+
+def _as_number(days):
+    """3.0 -> 3, 2.5 stays 2.5 (durations are whole or half days)."""
+    return int(days) if days == int(days) else days
+
 
 class LeaveService:
     def __init__(self):
         self.leave_model = Leave()
         self.user_model = User()
+        self.holiday_model = Holiday()
 
-    def apply_leave(self, employee_id, leave_type, start_date, end_date, reason):
-        leave_days = len(list(rrule(DAILY, dtstart=parse_date(start_date), until=parse_date(end_date))))
+    def leave_days(self, leave_type, start_date, end_date, start_half=False, end_half=False):
+        """Duration of a leave: working days for Config.LEAVE_WORKING_DAY_TYPES, else calendar days."""
+        days = self.holiday_model.calendar().duration(
+            start_date, end_date,
+            working=leave_type.lower() in Config.LEAVE_WORKING_DAY_TYPES,
+            start_half=start_half, end_half=end_half
+        )
+        return _as_number(days)
+
+    def _stored_days(self, leave):
+        if leave.get("days") is not None:
+            return _as_number(leave["days"])
+        return self.leave_days(leave["leave_type"], leave["start_date"], leave["end_date"],
+                               leave.get("start_half"), leave.get("end_half"))
+
+    def apply_leave(self, employee_id, leave_type, start_date, end_date, reason,
+                    start_half=False, end_half=False):
+        if parse_day(end_date) < parse_day(start_date):
+            return {"error": "end_date cannot be before start_date"}, 400
+        leave_days = self.leave_days(leave_type, start_date, end_date, start_half, end_half)
+        if leave_days == 0:
+            return {"error": "The requested period has no working days"}, 400
         column_map = {
             'annual': 'annual',
             'casual': 'casual',
@@ -32,7 +67,16 @@ class LeaveService:
         # leave_id = self.leave_model.apply_leave(employee_id, leave_type, start_date, end_date, reason)
         # self.leave_model.deduct_leave_balance(employee_id, column_name, leave_days)
 
-        leave_id = self.leave_model.apply_leave(employee_id, leave_type, start_date, end_date, reason)
+        leave_id, conflict = self.leave_model.apply_leave(employee_id, leave_type, start_date, end_date, reason,
+                                                          leave_days, start_half, end_half)
+        if conflict:
+            return {
+                "error": f"Overlaps your {conflict['status'].lower()} {conflict['leave_type']} leave "
+                         f"from {conflict['start_date']} to {conflict['end_date']}",
+                "conflicting_leave_id": conflict["id"]
+            }, 409
+        publish('leave_request', leave_id=leave_id, employee_id=employee_id, leave_type=leave_type,
+                start_date=start_date, end_date=end_date, days=leave_days)
 
         return {"message": "Leave applied successfully", "days": leave_days, "leave_id": leave_id}, 201
 
@@ -52,72 +96,170 @@ class LeaveService:
             return {"error": "Approver not found"}, 404
         if approver["role"].lower() != "admin":
             return {"error": "Only admins can approve/reject leaves"}, 403
-        if leave["employee_id"] == approver_id:
-            return {"error": "Admins cannot approve their own leave requests"}, 403
+        error = self._review_error(leave, status, approver_id)
+        if error:
+            return error
 
-        applicant = self.user_model.get_by_employee_id(leave["employee_id"])
-        if applicant and applicant["role"].lower() == "admin" and approver_id == leave["employee_id"]:
-            return {"error": "Admins cannot approve their own leave"}, 403
-        if status not in ["Approved", "Rejected"]:
-            return {"error": "Invalid status. Must be Approved or Rejected"}, 400
-        
-        # ── If approving, validate balance and deduct ───────────────────────────
-        if status == "Approved":
-            # 1. Calculate number of days in request (inclusive of both ends)
-            leave_days = len(
-                list(
-                    rrule(
-                        DAILY,
-                        dtstart=parse_date(leave["start_date"]),
-                        until=parse_date(leave["end_date"]),
-                    )
-                )
-            )
+        # Days in the request (stored when it was applied for)
+        leave_days = self._stored_days(leave) if status == "Approved" else None
 
-            # 2. Map leave type → DB column
-            column_map = {
-                "annual": "annual",
-                "casual": "casual",
-                "sick": "sick",
-                "maternity": "maternity",
-            }
-            column_name = column_map.get(leave["leave_type"].lower())
-            if not column_name:
-                return {"error": f"Unsupported leave type: {leave['leave_type']}"}, 400
-
-            # 3. Check current balance
-            balance = self.leave_model.get_leave_balance(
-                leave["employee_id"], column_name
-            )
+        # Status change, balance check, deduction and ledger entry commit together
+        outcome = self.leave_model.review(leave, status, approver_id, leave_days)
+        if outcome == "not_pending":
+            return {"error": f"Leave request was already {str(leave['status']).lower()}"}, 409
+        if outcome == "insufficient_balance":
+            balance = self.leave_model.get_leave_balance(leave["employee_id"], leave["leave_type"].lower())
             if balance is None:
                 return {"error": "Leave balance not found"}, 404
-            if leave_days > balance:
-                return {
-                    "error": f"Insufficient {leave['leave_type']} balance "
-                             f"({balance} remaining, {leave_days} requested)"
-                }, 400
-
-            # 4. Deduct
-            self.leave_model.deduct_leave_balance(
-                leave["employee_id"], column_name, leave_days
-            )
+            return {
+                "error": f"Insufficient {leave['leave_type']} balance "
+                         f"({_as_number(balance)} remaining, {leave_days} requested)"
+            }, 400
 
-        self.leave_model.update_status(leave_id, status, approver_id)
+        publish('leave_review', leave_id=leave_id, employee_id=leave["employee_id"], status=status)
         return {"message": f"Leave {status.lower()} successfully."}, 200
 
-    def get_pending_leaves(self, page, per_page):
-        leaves = self.leave_model.get_pending(page, per_page)
-        total = self.leave_model.get_pending_count()
+    def _review_error(self, leave, status, approver_id):
+        """(error, code) if `approver_id` may not set `leave` to `status`, else None."""
+        if leave["employee_id"] == approver_id:
+            return {"error": "Admins cannot approve their own leave requests"}, 403
+        if status not in ["Approved", "Rejected"]:
+            return {"error": "Invalid status. Must be Approved or Rejected"}, 400
+        if status == "Approved" and leave["leave_type"].lower() not in LEAVE_TYPES:
+            return {"error": f"Unsupported leave type: {leave['leave_type']}"}, 400
+        return None
+
+    def update_leave_statuses(self, decisions, approver_id):
+        """
+        Approve/reject many leaves at once. `decisions` is a list of
+        {"leave_id", "status"}; the leaves are loaded with one query, checked in
+        memory and reviewed in a single transaction (each decision still
+        succeeds or fails on its own). Returns a report with one result per
+        decision, in request order.
+        """
+        started = time.perf_counter()
+        approver = self.user_model.get_by_employee_id(approver_id)
+        if not approver:
+            return {"error": "Approver not found"}, 404
+        if approver["role"].lower() != "admin":
+            return {"error": "Only admins can approve/reject leaves"}, 403
+
+        leaves = self.leave_model.get_by_ids([decision["leave_id"] for decision in decisions])
+
+        results = []
+        pending = []  # (result, leave, status, days)
+        seen = set()
+        for decision in decisions:
+            leave_id, status = decision["leave_id"], decision["status"]
+            result = {"leave_id": leave_id, "status": status}
+            results.append(result)
+            leave = leaves.get(leave_id)
+            if leave is None:
+                result.update(result="error", error="Leave request not found")
+                continue
+            if leave_id in seen:
+                result.update(result="error", error="Duplicate leave_id in request")
+                continue
+            seen.add(leave_id)
+            error = self._review_error(leave, status, approver_id)
+            if error:
+                result.update(result="error", error=error[0]["error"])
+                continue
+            pending.append((result, leave, status, self._stored_days(leave) if status == "Approved" else None))
+
+        outcomes = self.leave_model.review_many(
+            [(leave, status, days) for _, leave, status, days in pending], approver_id
+        )
+        for (result, leave, status, days), outcome in zip(pending, outcomes):
+            if outcome == "reviewed":
+                result["result"] = "reviewed"
+                publish('leave_review', leave_id=leave["id"], employee_id=leave["employee_id"], status=status)
+            elif outcome == "not_pending":
+                result.update(result="error", error=f"Leave request was already {str(leave['status']).lower()}")
+            else:
+                result.update(result="error", error=f"Insufficient {leave['leave_type']} balance ({days} requested)")
+
+        reviewed = sum(1 for result in results if result["result"] == "reviewed")
+        return {
+            "reviewed": reviewed,
+            "failed": len(results) - reviewed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "results": results
+        }, 200
+
+    def get_calendar(self, start_date, end_date, department=None):
+        """Who is off on each day from `start_date` to `end_date` (at most CALENDAR_MAX_DAYS)."""
+        try:
+            start, end = parse_day(start_date), parse_day(end_date)
+        except ValueError:
+            return {"error": "Invalid date format."}, 400
+        if end < start:
+            return {"error": "'to' cannot be before 'from'"}, 400
+        if (end - start).days >= CALENDAR_MAX_DAYS:
+            return {"error": f"The range can span at most {CALENDAR_MAX_DAYS} days"}, 400
+
+        days = {start + timedelta(days=n): [] for n in range((end - start).days + 1)}
+        for leave in self.leave_model.get_calendar(start.isoformat(), end.isoformat(), department):
+            first, last = parse_day(leave["start_date"]), parse_day(leave["end_date"])
+            day = max(first, start)
+            while day <= min(last, end):
+                days[day].append({
+                    "leave_id": leave["id"],
+                    "employee_id": leave["employee_id"],
+                    "name": leave["name"],
+                    "department": leave["department"],
+                    "leave_type": leave["leave_type"],
+                    "status": leave["status"],
+                    "half_day": bool((day == first and leave["start_half"]) or (day == last and leave["end_half"]))
+                })
+                day += timedelta(days=1)
+
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "department": department,
+            "days": [{"date": day.isoformat(), "off": off} for day, off in days.items()]
+        }, 200
+
+    def get_ledger(self, employee_id, leave_type=None, page=1, per_page=20, cursor=None, include_total=True):
+        try:
+            before = decode_cursor(cursor, 1)[0] if cursor else None
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if leave_type and leave_type.lower() not in LEAVE_TYPES:
+            return {"error": f"Unsupported leave type: {leave_type}"}, 400
+        leave_type = leave_type.lower() if leave_type else None
+
+        entries = self.leave_model.get_ledger(employee_id, leave_type, page, per_page, before)
+        total = self.leave_model.get_ledger_count(employee_id, leave_type) if include_total else None
+        return {
+        "items": entries,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": page_count(total, per_page),
+        "next_cursor": next_cursor(entries, per_page, "id")
+        }, 200
+
+    def get_pending_leaves(self, page, per_page, cursor=None, include_total=True):
+        try:
+            after = decode_cursor(cursor, 2) if cursor else None
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        leaves = self.leave_model.get_pending(page, per_page, after)
+        total = self.leave_model.get_pending_count() if include_total else None
         return {
         "items": leaves,
         "total": total,
         "page": page,
         "per_page": per_page,
-        "total_pages": (total + per_page - 1) // per_page
+        "total_pages": page_count(total, per_page),
+        "next_cursor": next_cursor(leaves, per_page, "start_date", "id")
         }, 200
 
     
-    def get_employee_leave_details(self, name, start_date, end_date, page, per_page):
+    def get_employee_leave_details(self, name, start_date, end_date, page, per_page, include_total=True):
         try:
             parse_date(start_date)
             parse_date(end_date)
@@ -127,16 +269,19 @@ class LeaveService:
         leaves = self.leave_model.get_leaves_by_employee_name_and_date(
         name, start_date, end_date, page, per_page
         )
-        total = self.leave_model.get_leaves_by_employee_name_and_date_count(
-        name, start_date, end_date
-        )
+        total, estimated = None, False
+        if include_total:
+            total, estimated = self.leave_model.get_leaves_by_employee_name_and_date_count(
+            name, start_date, end_date
+            )
 
         return {
         "items": leaves,
         "total": total,
+        "total_is_estimate": estimated,
         "page": page,
         "per_page": per_page,
-        "total_pages": (total + per_page - 1) // per_page
+        "total_pages": page_count(total, per_page)
     }, 200
 
     
@@ -156,3 +301,19 @@ class LeaveService:
         }, 200
 
 
+
+    def get_holidays(self, year=None):
+        return self.holiday_model.get_all(year)
+
+    def add_holiday(self, day, name):
+        self.holiday_model.add(day, name)
+        return {"message": "Holiday saved", "date": day, "name": name}, 201
+
+    def delete_holiday(self, day):
+        try:
+            day = parse_day(day).isoformat()
+        except ValueError:
+            return {"error": "Invalid date format."}, 400
+        if not self.holiday_model.delete(day):
+            return {"error": "Holiday not found"}, 404
+        return {"message": "Holiday deleted"}, 200
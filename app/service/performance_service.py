@@ -1,4 +1,6 @@
 from app.models.performance import Performance
+from app.utils.events import publish
+from app.utils.pagination import decode_cursor, next_cursor, page_count
 
 performance_model = Performance()
 
@@ -21,6 +23,7 @@ class PerformanceService:
             file_path=data.get('file_path'),
             date=data['completed_at']
         )
+        publish('course_submission', employee_id=employee_id, course_name=data['course_name'])
 
     def get_pending_reviews(self, page, per_page):
         items = self.performance_model.get_pending_submissions(page, per_page)
@@ -50,16 +53,20 @@ class PerformanceService:
             comment=data['admin_comment'],
             admin_id=admin_id
         )
+        publish('course_review', submission_id=submission_id, employee_id=submission['employee_id'],
+                status=data['status'])
 
-    def get_all_submissions(self, page, per_page):
-        items = self.performance_model.get_all_submissions(page, per_page)
-        total = self.performance_model.get_all_submissions_count()
+    def get_all_submissions(self, page, per_page, cursor=None, include_total=True):
+        after = decode_cursor(cursor, 1) if cursor else None
+        items = self.performance_model.get_all_submissions(page, per_page, after)
+        total = self.performance_model.get_all_submissions_count() if include_total else None
         return {
         "items": items,
         "total": total,
         "page": page,
         "per_page": per_page,
-        "total_pages": (total + per_page - 1) // per_page
+        "total_pages": page_count(total, per_page),
+        "next_cursor": next_cursor(items, per_page, "id")
     }
 
     def get_rating_distribution(self, page, per_page):
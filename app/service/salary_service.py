@@ -1,8 +1,32 @@
+import csv
+import io
+import json
+import math
+import re
+import threading
+from tempfile import SpooledTemporaryFile
+
+from app.config import Config
+from app.models.database import release_connection
+from app.models.report_job import ReportJob
 from app.models.salary_model import SalaryModel
+from app.utils import payslip_cache, report_jobs
+from app.utils.logger import logger
+from app.utils.pagination import decode_cursor, next_cursor, page_count
+from app.utils.payroll import PayrollRules, compute_payslips, summarize
+from app.utils.pdf_report import SALARY_COLUMNS, render_table_report
+
+SALARY_MONTH = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+# Employees without usable salary data (none, or not a number) listed in a payroll run
+# report; the count is always complete
+MISSING_REPORT_LIMIT = 100
+EXPORT_FORMATS = ('csv', 'ndjson')
+SALARY_REPORT_TITLE = 'Salary Records Report'
 
 class SalaryService:
     def __init__(self):
         self.salary_model = SalaryModel()
+        self.report_job_model = ReportJob()
 
     def add_salary_record(self, data):
         # Calculate net salary if not provided
@@ -55,13 +79,138 @@ class SalaryService:
     def get_latest_salary(self, employee_id):
         return self.salary_model.get_latest_salary(employee_id)
     
-    def get_all_employees_salary_records(self, page=1, per_page=10):
-        salaries = self.salary_model.get_all(page, per_page)
-        total = self.salary_model.get_total_count()
+    def get_all_employees_salary_records(self, page=1, per_page=10, cursor=None, include_total=True):
+        after = decode_cursor(cursor, 2) if cursor else None
+        salaries = self.salary_model.get_all(page, per_page, after)
+        total = self.salary_model.get_total_count() if include_total else None
         return {
         'items': salaries,
         'total': total,
         'page': page,
         'per_page': per_page,
-        'total_pages': (total + per_page - 1) // per_page
-    }
\ No newline at end of file
+        'total_pages': page_count(total, per_page),
+        'next_cursor': next_cursor(salaries, per_page, 'generated_at', 'id')
+    }
+
+    def run_payroll(self, salary_month, run_by=None):
+        """Pay every active employee for `salary_month` in one batch (once per month)."""
+        if not SALARY_MONTH.match(salary_month or ''):
+            return {"error": "month must be YYYY-MM"}, 400
+
+        summary, created = self.salary_model.run_payroll(
+            salary_month, lambda inputs: compute_payslips(inputs, salary_month), run_by
+        )
+        if not created:
+            return dict(summary, message=f"Payroll for {salary_month} has already been run"), 200
+        summary["missing_employee_ids"] = summary["missing_employee_ids"][:MISSING_REPORT_LIMIT]
+        if Config.PAYSLIP_PRERENDER:
+            self.prerender_payslips(salary_month)
+        return dict(summary, message=f"Payroll for {salary_month} completed"), 201
+
+    def simulate_payroll(self, salary_month, overrides):
+        """
+        What-if totals for paying `salary_month` under the configured rules
+        with `overrides` (see PayrollSimulationSchema) applied. Writes nothing.
+        """
+        if not SALARY_MONTH.match(salary_month or ''):
+            return {"error": "month must be YYYY-MM"}, 400
+        overrides = dict(overrides)
+        if "tax_brackets" in overrides:
+            overrides["tax_brackets"] = [
+                (math.inf if bracket["upper"] is None else bracket["upper"], bracket["rate"])
+                for bracket in overrides["tax_brackets"]
+            ]
+        if "fx_rates" in overrides:
+            overrides["fx_rates"] = {code.upper(): rate for code, rate in overrides["fx_rates"].items()}
+        rules = PayrollRules.from_config(**overrides)
+        summary = summarize(self.salary_model.payroll_inputs(salary_month), rules)
+        return dict(summary, salary_month=salary_month), 200
+
+    def export_salary_records(self, fmt, employee_id=None, month=None):
+        """
+        Encoded chunks of a salary export (`fmt` is 'csv' or 'ndjson'): one
+        chunk per Config.EXPORT_CHUNK_SIZE rows, so memory use does not grow
+        with the number of records.
+        """
+        columns = self.salary_model.EXPORT_COLUMNS
+        chunks = self.salary_model.iter_salary_records(employee_id, month, Config.EXPORT_CHUNK_SIZE)
+        if fmt == 'ndjson':
+            for rows in chunks:
+                yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()  # header only: no records matched
+
+    def count_salary_records(self, employee_id=None, month=None):
+        return self.salary_model.count_salary_records(employee_id, month)
+
+    def _render_salary_pdf(self, output, employee_id=None, month=None):
+        chunks = self.salary_model.iter_salary_records(employee_id, month, Config.EXPORT_CHUNK_SIZE)
+        return render_table_report(output, SALARY_REPORT_TITLE, SALARY_COLUMNS, chunks)
+
+    def salary_pdf(self, employee_id=None, month=None):
+        """The salary report as a spooled temp file (memory first, disk past PDF_SPOOL_MAX_BYTES), rewound."""
+        output = SpooledTemporaryFile(max_size=Config.PDF_SPOOL_MAX_BYTES)
+        self._render_salary_pdf(output, employee_id, month)
+        output.seek(0)
+        return output
+
+    def start_salary_pdf_job(self, employee_id=None, month=None, rows=None, requested_by=None):
+        """Render the salary report in the background; returns the job as get_report_job() does."""
+        job_id = report_jobs.submit(
+            'salary_pdf', {'employee_id': employee_id, 'month': month}, 'pdf',
+            lambda output: self._render_salary_pdf(output, employee_id, month),
+            rows=rows, requested_by=requested_by
+        )
+        return self.get_report_job(job_id)
+
+    def get_report_job(self, job_id):
+        job = self.report_job_model.get(job_id)
+        if not job:
+            return None
+        return {key: job[key] for key in ('id', 'kind', 'params', 'status', 'rows', 'error', 'created_at', 'finished_at', 'path')}
+
+    def get_payslip_record(self, employee_id, month):
+        """The record behind the employee's payslip for `month` (with its `etag`), or None."""
+        record = self.salary_model.get_payslip_record(employee_id, month)
+        if record:
+            record["etag"] = payslip_cache.payslip_key(record)
+        return record
+
+    def open_payslip(self, record):
+        """The record's payslip PDF opened for reading, rendered into the cache if it is not there yet."""
+        cache = payslip_cache.get_cache()
+        try:
+            return open(cache.get(record)[0], 'rb')
+        except FileNotFoundError:
+            # evicted by another request between the lookup and the open: render it again
+            return open(cache.get(record)[0], 'rb')
+
+    def prerender_payslips(self, salary_month):
+        """Render the month's payslips into the cache from a background thread."""
+        def run():
+            columns = self.salary_model.EXPORT_COLUMNS
+            try:
+                chunks = (
+                    [dict(zip(columns, row)) for row in rows]
+                    for rows in self.salary_model.iter_salary_records(month=salary_month)
+                )
+                rendered = payslip_cache.prerender(chunks)
+                logger.info(f"Pre-rendered {rendered} payslips for {salary_month}")
+            except Exception as e:
+                logger.error(f"Pre-rendering payslips for {salary_month} failed: {e}")
+            finally:
+                release_connection()
+
+        thread = threading.Thread(target=run, name='payslip-prerender', daemon=True)
+        thread.start()
+        return thread
@@ -1,12 +1,23 @@
 from werkzeug.security import generate_password_hash
+from app.config import Config
 from app.models.user import User
 from app.utils.logger import logger
+from app.utils.pagination import decode_cursor, next_cursor, page_count
+from app.utils.password_hashing import hash_passwords
+from app.schemas.user_schema import UserSchema
+import csv
 import sqlite3
-from app.models.database import Database  # ✅ required for leave balance
+import time
+from itertools import islice
+from app.models.leave import Leave
 from app.models.performance import Performance
+from app.models.employee_profile import EmployeeProfile
 performance_model = Performance()
 
 user_model = User()
+leave_model = Leave()
+profile_model = EmployeeProfile()
+user_schema = UserSchema()
 
 def create_user(data):
     try:
@@ -26,9 +37,7 @@ def create_user(data):
         )
 
         # ✅ After creating user, initialize leave balances
-        db = Database()
-        db.conn.execute('INSERT INTO leave_balances (employee_id) VALUES (?)', (employee[1],))
-        db.conn.commit()
+        leave_model.insert_leave_balance(employee[1])
 
         # Automatically assign department-specific course
         performance_model.assign_course_to_user_if_exists(employee[1], data['department'])
@@ -43,30 +52,136 @@ def create_user(data):
         raise
 
 
+def bulk_create_users(rows, batch_size=None):
+    """
+    Onboard many employees at once. `rows` is any iterable of user dicts (a
+    parsed JSON list or a csv.DictReader over the request stream); it is
+    consumed `batch_size` rows at a time, so large uploads are never held in
+    memory. Each batch is validated, hashed in the process pool and written -
+    users, leave balances, course assignments and profiles - in one transaction.
+
+    Returns a report with one entry per input row, numbered from 1. CSV that
+    cannot be read (not UTF-8, or a malformed line) ends the upload there:
+    that row is reported as failed and the rows before it are kept.
+    """
+    batch_size = batch_size or Config.BULK_BATCH_SIZE
+    started = time.perf_counter()
+    results = []
+    seen_emails = set()
+    rows = iter(rows)
+    row_number = 0
+    unreadable = None
+
+    while True:
+        if unreadable:
+            results.append(unreadable)
+            break
+        batch = []
+        try:
+            for row in islice(rows, batch_size):
+                row_number += 1
+                batch.append((row_number, row))
+        except (UnicodeDecodeError, csv.Error) as e:
+            logger.error(f"Bulk user upload unreadable at row {row_number + 1}: {e}")
+            unreadable = {'row': row_number + 1, 'status': 'error', 'error': f'Unreadable CSV: {e}'}
+        if not batch:
+            if unreadable:
+                continue
+            break
+
+        valid = []
+        for row_number, row in batch:
+            if not isinstance(row, dict):
+                results.append({'row': row_number, 'status': 'error', 'error': 'Row must be an object'})
+                continue
+            # CSV leaves optional columns as '' - treat those as missing
+            data = {key: value for key, value in row.items() if key and value not in (None, '')}
+            errors = user_schema.validate(data)
+            if errors:
+                results.append({'row': row_number, 'status': 'error', 'errors': errors})
+                continue
+            data['email'] = data['email'].strip().lower()
+            if data['email'] in seen_emails:
+                results.append({'row': row_number, 'status': 'error', 'error': 'Duplicate email in upload'})
+                continue
+            seen_emails.add(data['email'])
+            valid.append((row_number, data))
+
+        taken = user_model.existing_emails(data['email'] for _, data in valid)
+        for row_number, data in [item for item in valid if item[1]['email'] in taken]:
+            results.append({'row': row_number, 'status': 'error', 'error': 'User with this email already exists.'})
+        valid = [item for item in valid if item[1]['email'] not in taken]
+        if not valid:
+            continue
+
+        hashes = hash_passwords(data.pop('password') for _, data in valid)
+        for (_, data), password_hash in zip(valid, hashes):
+            data['password_hash'] = password_hash
+
+        try:
+            results.extend(_insert_user_batch(valid))
+        except sqlite3.IntegrityError as e:
+            # Someone else took one of the emails mid-upload: redo row by row
+            logger.error(f"Bulk user batch failed, retrying per row: {e}")
+            for item in valid:
+                try:
+                    results.extend(_insert_user_batch([item]))
+                except sqlite3.IntegrityError:
+                    results.append({'row': item[0], 'status': 'error', 'error': 'Email already exists'})
+
+    results.sort(key=lambda result: result['row'])
+    created = sum(1 for result in results if result['status'] == 'created')
+    return {
+        'created': created,
+        'failed': len(results) - created,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        'results': results
+    }
+
+
+def _insert_user_batch(batch):
+    users = [data for _, data in batch]
+    with user_model.transaction():
+        employee_ids = user_model.add_many(users)
+        leave_model.insert_leave_balances(employee_ids)
+        performance_model.assign_courses_to_users(
+            (employee_id, user.get('department')) for employee_id, user in zip(employee_ids, users)
+        )
+        profile_model.create_empty_profiles(employee_ids)
+    user_model.invalidate('users', 'leave_balances', 'course_submissions', 'employee_profiles')
+    return [
+        {'row': row_number, 'status': 'created', 'employee_id': employee_id}
+        for (row_number, _), employee_id in zip(batch, employee_ids)
+    ]
+
+
 # In services/user_service.py
-def get_users(page=1, per_page=10):
-    users = user_model.get_all(page, per_page)
-    total = user_model.get_total_count()
+def get_users(page=1, per_page=10, cursor=None, include_total=True):
+    after = decode_cursor(cursor, 1) if cursor else None
+    users = user_model.get_all(page, per_page, after)
+    total = user_model.get_total_count() if include_total else None
     return {
         'items': users,
         'total': total,
         'page': page,
         'per_page': per_page,
-        'total_pages': (total + per_page - 1) // per_page
+        'total_pages': page_count(total, per_page),
+        'next_cursor': next_cursor(users, per_page, 'id')
     }
 
 # def search_users(name):
 #     return user_model.search(name)
-def search_users(name,page=1, per_page=10):
+def search_users(name,page=1, per_page=10, include_total=True):
     users = user_model.search(name,page, per_page)
     # if you want to get the total count of search results.
-    total = user_model.get_total_search_count(name) 
+    total, estimated = user_model.get_total_search_count(name) if include_total else (None, False)
     return {
         'items': users,
         'total': total,
+        'total_is_estimate': estimated,
         'page': page,
         'per_page': per_page,
-        'total_pages': (total + per_page - 1) // per_page
+        'total_pages': page_count(total, per_page)
     }
 
 def update_user(employee_id, data):
@@ -0,0 +1,85 @@
+# app/utils/cache.py
+import threading
+import time
+
+from app.config import Config
+
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def _generation(table):
+    return _generations.get(table, 0)
+
+
+def invalidate_tables(*tables):
+    """Mark every cached value that read from any of `tables` as stale."""
+    with _generations_lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+
+
+class TableCache:
+    """
+    In-process TTL cache whose entries are tagged with the tables they read.
+
+    Model write methods call invalidate_tables() (via Database.invalidate), which
+    drops every entry that depends on a written table in this process. The TTL
+    bounds how stale an entry can get from writes made by other workers.
+    """
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _snapshot(self, tables):
+        return tuple(_generation(table) for table in tables)
+
+    def get_or_set(self, key, tables, compute, ttl=None):
+        tables = tuple(tables)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, snapshot = entry
+                if expires_at > now and snapshot == self._snapshot(tables):
+                    self.hits += 1
+                    return value
+            self.misses += 1
+
+        # Take the snapshot before computing so a write that lands while the
+        # query runs invalidates the value we are about to store.
+        snapshot = self._snapshot(tables)
+        value = compute()
+        ttl = self.ttl if ttl is None else ttl
+        if ttl > 0:
+            with self._lock:
+                self._entries.pop(key, None)
+                if len(self._entries) >= self.max_entries:
+                    self._evict(now)
+                self._entries[key] = (value, now + ttl, snapshot)
+        return value
+
+    def _evict(self, now):
+        for key in [k for k, (_, expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        # Still full: drop the oldest entries (dicts keep insertion order)
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+count_cache = TableCache(ttl=Config.COUNT_CACHE_TTL)
+dashboard_cache = TableCache(ttl=Config.DASHBOARD_CACHE_TTL)
+calendar_cache = TableCache(ttl=Config.HOLIDAY_CACHE_TTL, max_entries=16)
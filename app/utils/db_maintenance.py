@@ -0,0 +1,59 @@
+# app/utils/db_maintenance.py
+import threading
+
+from app.config import Config
+from app.models.database import get_pool
+from app.utils.logger import logger
+
+_thread = None
+_stop = threading.Event()
+
+
+def run_maintenance(conn=None):
+    """
+    Fold the WAL back into the main database file and let SQLite refresh
+    its planner statistics. Returns the wal_checkpoint result as a dict.
+    """
+    pool = None
+    if conn is None:
+        pool = get_pool()
+        # a connection the caller already holds stays checked out for them
+        if pool.holds_connection():
+            conn, pool = pool.connection(), None
+        else:
+            conn = pool.connection()
+    try:
+        busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+        conn.execute('PRAGMA optimize')
+        return {'busy': busy, 'log_frames': log_frames, 'checkpointed': checkpointed}
+    finally:
+        if pool is not None:
+            pool.release()
+
+
+def _maintenance_loop(interval):
+    while not _stop.wait(interval):
+        try:
+            result = run_maintenance()
+            logger.info(f"Database maintenance completed: {result}")
+        except Exception as e:
+            logger.error(f"Database maintenance failed: {e}")
+
+
+def start_maintenance_thread(interval=None):
+    """Start the periodic maintenance thread once per process."""
+    global _thread
+    interval = Config.DB_MAINTENANCE_INTERVAL if interval is None else interval
+    if interval <= 0 or (_thread is not None and _thread.is_alive()):
+        return _thread
+
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_maintenance_loop, args=(interval,), name='db-maintenance', daemon=True
+    )
+    _thread.start()
+    return _thread
+
+
+def stop_maintenance_thread():
+    _stop.set()
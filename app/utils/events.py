@@ -0,0 +1,102 @@
+# app/utils/events.py
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+from app.config import Config
+
+
+class Subscription:
+    """One listener's queue on an EventBus."""
+
+    def __init__(self, maxsize):
+        self._queue = queue.Queue(maxsize)
+        # Set when the listener fell behind and events were dropped; it should
+        # refetch a snapshot instead of trusting its running totals
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """Next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """
+    In-process publish/subscribe. Write paths publish small deltas after they
+    commit; each subscriber (an open dashboard stream) gets its own bounded
+    queue, so a slow client never blocks a writer. The last `backlog` events
+    are kept for clients reconnecting with Last-Event-ID.
+
+    Only subscribers in the same process see an event: with several workers,
+    a stream reports the writes handled by its own worker.
+    """
+
+    def __init__(self, backlog=256, queue_size=1000):
+        self.queue_size = queue_size
+        self._ids = itertools.count(1)
+        self._recent = deque(maxlen=backlog)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        with self._lock:
+            event = {'id': next(self._ids), 'type': event_type, 'data': data, 'at': time.time()}
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a listener. With `last_event_id`, events after it that are
+        still in the backlog are queued first; if that id is older than the
+        backlog the subscription starts out overflowed.
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                missed = [event for event in self._recent if event['id'] > last_event_id]
+                oldest = self._recent[0]['id'] if self._recent else None
+                if oldest is not None and last_event_id < oldest - 1:
+                    subscription.overflowed = True
+                for event in missed:
+                    subscription.put(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def format_sse(event_type, data, event_id=None):
+    """Encode one server-sent event."""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+dashboard_events = EventBus(backlog=Config.DASHBOARD_EVENT_BACKLOG)
+
+
+def publish(event_type, **data):
+    """Publish a dashboard update (see GET /dashboard/stream)."""
+    return dashboard_events.publish(event_type, data)
@@ -0,0 +1,66 @@
+# app/utils/leave_accrual.py
+import threading
+from datetime import date
+
+from app.config import Config
+from app.models.database import release_connection
+from app.models.leave_accrual import LeaveAccrual, next_month
+from app.utils.logger import logger
+
+_thread = None
+_stop = threading.Event()
+
+
+def due_periods(last_period, today=None):
+    """Months to process: those after `last_period` up to the current one."""
+    current = (today or date.today()).strftime('%Y-%m')
+    if last_period is None:
+        return [current]
+    periods = []
+    period = next_month(last_period)
+    while period <= current:
+        periods.append(period)
+        period = next_month(period)
+    return periods
+
+
+def run_due_accruals(today=None):
+    """
+    Catch up on every month not yet accrued, oldest first (so a January in
+    between still gets its year-end reset). Nothing runs until a policy exists.
+    Returns the run summaries.
+    """
+    accrual = LeaveAccrual()
+    if not accrual.get_policies():
+        return []
+    return [accrual.run(period) for period in due_periods(accrual.last_period(), today)]
+
+
+def _accrual_loop(interval):
+    while not _stop.wait(interval):
+        try:
+            for summary in run_due_accruals():
+                logger.info(f"Leave accrual: {summary}")
+        except Exception as e:
+            logger.error(f"Leave accrual failed: {e}")
+        finally:
+            release_connection()
+
+
+def start_accrual_thread(interval=None):
+    """Start the periodic accrual check once per process (LEAVE_ACCRUAL_INTERVAL > 0)."""
+    global _thread
+    interval = Config.LEAVE_ACCRUAL_INTERVAL if interval is None else interval
+    if interval <= 0 or (_thread is not None and _thread.is_alive()):
+        return _thread
+
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_accrual_loop, args=(interval,), name='leave-accrual', daemon=True
+    )
+    _thread.start()
+    return _thread
+
+
+def stop_accrual_thread():
+    _stop.set()
@@ -0,0 +1,75 @@
+# app/utils/leave_days.py
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_day(value):
+    """'YYYY-MM-DD' -> date (dates pass through); repeated strings are parsed once."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class LeaveCalendar:
+    """
+    Leave-day arithmetic against a weekend/holiday calendar.
+
+    Spans are counted with date arithmetic (whole weeks times working days per
+    week, plus at most six leftover weekdays), and holidays with two binary
+    searches, so the cost does not grow with the length of the leave.
+    """
+
+    def __init__(self, weekend=(5, 6), holidays=()):
+        self.weekend = frozenset(weekend)
+        self.workdays_per_week = 7 - len(self.weekend)
+        # Only holidays on working days reduce a working-day count
+        self._holidays = sorted({
+            day.toordinal() for day in map(parse_day, holidays) if day.weekday() not in self.weekend
+        })
+
+    def is_working_day(self, day):
+        day = parse_day(day)
+        return day.weekday() not in self.weekend and not self._holidays_between(day, day)
+
+    def _holidays_between(self, start, end):
+        return bisect_right(self._holidays, end.toordinal()) - bisect_left(self._holidays, start.toordinal())
+
+    def calendar_days(self, start, end):
+        """Inclusive number of days from `start` to `end` (0 if end < start)."""
+        return max((parse_day(end) - parse_day(start)).days + 1, 0)
+
+    def working_days(self, start, end):
+        """Inclusive number of days that are neither weekend nor holiday."""
+        start, end = parse_day(start), parse_day(end)
+        span = (end - start).days + 1
+        if span <= 0:
+            return 0
+        weeks, leftover = divmod(span, 7)
+        first = start.weekday()
+        days = weeks * self.workdays_per_week + sum(
+            1 for offset in range(leftover) if (first + offset) % 7 not in self.weekend
+        )
+        return days - self._holidays_between(start, end)
+
+    def duration(self, start, end, working=False, start_half=False, end_half=False):
+        """
+        Days of leave from `start` to `end` inclusive. `working` counts only
+        working days; `start_half`/`end_half` take the first/last day as half a
+        day (a one-day leave with either flag is half a day). Half-day flags on
+        days that are not counted anyway change nothing.
+        """
+        start, end = parse_day(start), parse_day(end)
+        days = self.working_days(start, end) if working else self.calendar_days(start, end)
+        if days == 0:
+            return 0
+
+        counted = self.is_working_day if working else (lambda day: True)
+        if start == end:
+            return 0.5 if start_half or end_half else days
+        if start_half and counted(start):
+            days -= 0.5
+        if end_half and counted(end):
+            days -= 0.5
+        return days
@@ -0,0 +1,47 @@
+# app/utils/pagination.py
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Decode a cursor produced by encode_cursor() back into its `size` key values.
+    Raises ValueError for anything that was not issued by this API.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    # the values are bound as SQL parameters: only scalars a row key can hold
+    if any(isinstance(value, bool) or not isinstance(value, (str, int, float, type(None))) for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def next_cursor(items, per_page, *keys):
+    """Cursor for the page after `items`, or None when this was the last page."""
+    if not items or len(items) < per_page:
+        return None
+    last = items[-1]
+    return encode_cursor(*(last[key] for key in keys))
+
+
+def page_count(total, per_page):
+    """Number of pages for `total` rows, or None when the total was not computed."""
+    if total is None:
+        return None
+    return (total + per_page - 1) // per_page
+
+
+def wants_total(args):
+    """`?include_total=false` lets clients skip the COUNT(*) behind `total`."""
+    return args.get('include_total', 'true').strip().lower() not in ('false', '0', 'no')
@@ -0,0 +1,65 @@
+# app/utils/password_hashing.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import generate_password_hash
+
+from app.config import Config
+from app.utils.logger import logger
+
+# Below this many passwords the pool start-up/IPC costs more than it saves
+POOL_THRESHOLD = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def hash_password(password):
+    if Config.PASSWORD_HASH_METHOD:
+        return generate_password_hash(password, method=Config.PASSWORD_HASH_METHOD)
+    return generate_password_hash(password)
+
+
+def _workers():
+    return Config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # fork: spawn would re-import run.py (and build a whole app) per worker
+            context = None
+            if 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+            _executor = ProcessPoolExecutor(max_workers=_workers(), mp_context=context)
+        return _executor
+
+
+def shutdown_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def hash_passwords(passwords):
+    """
+    Hash many passwords, spreading the (deliberately slow) key derivation over
+    a shared process pool. Returns the hashes in input order.
+    """
+    passwords = list(passwords)
+    if len(passwords) < POOL_THRESHOLD or _workers() == 1:
+        return [hash_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (_workers() * 4))
+    try:
+        return list(_get_executor().map(hash_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.error("Password hashing pool died; hashing this batch in-process")
+        shutdown_pool()
+        return [hash_password(password) for password in passwords]
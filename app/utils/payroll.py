@@ -0,0 +1,232 @@
+# app/utils/payroll.py
+import json
+import math
+
+import numpy as np
+
+from app.config import Config
+
+# salary_details keys a payroll run reads; anything missing falls back to the
+# employee's latest payroll record (bonus excepted: it is not recurring)
+RECURRING = ('basic_salary', 'deductions', 'currency', 'pay_frequency')
+
+# Pay periods per year by pay_frequency (lower-cased); tax brackets are annual,
+# so each row's pay is annualised with its own count
+PAY_PERIODS = {
+    'weekly': 52,
+    'fortnightly': 26,
+    'biweekly': 26,
+    'semi-monthly': 24,
+    'monthly': 12,
+    'quarterly': 4,
+    'annually': 1,
+}
+
+
+def parse_brackets(text):
+    """'15600:0.105,53500:0.175,:0.39' -> ((15600.0, 0.105), (53500.0, 0.175), (inf, 0.39))"""
+    brackets = []
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        upper, rate = item.split(':')
+        brackets.append((float(upper) if upper.strip() else math.inf, float(rate)))
+    return tuple(sorted(brackets))
+
+
+def parse_rates(text):
+    """'USD:1.65,AUD:1.08' -> {'USD': 1.65, 'AUD': 1.08}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        currency, rate = item.split(':')
+        rates[currency.strip().upper()] = float(rate)
+    return rates
+
+
+class PayrollRules:
+    """
+    How gross pay becomes net pay. Tax brackets are (annual upper bound,
+    marginal rate), applied to pay annualised over the row's pay periods per
+    year (`periods_per_year` when none is given);
+    `deduction_rate` is a further share of gross (e.g. a pension scheme).
+    Amounts are rounded half-up to `decimals`. `fx_rates` convert each
+    currency into `base_currency` for totals.
+    """
+
+    def __init__(self, tax_brackets=(), deduction_rate=0.0, periods_per_year=12, decimals=2,
+                 fx_rates=None, base_currency='NZD'):
+        self.tax_brackets = tuple(sorted(tax_brackets))
+        self.deduction_rate = deduction_rate
+        self.periods_per_year = periods_per_year
+        self.scale = 10 ** decimals
+        self.base_currency = base_currency
+        self.fx_rates = dict(fx_rates or {}, **{base_currency: 1.0})
+
+    @classmethod
+    def from_config(cls, **overrides):
+        settings = dict(
+            tax_brackets=parse_brackets(Config.PAYROLL_TAX_BRACKETS),
+            deduction_rate=Config.PAYROLL_DEDUCTION_RATE,
+            fx_rates=parse_rates(Config.PAYROLL_FX_RATES),
+            base_currency=Config.PAYROLL_BASE_CURRENCY
+        )
+        settings.update(overrides)
+        return cls(**settings)
+
+    def lower_bounds(self):
+        return [0.0] + [upper for upper, _ in self.tax_brackets[:-1]]
+
+
+def payslip(basic, bonus, deductions, currency, rules, periods=None):
+    """
+    Scalar reference for compute_columns: one employee's
+    (gross, tax, total_deductions, net, net in base currency or None) for a
+    pay period that occurs `periods` times a year.
+    """
+    periods = periods or rules.periods_per_year
+    gross = basic + bonus
+    annual = gross * periods
+    tax = 0.0
+    for lower, (upper, rate) in zip(rules.lower_bounds(), rules.tax_brackets):
+        tax += min(max(annual - lower, 0.0), upper - lower) * rate
+    tax = math.floor(tax / periods * rules.scale + 0.5) / rules.scale
+    total = math.floor((deductions + gross * rules.deduction_rate + tax) * rules.scale + 0.5) / rules.scale
+    net = math.floor((gross - total) * rules.scale + 0.5) / rules.scale
+    rate = rules.fx_rates.get(currency)
+    base = math.floor(net * rate * rules.scale + 0.5) / rules.scale if rate is not None else None
+    return gross, tax, total, net, base
+
+
+def compute_columns(basic, bonus, deductions, currency, rules, periods=None):
+    """
+    Vectorised payslip() over whole columns (`periods`: pay periods per
+    year for each row, default rules.periods_per_year). Each step is one pass over
+    float64 arrays (one per tax bracket for the tax), in the same order of
+    operations as the scalar path, so both round identically. Returns a dict
+    of arrays: gross, tax, deductions, net, net_base (NaN where the currency
+    has no rate).
+    """
+    basic = np.asarray(basic, dtype=np.float64)
+    bonus = np.asarray(bonus, dtype=np.float64)
+    deductions = np.asarray(deductions, dtype=np.float64)
+    if periods is None:
+        periods = np.full_like(basic, rules.periods_per_year)
+    periods = np.asarray(periods, dtype=np.float64)
+
+    def rounded(values):
+        return np.floor(values * rules.scale + 0.5) / rules.scale
+
+    gross = basic + bonus
+    annual = gross * periods
+    tax = np.zeros_like(gross)
+    for lower, (upper, rate) in zip(rules.lower_bounds(), rules.tax_brackets):
+        tax += np.minimum(np.maximum(annual - lower, 0.0), upper - lower) * rate
+    tax = rounded(tax / periods)
+    total = rounded(deductions + gross * rules.deduction_rate + tax)
+    net = rounded(gross - total)
+
+    # one rate lookup per distinct currency, then a gather
+    codes, index = np.unique(np.asarray(currency, dtype=object).astype(str), return_inverse=True)
+    rates = np.array([rules.fx_rates.get(code, np.nan) for code in codes], dtype=np.float64)
+    net_base = rounded(net * rates[index.reshape(-1)])
+    return {'gross': gross, 'tax': tax, 'deductions': total, 'net': net, 'net_base': net_base}
+
+
+def _details(raw):
+    try:
+        details = json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+    return details if isinstance(details, dict) else {}
+
+
+def _amount(value):
+    """A salary_details/record amount as a float; None if absent, ValueError if not a number."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"not an amount: {value!r}")
+    amount = float(value)  # numbers and numeric strings; "5,000" or a list raise
+    if not math.isfinite(amount):
+        raise ValueError(f"not an amount: {value!r}")
+    return amount
+
+
+def payroll_columns(inputs):
+    """
+    Resolve payroll inputs (rows with employee_id, salary_details JSON and the
+    latest record's basic_salary/deductions/currency/pay_frequency) into
+    columns. A profile value that is absent or null falls back to the
+    record. Employees with no basic salary in either place, an amount that
+    is not a number, or a pay_frequency not in PAY_PERIODS are returned
+    separately instead of being paid (or failing the whole run).
+    Returns (columns, missing_ids).
+    """
+    columns = {key: [] for key in (
+        'employee_id', 'basic', 'bonus', 'deductions', 'currency', 'pay_frequency', 'periods'
+    )}
+    missing = []
+    for row in inputs:
+        details = _details(row['salary_details'])
+        values = {
+            key: details[key] if details.get(key) is not None else row[key] for key in RECURRING
+        }
+        try:
+            basic = _amount(values['basic_salary'])
+            bonus = _amount(details.get('bonus')) or 0.0
+            deductions = _amount(values['deductions']) or 0.0
+        except (TypeError, ValueError):
+            basic = None
+        pay_frequency = str(values['pay_frequency'] or 'Monthly')
+        periods = PAY_PERIODS.get(pay_frequency.lower())
+        if basic is None or periods is None:
+            missing.append(row['employee_id'])
+            continue
+        columns['employee_id'].append(row['employee_id'])
+        columns['basic'].append(basic)
+        columns['bonus'].append(bonus)
+        columns['deductions'].append(deductions)
+        columns['currency'].append(str(values['currency'] or 'NZD'))
+        columns['pay_frequency'].append(pay_frequency)
+        columns['periods'].append(periods)
+    return columns, missing
+
+
+def compute_payslips(inputs, salary_month, rules=None):
+    """
+    payroll_records parameter tuples for `inputs` (see payroll_columns), with
+    tax and percentage deductions folded into `deductions`.
+    Returns (records, missing_employee_ids).
+    """
+    columns, missing = payroll_columns(inputs)
+    if not columns['employee_id']:
+        return [], missing
+    result = compute_columns(columns['basic'], columns['bonus'], columns['deductions'],
+                             columns['currency'], rules or PayrollRules.from_config(), columns['periods'])
+    net = result['net'].tolist()
+    records = list(zip(
+        columns['employee_id'], [salary_month] * len(net), columns['basic'], columns['bonus'],
+        result['deductions'].tolist(), net, columns['currency'], columns['pay_frequency'], net
+    ))
+    return records, missing
+
+
+def summarize(inputs, rules):
+    """What-if totals for `inputs` under `rules`, without writing anything."""
+    columns, missing = payroll_columns(inputs)
+    result = compute_columns(columns['basic'], columns['bonus'], columns['deductions'],
+                             columns['currency'], rules, columns['periods'])
+    unconverted = np.isnan(result['net_base'])
+    currency = np.asarray(columns['currency'], dtype=object)
+    by_currency = {}
+    for code in sorted(set(columns['currency'])):
+        mask = currency == code
+        by_currency[code] = {
+            key: round(float(result[key][mask].sum()), 2) for key in ('gross', 'tax', 'deductions', 'net')
+        }
+    return {
+        'employees': len(columns['employee_id']),
+        'missing': len(missing),
+        'by_currency': by_currency,
+        'base_currency': rules.base_currency,
+        'net_in_base_currency': round(float(result['net_base'][~unconverted].sum()), 2),
+        'unconverted_currencies': sorted(set(currency[unconverted]))
+    }
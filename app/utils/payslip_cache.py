@@ -0,0 +1,160 @@
+# app/utils/payslip_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+from app.config import Config
+from app.utils.pdf_report import render_payslip
+
+# Bump when render_payslip's layout changes so old files stop matching
+LAYOUT_VERSION = 1
+# Records handed to a render thread at a time when pre-rendering
+PRERENDER_BATCH = 200
+
+
+def payslip_key(record):
+    """
+    Cache key (and ETag) of a record's payslip: a digest of the record id,
+    its generated_at version, the employee name printed on it and the layout.
+    """
+    version = f"{LAYOUT_VERSION}:{record['id']}:{record['generated_at']}:{record['name']}"
+    return hashlib.sha256(version.encode()).hexdigest()[:32]
+
+
+def _write(directory, key, record):
+    """Render `record` to <directory>/<key[:2]>/<key>.pdf; returns (path, size)."""
+    path = os.path.join(directory, key[:2], f'{key}.pdf')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+    with open(partial, 'wb') as output:
+        render_payslip(output, record)
+    os.replace(partial, path)
+    return path, os.path.getsize(path)
+
+
+def _render_batch(directory, records):
+    """Render every record not on disk yet; returns [(key, path, size)]."""
+    rendered = []
+    for record in records:
+        key = payslip_key(record)
+        path = os.path.join(directory, key[:2], f'{key}.pdf')
+        if not os.path.exists(path):
+            rendered.append((key, *_write(directory, key, record)))
+    return rendered
+
+
+class PayslipCache:
+    """
+    Rendered payslips on local disk, one file per payslip_key(), evicted
+    least-recently-used first once the files pass `max_bytes`. Recency is the
+    file mtime (touched on every hit), so the order survives restarts and is
+    shared, approximately, by the workers using the same directory.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = None  # key -> size, least recently used first
+        self._size = 0
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.pdf'):
+                    stat = os.stat(os.path.join(root, name))
+                    files.append((stat.st_mtime, name[:-4], stat.st_size))
+        self._index = OrderedDict((key, size) for _, key, size in sorted(files))
+        self._size = sum(self._index.values())
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.pdf')
+
+    def add(self, key, size):
+        """Record a use of the file at path(key) and evict past max_bytes."""
+        with self._lock:
+            self._load_index()
+            self._size += size - self._index.pop(key, 0)
+            self._index[key] = size
+            evicted = []
+            while self._size > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self._size -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self.path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, record):
+        """(path, key) of the record's payslip, rendering it on a miss."""
+        key = payslip_key(record)
+        path = self.path(key)
+        try:
+            os.utime(path)  # a hit: most recently used
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            path, size = _write(self.directory, key, record)
+        self.add(key, size)
+        return path, key
+
+    def total_size(self):
+        with self._lock:
+            self._load_index()
+            return self._size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.directory != Config.PAYSLIP_CACHE_DIR:
+            _cache = PayslipCache(Config.PAYSLIP_CACHE_DIR, Config.PAYSLIP_CACHE_MAX_BYTES)
+        return _cache
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.PAYSLIP_PRERENDER_WORKERS,
+                                           thread_name_prefix='payslip-render')
+        return _executor
+
+
+def prerender(chunks):
+    """
+    Render the payslips for `chunks` (lists of record dicts) on the render
+    threads, skipping those already cached, then apply the size limit.
+    Returns the number of payslips rendered.
+    """
+    cache = get_cache()
+    os.makedirs(cache.directory, exist_ok=True)
+    batches = (batch for chunk in chunks
+               for batch in (chunk[n:n + PRERENDER_BATCH] for n in range(0, len(chunk), PRERENDER_BATCH)))
+    rendered = 0
+    for results in _get_executor().map(_render_batch, repeat(cache.directory), batches):
+        for key, _, size in results:
+            cache.add(key, size)
+        rendered += len(results)
+    return rendered
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,130 @@
+# app/utils/pdf_report.py
+from functools import lru_cache
+from itertools import chain, islice
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 36
+ROWS_PER_PAGE = 32
+FONT, BOLD_FONT = 'Helvetica', 'Helvetica-Bold'
+
+# (header, index into SalaryModel.EXPORT_COLUMNS, width, money?)
+SALARY_COLUMNS = (
+    ('Emp ID', 1, 70, False),
+    ('Name', 2, 170, False),
+    ('Month', 3, 60, False),
+    ('Basic', 4, 80, True),
+    ('Bonus', 5, 70, True),
+    ('Deductions', 6, 80, True),
+    ('Net Pay', 8, 80, True),
+    ('Currency', 9, 60, False),
+)
+
+
+@lru_cache(maxsize=None)
+def table_style(columns):
+    """The TableStyle for a table of `columns` cells; built once, shared by every page."""
+    money = [n for n, (_, _, _, is_money) in enumerate(columns) if is_money]
+    commands = [
+        ('FONT', (0, 0), (-1, 0), BOLD_FONT, 9),
+        ('FONT', (0, 1), (-1, -1), FONT, 8),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e6e9ef')),
+        ('LINEBELOW', (0, 0), (-1, 0), 0.75, colors.HexColor('#5b6475')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f6f7f9')]),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ]
+    commands += [('ALIGN', (n, 0), (n, -1), 'RIGHT') for n in money]
+    return TableStyle(commands)
+
+
+def _cell(value, is_money):
+    if value is None:
+        return ''
+    if is_money:
+        return f'{value:,.2f}'
+    text = str(value)
+    return text if len(text) <= 32 else text[:31] + '…'
+
+
+def pages(chunks, size=ROWS_PER_PAGE):
+    """Regroup row chunks of any size into lists of `size` rows."""
+    rows = chain.from_iterable(chunks)
+    while True:
+        page = list(islice(rows, size))
+        if not page:
+            return
+        yield page
+
+
+def render_table_report(output, title, columns, chunks):
+    """
+    Write a PDF table report to the binary file `output`, one page of
+    ROWS_PER_PAGE rows at a time: each page is its own Table drawn straight
+    onto the canvas and finished with showPage(), so only the current page's
+    cells are ever held as Python objects. `columns` is a tuple like
+    SALARY_COLUMNS; `chunks` yields lists of row tuples. Returns the number
+    of rows written.
+    """
+    width, height = PAGE_SIZE
+    headers = [header for header, _, _, _ in columns]
+    widths = [column_width for _, _, column_width, _ in columns]
+    style = table_style(columns)
+
+    pdf = canvas.Canvas(output, pagesize=PAGE_SIZE, pageCompression=1)
+    pdf.setTitle(title)
+    count, page_number = 0, 0
+    for page in pages(chunks):
+        page_number += 1
+        count += len(page)
+        pdf.setFont(BOLD_FONT, 12)
+        pdf.drawString(MARGIN, height - MARGIN, title)
+        pdf.setFont(FONT, 8)
+        pdf.drawRightString(width - MARGIN, MARGIN / 2, f'Page {page_number}')
+
+        cells = [headers] + [
+            [_cell(row[index], is_money) for _, index, _, is_money in columns] for row in page
+        ]
+        table = Table(cells, colWidths=widths, style=style)
+        _, table_height = table.wrapOn(pdf, width - 2 * MARGIN, height - 2 * MARGIN)
+        table.drawOn(pdf, MARGIN, height - MARGIN - 14 - table_height)
+        pdf.showPage()
+
+    if not page_number:
+        pdf.setFont(BOLD_FONT, 12)
+        pdf.drawString(MARGIN, height - MARGIN, title)
+        pdf.setFont(FONT, 10)
+        pdf.drawString(MARGIN, height - MARGIN - 24, 'No records.')
+        pdf.showPage()
+    pdf.save()
+    return count
+
+
+def render_payslip(output, record):
+    """
+    One employee's payslip for a payroll record (a row with the employee's
+    `name`). invariant=1 leaves out the creation date and random document
+    id, so the same record always renders to the same bytes.
+    """
+    pdf = canvas.Canvas(output, pagesize=A4, invariant=1)
+    pdf.setFont(FONT, 12)
+    currency = record['currency']
+    lines = [
+        f"Payslip for: {record['name']} ({record['employee_id']})",
+        f"Month: {record['salary_month']} - {record['pay_frequency']}",
+        f"Basic: {record['basic_salary']} {currency}",
+        f"Bonus: {record['bonus']} {currency}",
+        f"Deductions: {record['deductions']} {currency}",
+        f"Net Pay: {record['direct_deposit_amount']} {currency}",
+    ]
+    y = 800
+    for line in lines:
+        pdf.drawString(50, y, line)
+        y -= 20
+    pdf.showPage()
+    pdf.save()
@@ -0,0 +1,62 @@
+# app/utils/punch_flusher.py
+import threading
+
+from app.config import Config
+from app.models.attendence import Attendence
+from app.models.database import release_connection
+from app.models.punch_queue import get_punch_queue
+from app.utils.logger import logger
+
+_thread = None
+_stop = threading.Event()
+
+
+def flush_punches(batch_size=None):
+    """
+    Move every queued punch into attendance, one transaction per batch.
+    Returns the number of events flushed.
+    """
+    batch_size = batch_size or Config.ATTENDANCE_FLUSH_BATCH
+    queue = get_punch_queue()
+    attendance = Attendence()
+    flushed = 0
+    while True:
+        events = queue.peek(batch_size)
+        if not events:
+            break
+        attendance.apply_punches(events)
+        # Only drop events once they are committed; a crash in between replays them
+        queue.acknowledge(events[-1]['id'])
+        flushed += len(events)
+        if len(events) < batch_size:
+            break
+    return flushed
+
+
+def _flush_loop(interval):
+    while not _stop.wait(interval):
+        try:
+            flush_punches()
+        except Exception as e:
+            logger.error(f"Punch flush failed: {e}")
+        finally:
+            release_connection()
+
+
+def start_punch_flusher(interval=None):
+    """Start the background punch writer once per process, if write-behind is on."""
+    global _thread
+    interval = Config.ATTENDANCE_FLUSH_INTERVAL if interval is None else interval
+    if not Config.ATTENDANCE_WRITE_BEHIND or (_thread is not None and _thread.is_alive()):
+        return _thread
+
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_flush_loop, args=(interval,), name='punch-flusher', daemon=True
+    )
+    _thread.start()
+    return _thread
+
+
+def stop_punch_flusher():
+    _stop.set()
@@ -0,0 +1,71 @@
+# app/utils/report_jobs.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+from app.models.database import release_connection
+from app.models.report_job import ReportJob
+from app.utils.logger import logger
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.REPORT_JOB_WORKERS, thread_name_prefix='report-job')
+        return _executor
+
+
+def _remove_expired(jobs):
+    for path in jobs.delete_expired(Config.REPORT_JOB_TTL):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _run(job_id, extension, render):
+    jobs = ReportJob()
+    path = os.path.join(Config.REPORT_JOB_DIR, f'{job_id}.{extension}')
+    try:
+        jobs.mark_running(job_id)
+        # Written under a temporary name so a half-rendered file is never served
+        with open(path + '.part', 'wb') as output:
+            render(output)
+        os.replace(path + '.part', path)
+        jobs.mark_done(job_id, path)
+    except Exception as e:
+        logger.error(f"Report job {job_id} failed: {e}")
+        jobs.mark_failed(job_id, str(e))
+        try:
+            os.remove(path + '.part')
+        except OSError:
+            pass
+    finally:
+        release_connection()
+
+
+def submit(kind, params, extension, render, rows=None, requested_by=None):
+    """
+    Queue `render(output)` to write a report file in the background and
+    return the job id. The job row (report_jobs) is what GET requests poll;
+    jobs and their files are dropped REPORT_JOB_TTL seconds after creation.
+    """
+    jobs = ReportJob()
+    _remove_expired(jobs)
+    os.makedirs(Config.REPORT_JOB_DIR, exist_ok=True)
+    job_id = jobs.create(kind, params, rows, requested_by)
+    _get_executor().submit(_run, job_id, extension, render)
+    return job_id
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,22 @@
+# app/utils/search.py
+import re
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(text, column=None):
+    """
+    Turn free text from a search box into an FTS5 MATCH expression for
+    employee_search: every word must match as a prefix ("jo sm" finds
+    "John Smith"). `column` restricts the match to one column, e.g. 'name'.
+
+    Returns None when the text has no searchable words.
+    """
+    tokens = _TOKEN.findall(text or '')
+    if not tokens:
+        return None
+    # Quoting each token keeps FTS5 operators (AND, NEAR, -, :) literal
+    expression = ' '.join(f'"{token}"*' for token in tokens)
+    if column:
+        expression = f'{column} : ({expression})'
+    return expression
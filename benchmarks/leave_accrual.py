@@ -0,0 +1,112 @@
+"""
+Monthly leave accrual (flask db accrue-leave): the set-based run, which
+ledgers and updates every eligible balance with two statements per policy,
+vs. a per-employee loop doing the same reads and writes row by row.
+
+The database is seeded with --employees employees and three policies; each
+path runs --months consecutive months on its own copy of the database.
+
+    python -m benchmarks.leave_accrual [--employees 100000] [--months 3]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from app import migrations
+from app.config import Config
+from app.models.leave_accrual import LeaveAccrual, next_month
+
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Sales', 'Operations']
+POLICIES = [('annual', 1.75, 30, 10), ('casual', 0.5, 6, 0), ('sick', 1, 12, None)]
+
+
+def seed(path, employees):
+    conn = sqlite3.connect(path)
+    migrations.upgrade(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, created_at) "
+            "VALUES (?, ?, ?, ?, 'Employee', 'x', '2020-01-01')",
+            [(f'EMP{n:06d}', f'Employee {n}', f'e{n}@example.com', DEPARTMENTS[n % len(DEPARTMENTS)])
+             for n in range(employees)]
+        )
+        conn.executemany(
+            "INSERT INTO leave_balances (employee_id, annual, casual, sick, maternity) VALUES (?, 12, 6, 8, 0)",
+            [(f'EMP{n:06d}',) for n in range(employees)]
+        )
+        conn.executemany(
+            "INSERT INTO leave_policies (leave_type, monthly_accrual, max_balance, carry_over_cap) "
+            "VALUES (?, ?, ?, ?)", POLICIES
+        )
+    conn.close()
+
+
+def row_by_row(path, period):
+    """The naive job: one SELECT and up to one UPDATE + INSERT per employee and policy."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute('BEGIN IMMEDIATE')
+    policies = conn.execute(
+        'SELECT leave_type, monthly_accrual, max_balance, carry_over_cap FROM leave_policies'
+    ).fetchall()
+    employees = [row[0] for row in conn.execute(
+        "SELECT employee_id FROM users WHERE status = 'Active' AND created_at < ?", (next_month(period) + '-01',)
+    )]
+    for employee_id in employees:
+        for leave_type, accrual, max_balance, cap in policies:
+            old = conn.execute(f'SELECT {leave_type} FROM leave_balances WHERE employee_id = ?',
+                               (employee_id,)).fetchone()[0]
+            new = old
+            if period.endswith('-01') and cap is not None:
+                new = min(new, cap)
+            new = new + accrual if max_balance is None else min(new + accrual, max_balance)
+            if new != old:
+                conn.execute(f'UPDATE leave_balances SET {leave_type} = ? WHERE employee_id = ?',
+                             (new, employee_id))
+                conn.execute(
+                    "INSERT INTO leave_ledger (employee_id, leave_type, delta, balance, entry_type, created_by) "
+                    "VALUES (?, ?, ?, ?, 'accrual', ?)", (employee_id, leave_type, new - old, new, f'accrual:{period}')
+                )
+    conn.execute("INSERT INTO leave_accrual_runs (period, employees, entries, duration_ms) VALUES (?, ?, 0, 0)",
+                 (period, len(employees)))
+    conn.execute('COMMIT')
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--months', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        started = time.perf_counter()
+        seed(path, args.employees)
+        print(f"Seeded {args.employees} employees, {len(POLICIES)} policies "
+              f"in {time.perf_counter() - started:.1f}s\n")
+        naive_path = os.path.join(tmp, 'naive.db')
+        shutil.copy(path, naive_path)
+
+        periods = ['2025-12']
+        while len(periods) < args.months:
+            periods.append(next_month(periods[-1]))
+
+        Config.DATABASE = path
+        accrual = LeaveAccrual()
+        print(f"{'period':<10}{'set-based ms':>14}{'entries':>10}{'row-by-row ms':>15}")
+        for period in periods:
+            summary = accrual.run(period)
+            started = time.perf_counter()
+            row_by_row(naive_path, period)
+            naive_ms = (time.perf_counter() - started) * 1000
+            print(f"{period:<10}{summary['duration_ms']:>14.1f}{summary['entries']:>10}{naive_ms:>15.1f}")
+
+        rerun = accrual.run(periods[-1])
+        print(f"\nre-run of {periods[-1]}: {rerun['status']}")
+
+
+if __name__ == '__main__':
+    main()
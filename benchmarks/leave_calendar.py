@@ -0,0 +1,107 @@
+"""
+Leave overlap checks and team calendar queries over a long leave history:
+the leave_intervals R*Tree vs. the equivalent range predicates on leaves.
+
+The database is seeded with --employees employees, each taking a few leaves a
+year for --years years. Timings are medians over --repeat runs.
+
+    python -m benchmarks.leave_calendar [--employees 5000] [--years 10] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app import migrations
+from app.config import Config
+from app.models.leave import Leave
+
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Sales', 'Operations']
+LEAVES_PER_YEAR = 6
+
+
+def seed(path, employees, years):
+    conn = sqlite3.connect(path)
+    migrations.upgrade(conn)
+    rng = random.Random(7)
+    first_day = date.today() - timedelta(days=365 * years)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash) "
+            "VALUES (?, ?, ?, ?, 'Employee', 'x')",
+            [(f'EMP{n:06d}', f'Employee {n}', f'e{n}@example.com', DEPARTMENTS[n % len(DEPARTMENTS)])
+             for n in range(employees)]
+        )
+
+        def leaves():
+            for n in range(employees):
+                for _ in range(LEAVES_PER_YEAR * years):
+                    start = first_day + timedelta(days=rng.randrange(365 * years))
+                    end = start + timedelta(days=rng.randrange(5))
+                    yield (f'EMP{n:06d}', 'annual', start.isoformat(), end.isoformat(), 'Bench',
+                           rng.choice(['Approved', 'Approved', 'Pending', 'Rejected']))
+
+        conn.executemany(
+            "INSERT INTO leaves (employee_id, leave_type, start_date, end_date, reason, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)", leaves()
+        )
+    count = conn.execute('SELECT COUNT(*) FROM leaves').fetchone()[0]
+    conn.close()
+    return count
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--employees', type=int, default=5000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        started = time.perf_counter()
+        count = seed(path, args.employees, args.years)
+        print(f"Seeded {count} leaves ({args.employees} employees x {args.years} years) "
+              f"in {time.perf_counter() - started:.1f}s\n")
+
+        Config.DATABASE = path
+        model = Leave()
+        conn = model.conn
+        month_start = date.today().replace(day=1).isoformat()
+        month_end = (date.today().replace(day=1) + timedelta(days=31)).replace(day=1).isoformat()
+        employee = f'EMP{args.employees // 2:06d}'
+
+        cases = [
+            ('overlap check, rtree', lambda: model.find_overlap(employee, month_start, month_end)),
+            ('overlap check, range scan', lambda: conn.execute(
+                "SELECT * FROM leaves WHERE employee_id = ? AND start_date <= ? AND end_date >= ? "
+                "AND (status IS NULL OR status != 'Rejected') ORDER BY start_date LIMIT 1",
+                (employee, month_end, month_start)).fetchone()),
+            ('month calendar (IT), rtree', lambda: model.get_calendar(month_start, month_end, 'IT')),
+            ('month calendar (IT), range scan', lambda: conn.execute(
+                "SELECT l.*, u.name FROM leaves l JOIN users u ON u.employee_id = l.employee_id "
+                "WHERE l.start_date <= ? AND l.end_date >= ? AND u.department = ? "
+                "AND (l.status IS NULL OR l.status != 'Rejected') ORDER BY l.start_date, u.name",
+                (month_end, month_start, 'IT')).fetchall()),
+        ]
+        print(f"{'query':<34}{'median ms':>11}")
+        for name, fn in cases:
+            ms, _ = timed(fn, args.repeat)
+            print(f"{name:<34}{ms:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
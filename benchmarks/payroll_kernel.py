@@ -0,0 +1,67 @@
+"""
+Payroll calculation (tax brackets, percentage deduction, half-up rounding,
+currency conversion): the scalar payslip() loop vs. compute_columns over
+NumPy arrays, for --employees employees x --months months of payslips.
+
+Inputs are generated in memory; only the calculation is timed. Timings are
+medians over --repeat runs.
+
+    python -m benchmarks.payroll_kernel [--employees 100000] [--months 12] [--repeat 3]
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.utils.payroll import PayrollRules, compute_columns, parse_brackets, payslip
+
+RULES = PayrollRules(
+    tax_brackets=parse_brackets('15600:0.105,53500:0.175,78100:0.30,180000:0.33,:0.39'),
+    deduction_rate=0.03, fx_rates={'USD': 1.65, 'AUD': 1.08}
+)
+
+
+def inputs(count):
+    rng = np.random.default_rng(5)
+    basic = np.round(rng.uniform(2500, 15000, count), 2)
+    bonus = np.where(rng.random(count) < 0.2, np.round(rng.uniform(100, 3000, count), 2), 0.0)
+    deductions = np.round(rng.uniform(0, 600, count), 2)
+    currency = rng.choice(np.array(['NZD', 'NZD', 'NZD', 'USD', 'AUD'], dtype=object), count)
+    return basic, bonus, deductions, currency
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    count = args.employees * args.months
+    basic, bonus, deductions, currency = inputs(count)
+    rows = list(zip(basic.tolist(), bonus.tolist(), deductions.tolist(), currency.tolist()))
+    print(f"{count} payslips ({args.employees} employees x {args.months} months)\n")
+
+    scalar_s, scalar = timed(lambda: [payslip(*row, RULES) for row in rows], args.repeat)
+    kernel_s, kernel = timed(lambda: compute_columns(basic, bonus, deductions, currency, RULES), args.repeat)
+
+    print(f"{'path':<22}{'seconds':>10}{'payslips/s':>14}")
+    print(f"{'scalar payslip()':<22}{scalar_s:>10.2f}{count / scalar_s:>14,.0f}")
+    print(f"{'compute_columns':<22}{kernel_s:>10.2f}{count / kernel_s:>14,.0f}")
+
+    mismatches = int(np.count_nonzero(kernel['net'] != np.array([slip[3] for slip in scalar])))
+    print(f"\nnet pay mismatches: {mismatches}; speedup {scalar_s / kernel_s:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
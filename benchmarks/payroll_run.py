@@ -0,0 +1,86 @@
+"""
+Company-wide payroll (POST /salary/run): one batched run vs. paying each
+employee with SalaryModel.add_salary_record, one commit per row (what a
+client looping over POST /salary/add does, minus the HTTP round trips).
+
+The database is seeded with --employees employees, each with a salary
+profile and a previous month's record. The per-row path is timed on
+--sample employees and extrapolated.
+
+    python -m benchmarks.payroll_run [--employees 50000] [--sample 2000]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from app import migrations
+from app.config import Config
+from app.service.salary_service import SalaryService
+
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Sales', 'Operations']
+PREVIOUS, MONTH = '2025-05', '2025-06'
+
+
+def seed(path, employees):
+    conn = sqlite3.connect(path)
+    migrations.upgrade(conn)
+    rng = random.Random(3)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, created_at) "
+            "VALUES (?, ?, ?, ?, 'Employee', 'x', '2020-01-01')",
+            [(f'EMP{n:06d}', f'Employee {n}', f'e{n}@example.com', DEPARTMENTS[n % len(DEPARTMENTS)])
+             for n in range(employees)]
+        )
+        details = [rng.randrange(3000, 9000) for _ in range(employees)]
+        conn.executemany(
+            "INSERT INTO employee_profiles (user_id, salary_details) VALUES (?, ?)",
+            [(f'EMP{n:06d}', json.dumps({'basic_salary': basic, 'deductions': round(basic * 0.15, 2)}))
+             for n, basic in enumerate(details)]
+        )
+        conn.executemany(
+            "INSERT INTO payroll_records (employee_id, salary_month, basic_salary, bonus, deductions, net_salary) "
+            "VALUES (?, ?, ?, 0, 0, ?)",
+            [(f'EMP{n:06d}', PREVIOUS, basic, basic) for n, basic in enumerate(details)]
+        )
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--employees', type=int, default=50000)
+    parser.add_argument('--sample', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        started = time.perf_counter()
+        seed(path, args.employees)
+        print(f"Seeded {args.employees} employees in {time.perf_counter() - started:.1f}s\n")
+
+        Config.DATABASE = path
+        service = SalaryService()
+        model = service.salary_model
+
+        started = time.perf_counter()
+        for n in range(args.sample):
+            model.add_salary_record(f'EMP{n:06d}', '2025-04', 5000, 0, 750, 4250)
+        per_row = (time.perf_counter() - started) / args.sample
+
+        started = time.perf_counter()
+        summary, status = service.run_payroll(MONTH, 'bench')
+        batch_s = time.perf_counter() - started
+
+        print(f"{'path':<34}{'seconds':>10}{'rows':>8}")
+        print(f"{'per-row add_salary_record (est.)':<34}{per_row * args.employees:>10.2f}{args.employees:>8}")
+        print(f"{'batched run':<34}{batch_s:>10.2f}{summary['inserted']:>8}")
+        print(f"\nrun report: status {status}, {summary['duration_ms']} ms in the transaction; "
+              f"re-run -> {service.run_payroll(MONTH, 'bench')[1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Payslip downloads (/salary/my-records/payslip): rendering the PDF on every
+request vs. a hit in the on-disk payslip cache, and how long pre-rendering a
+whole month takes on the render threads.
+
+    python -m benchmarks.payslip_cache [--employees 5000] [--repeat 200]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+from app.config import Config
+from app.utils import payslip_cache
+from app.utils.pdf_report import render_payslip
+
+
+def record(n):
+    return {'id': n, 'generated_at': '2025-06-30 12:00:00', 'name': f'Employee {n}', 'employee_id': f'EMP{n:06d}',
+            'salary_month': '2025-06', 'pay_frequency': 'Monthly', 'basic_salary': 5000.0, 'bonus': 250.0,
+            'deductions': 800.0, 'direct_deposit_amount': 4450.0, 'currency': 'NZD'}
+
+
+def timed(fn, repeat):
+    samples = []
+    for n in range(repeat):
+        started = time.perf_counter()
+        fn(n)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--employees', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.PAYSLIP_CACHE_DIR = os.path.join(tmp, 'payslips')
+        records = [record(n) for n in range(args.employees)]
+
+        started = time.perf_counter()
+        payslip_cache.prerender(records[n:n + 1000] for n in range(0, len(records), 1000))
+        prerender_s = time.perf_counter() - started
+        payslip_cache.shutdown()
+
+        cache = payslip_cache.get_cache()
+        print(f"{'path':<34}{'median ms':>11}")
+        print(f"{'render per request':<34}{timed(lambda n: render_payslip(BytesIO(), records[n]), args.repeat):>11.2f}")
+        print(f"{'cache hit (lookup + read file)':<34}"
+              f"{timed(lambda n: open(cache.get(records[n])[0], 'rb').read(), args.repeat):>11.3f}")
+        print(f"{'revalidation (ETag only)':<34}{timed(lambda n: payslip_cache.payslip_key(records[n]), args.repeat):>11.4f}")
+        print(f"\npre-rendered {args.employees} payslips in {prerender_s:.1f}s "
+              f"({cache.total_size() / 2 ** 20:.1f} MiB on disk)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Punch-in/punch-out ingestion throughput: synchronous writes to attendance
+vs. the write-behind queue (Config.ATTENDANCE_WRITE_BEHIND).
+
+Each mode gets a fresh database. Puncher processes call the attendance
+service like request handlers would, while reader processes list records
+the way /attendance/my-records does. In write-behind mode one more process
+runs the background flusher; after the run the queue is drained and the
+row count checked, so the reported rate only counts punches that landed.
+
+    python -m benchmarks.punch_ingest [--seconds 5] [--punchers 8] [--readers 2]
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from app import migrations
+from app.config import Config
+from app.models.attendence import Attendence
+from app.service import attendence_service
+from app.utils.punch_flusher import flush_punches
+
+EMPLOYEES_PER_PUNCHER = 500
+
+
+def _configure(path, write_behind):
+    Config.DATABASE = path
+    Config.ATTENDANCE_QUEUE_DATABASE = path + '.queue'
+    Config.ATTENDANCE_WRITE_BEHIND = write_behind
+    # The service's module-level model was bound to the default database at import
+    attendence_service.attendance_model = Attendence()
+
+
+def _employee_id(worker, n):
+    return f'EMP{worker:02d}{n % EMPLOYEES_PER_PUNCHER:04d}'
+
+
+def _puncher(path, write_behind, seconds, worker, results):
+    _configure(path, write_behind)
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+    employee = 0
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                attendence_service.punch_in(_employee_id(worker, employee))
+                latencies.append(time.perf_counter() - started)
+            except sqlite3.OperationalError:
+                errors += 1
+            employee += 1
+    finally:
+        results.put(('punch', latencies, errors))
+
+
+def _reader(path, write_behind, seconds, worker, results):
+    _configure(path, write_behind)
+    latencies = []
+    deadline = time.monotonic() + seconds
+    employee = 0
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            attendence_service.get_employee_attendance(_employee_id(worker, employee))
+            latencies.append(time.perf_counter() - started)
+            employee += 1
+    finally:
+        results.put(('read', latencies, 0))
+
+
+def _flusher(path, seconds):
+    _configure(path, True)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if not flush_punches():
+            time.sleep(Config.ATTENDANCE_FLUSH_INTERVAL)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def run_mode(write_behind, seconds, punchers, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        setup = sqlite3.connect(path)
+        migrations.upgrade(setup)
+        with setup:
+            setup.executemany(
+                "INSERT INTO users (employee_id, name, email, role, password_hash) VALUES (?, ?, ?, 'Employee', 'x')",
+                [(_employee_id(worker, n), f'Employee {worker}-{n}', f'e{worker}-{n}@example.com')
+                 for worker in range(max(punchers, readers)) for n in range(EMPLOYEES_PER_PUNCHER)]
+            )
+        setup.close()
+
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_puncher, args=(path, write_behind, seconds, i, results))
+                 for i in range(punchers)]
+        procs += [multiprocessing.Process(target=_reader, args=(path, write_behind, seconds, i, results))
+                  for i in range(readers)]
+        flusher = None
+        if write_behind:
+            flusher = multiprocessing.Process(target=_flusher, args=(path, seconds))
+            flusher.start()
+        for proc in procs:
+            proc.start()
+
+        totals = {'punch': ([], 0), 'read': ([], 0)}
+        for _ in procs:
+            kind, latencies, errors = results.get()
+            totals[kind] = (totals[kind][0] + latencies, totals[kind][1] + errors)
+        for proc in procs:
+            proc.join()
+
+        drain = 0.0
+        if flusher is not None:
+            flusher.join()
+            # Whatever the flusher did not reach in time still has to be written
+            started = time.perf_counter()
+            _configure(path, True)
+            flush_punches()
+            drain = time.perf_counter() - started
+
+        check = sqlite3.connect(path)
+        stored = check.execute('SELECT COUNT(*) FROM attendance').fetchone()[0]
+        check.close()
+        return totals, stored, drain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--punchers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.punchers} punchers, {args.readers} readers, {args.seconds:g}s per mode\n")
+    print(f"{'mode':<16}{'punches/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'reads/s':>9}"
+          f"{'errors':>8}{'stored':>9}{'drain s':>9}")
+    for name, write_behind in (('synchronous', False), ('write-behind', True)):
+        totals, stored, drain = run_mode(write_behind, args.seconds, args.punchers, args.readers)
+        punches, errors = totals['punch']
+        print(f"{name:<16}{len(punches) / args.seconds:>11.0f}{_percentile(punches, 0.5):>9.2f}"
+              f"{_percentile(punches, 0.99):>9.2f}{len(totals['read'][0]) / args.seconds:>9.0f}"
+              f"{errors:>8}{stored:>9}{drain:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Salary export (GET /salary/export): peak Python memory and time for the old
+load-everything path (fetch_salary_records -> list of dicts) vs. streaming
+CSV/NDJSON chunks from the cursor, as the table grows.
+
+Each size is seeded into its own database; memory is the tracemalloc peak
+while producing the whole export.
+
+    python -m benchmarks.salary_export [--sizes 50000,200000]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from app import migrations
+from app.config import Config
+from app.service.salary_service import SalaryService
+
+EMPLOYEES = 5000
+
+
+def seed(path, records):
+    conn = sqlite3.connect(path)
+    migrations.upgrade(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash) "
+            "VALUES (?, ?, ?, 'IT', 'Employee', 'x')",
+            [(f'EMP{n:06d}', f'Employee {n}', f'e{n}@example.com') for n in range(EMPLOYEES)]
+        )
+        conn.executemany(
+            "INSERT INTO payroll_records (employee_id, salary_month, basic_salary, bonus, deductions, "
+            "net_salary, direct_deposit_amount) VALUES (?, ?, 5000, 250, 800, 4450, 4450)",
+            ((f'EMP{n % EMPLOYEES:06d}', f'{2000 + n // (EMPLOYEES * 12)}-{n // EMPLOYEES % 12 + 1:02d}')
+             for n in range(records))
+        )
+    conn.close()
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='50000,200000')
+    args = parser.parse_args()
+
+    print(f"{'records':>9}  {'path':<16}{'seconds':>9}{'peak MiB':>10}{'output MiB':>12}")
+    for records in map(int, args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            seed(path, records)
+            Config.DATABASE = path
+            service = SalaryService()
+            cases = [
+                ('load all', lambda: len(str(service.get_filtered_salary_records()))),
+                ('stream csv', lambda: sum(map(len, service.export_salary_records('csv')))),
+                ('stream ndjson', lambda: sum(map(len, service.export_salary_records('ndjson')))),
+            ]
+            for name, fn in cases:
+                seconds, peak, size = measure(fn)
+                print(f"{records:>9}  {name:<16}{seconds:>9.2f}{peak:>10.1f}{size / 2 ** 20:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
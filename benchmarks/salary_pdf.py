@@ -0,0 +1,90 @@
+"""
+Salary PDF export (/salary/export-pdf): the old renderer (every row loaded as
+a dict, drawn with drawString into a BytesIO canvas) vs. the paged Table
+renderer reading cursor chunks into a SpooledTemporaryFile.
+
+The database is seeded with --records payroll records; memory is the
+tracemalloc peak while producing the whole PDF.
+
+    python -m benchmarks.salary_pdf [--records 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.config import Config
+from app.service.salary_service import SalaryService
+from benchmarks.salary_export import seed
+
+
+def legacy_pdf(service):
+    records = service.get_filtered_salary_records()
+    pdf_buffer = BytesIO()
+    p = canvas.Canvas(pdf_buffer, pagesize=A4)
+    width, height = A4
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(200, height - 40, "Salary Records Report")
+    p.setFont("Helvetica", 10)
+    y = height - 70
+    x_positions = [50, 110, 210, 270, 320, 370, 440, 500]
+    for i, header in enumerate(["Emp ID", "Name", "Month", "Basic", "Bonus", "Deductions", "Net Pay", "Currency"]):
+        p.drawString(x_positions[i], y, header)
+    y -= 20
+    for record in records:
+        if y < 50:
+            p.showPage()
+            y = height - 50
+            p.setFont("Helvetica", 10)
+        values = [record['employee_id'], record.get('name', 'N/A'), record['salary_month'],
+                  str(record['basic_salary']), str(record['bonus']), str(record['deductions']),
+                  str(record['direct_deposit_amount']), record['currency']]
+        for i, value in enumerate(values):
+            p.drawString(x_positions[i], y, value)
+        y -= 20
+    p.save()
+    pdf_buffer.seek(0)
+    return len(pdf_buffer.getvalue())
+
+
+def paged_pdf(service):
+    output = service.salary_pdf()
+    output.seek(0, os.SEEK_END)
+    return output.tell()
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, size / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        seed(path, args.records)
+        Config.DATABASE = path
+        service = SalaryService()
+
+        print(f"{args.records} records\n")
+        print(f"{'renderer':<26}{'seconds':>9}{'peak MiB':>10}{'PDF MiB':>9}")
+        for name, fn in [('drawString + BytesIO', legacy_pdf), ('paged Table + spool', paged_pdf)]:
+            seconds, peak, size = measure(lambda: fn(service))
+            print(f"{name:<26}{seconds:>9.2f}{peak:>10.1f}{size:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Concurrent read/write throughput of the SQLite database under the default
+rollback journal vs. the production PRAGMA profile (Config.SQLITE_PRAGMAS).
+
+Each profile gets a fresh database. Writer processes emulate punch-ins
+(INSERT + commit per request) while reader processes run the dashboard
+counts, all for a fixed duration, like several gunicorn workers would.
+
+    python -m benchmarks.sqlite_concurrency [--seconds 5] [--writers 4] [--readers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from app import migrations
+from app.config import Config
+from app.models.database import apply_pragmas
+
+PROFILES = {
+    'rollback journal (default)': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000},
+    'tuned (Config.SQLITE_PRAGMAS)': Config.SQLITE_PRAGMAS,
+}
+
+
+def _connect(path, pragmas):
+    conn = sqlite3.connect(path, timeout=0)
+    apply_pragmas(conn, pragmas)
+    return conn
+
+
+def _writer(path, pragmas, seconds, worker, results):
+    conn = _connect(path, pragmas)
+    ops = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        now = datetime.now()
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO attendance (employee_id, punch_in, date) VALUES (?, ?, ?)',
+                    (f'EMP{worker:04d}', now.isoformat(), now.strftime('%Y-%m-%d'))
+                )
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(('write', ops, errors))
+
+
+def _reader(path, pragmas, seconds, results):
+    conn = _connect(path, pragmas)
+    ops = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            conn.execute(
+                "SELECT COUNT(*) FROM attendance WHERE date = ? AND approval_status = 'Approved'",
+                (datetime.now().strftime('%Y-%m-%d'),)
+            ).fetchone()
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(('read', ops, errors))
+
+
+def run_profile(pragmas, seconds, writers, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        setup = _connect(path, pragmas)
+        migrations.upgrade(setup)
+        setup.close()
+
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_writer, args=(path, pragmas, seconds, i, results))
+                 for i in range(writers)]
+        procs += [multiprocessing.Process(target=_reader, args=(path, pragmas, seconds, results))
+                  for _ in range(readers)]
+        for proc in procs:
+            proc.start()
+        totals = {'write': [0, 0], 'read': [0, 0]}
+        for _ in procs:
+            kind, ops, errors = results.get()
+            totals[kind][0] += ops
+            totals[kind][1] += errors
+        for proc in procs:
+            proc.join()
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile\n")
+    print(f"{'profile':<32}{'writes/s':>10}{'reads/s':>12}{'locked errors':>16}")
+    for name, pragmas in PROFILES.items():
+        totals = run_profile(pragmas, args.seconds, args.writers, args.readers)
+        errors = totals['write'][1] + totals['read'][1]
+        print(f"{name:<32}{totals['write'][0] / args.seconds:>10.0f}"
+              f"{totals['read'][0] / args.seconds:>12.0f}{errors:>16}")
+
+
+if __name__ == '__main__':
+    main()
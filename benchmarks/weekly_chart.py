@@ -0,0 +1,118 @@
+"""
+Weekly attendance chart (/attendance/weekly-chart): the old path that fetched
+every attendance row of the week and tallied it in Python vs. one grouped
+query over the week's attendance of active employees.
+
+The database is seeded with --employees employees, each with one attendance
+row for each of the last 7 days. The legacy path is reproduced here as it was
+before the grouped query, minus its per-row print().
+
+    python -m benchmarks.weekly_chart [--employees 50000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from app import migrations
+from app.config import Config
+from app.models.admin_dashboard import AdminDashboard
+
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Sales', 'Operations']
+STATUSES = ['Present', 'Present', 'Present', 'Late', 'Leave', 'Absent']
+APPROVALS = ['Approved', 'Approved', 'Approved', 'Pending', 'Rejected']
+
+
+def seed(path, employees):
+    conn = sqlite3.connect(path)
+    migrations.upgrade(conn)
+    rng = random.Random(42)
+    days = [(date.today() - timedelta(days=n)).isoformat() for n in range(7)]
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash) "
+            "VALUES (?, ?, ?, ?, 'Employee', 'x')",
+            [(f'EMP{n:06d}', f'Employee {n}', f'e{n}@example.com', DEPARTMENTS[n % len(DEPARTMENTS)])
+             for n in range(employees)]
+        )
+        conn.executemany(
+            "INSERT INTO attendance (employee_id, date, punch_in, status, approval_status) "
+            "VALUES (?, ?, '09:00:00', ?, ?)",
+            ((f'EMP{n:06d}', day, rng.choice(STATUSES), rng.choice(APPROVALS))
+             for n in range(employees) for day in days)
+        )
+    conn.close()
+
+
+def legacy_weekly_chart(conn):
+    rows = [dict(row) for row in conn.execute(
+        "SELECT * FROM attendance WHERE date >= date('now', '-6 days')"
+    ).fetchall()]
+    week_summary = defaultdict(lambda: {'present': 0, 'absent': 0, 'date': ''})
+    for record in rows:
+        day_name = datetime.strptime(record['date'], '%Y-%m-%d').strftime('%a')
+        if record.get('approval_status') == 'Approved':
+            week_summary[day_name]['present'] += 1
+        else:
+            week_summary[day_name]['absent'] += 1
+        week_summary[day_name]['date'] = record['date']
+    data = []
+    for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']:
+        counts = week_summary.get(day, {'present': 0, 'absent': 0, 'date': ''})
+        total = counts['present'] + counts['absent']
+        data.append({
+            'name': day,
+            'present': counts['present'],
+            'absent': counts['absent'],
+            'attendance_rate': round(counts['present'] / total * 100, 2) if total else 0.0,
+            'date': counts['date'],
+        })
+    return data
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--employees', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        started = time.perf_counter()
+        seed(path, args.employees)
+        print(f"Seeded {args.employees} employees x 7 days in {time.perf_counter() - started:.1f}s\n")
+
+        Config.DATABASE = path
+        model = AdminDashboard()
+        conn = model.conn
+
+        print(f"{'path':<28}{'median ms':>11}{'rows':>6}")
+        legacy_ms, legacy = timed(lambda: legacy_weekly_chart(conn), args.repeat)
+        print(f"{'legacy (rows + Python)':<28}{legacy_ms:>11.1f}{len(legacy):>6}")
+        grouped_ms, grouped = timed(model.get_weekly_attendance_for_chart, args.repeat)
+        print(f"{'grouped query':<28}{grouped_ms:>11.2f}{len(grouped):>6}")
+        department_ms, _ = timed(lambda: model.get_weekly_attendance_for_chart('IT'), args.repeat)
+        print(f"{'grouped query (IT)':<28}{department_ms:>11.2f}{len(grouped):>6}")
+
+        legacy_total = sum(day['present'] + day['absent'] for day in legacy)
+        grouped_total = sum(day['present'] + day['absent'] for day in grouped)
+        print(f"\nrecords counted: legacy={legacy_total} grouped={grouped_total}; "
+              f"speedup {legacy_ms / grouped_ms:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
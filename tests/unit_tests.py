@@ -9,12 +9,32 @@ from app.models.database import Database
 
 
 @pytest.fixture
-def client():
+def client(tmp_path, monkeypatch):
+    from app.config import Config
+
+    # rendered files go under the test's tmp_path, not into the checkout
+    monkeypatch.setattr(Config, 'PAYSLIP_CACHE_DIR', str(tmp_path / 'payslip_cache'))
+    monkeypatch.setattr(Config, 'REPORT_JOB_DIR', str(tmp_path / 'reports'))
     app = create_app(testing=True)
     with app.test_client() as client:
         yield client
 
 
+@pytest.fixture
+def migrated_db(tmp_path, monkeypatch):
+    """Point Config.DATABASE at a fresh, fully migrated file; yields this thread's connection to it."""
+    from app import migrations
+    from app.config import Config
+    from app.models.database import get_pool
+
+    monkeypatch.setattr(Config, 'DATABASE', str(tmp_path / "migrated.db"))
+    pool = get_pool()
+    conn = pool.connection()
+    migrations.upgrade(conn)
+    yield conn
+    pool.release()
+
+
 def test_create_user_as_admin(client):
     user_model = User()   
     profile_model = EmployeeProfile()
@@ -1357,6 +1377,11 @@ def test_employee_growth_chart(client):
     # Fetch employee growth chart
     response = client.get('/dashboard/employee-growth', headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
+    for limit in ('0', '121', '100000'):
+        response = client.get(f'/dashboard/employee-growth?limit={limit}', headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 400
+    response = client.get('/dashboard/employee-growth?limit=120', headers={"Authorization": f"Bearer {token}"})
+    assert len(response.get_json()['data']) == 120
 
 def test_get_weekly_attendance_chart(client):   
     # Admin login
@@ -1368,4 +1393,1148 @@ def test_get_weekly_attendance_chart(client):
     token = login_res.get_json()['access_token']
     # Fetch weekly attendance chart
     response = client.get('/attendance/weekly-chart', headers={"Authorization": f"Bearer {token}"})
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_models_share_pooled_connection(client):
+    from app.models.leave import Leave
+    from app.models.database import get_pool
+
+    pool = get_pool()
+    before = pool.stats()['checkouts']
+
+    assert User().conn is Leave().conn
+    assert pool.stats()['open'] <= pool.size
+
+    # Requests hand their connection back to the pool on teardown
+    client.post('/login', json={"email": "nobody@example.com", "password": "x"})
+    assert pool.stats()['checkouts'] > before
+
+
+def test_connection_pool_checkout_per_thread(tmp_path):
+    import threading
+    from app.models.database import ConnectionPool, PoolTimeoutError
+
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=0.1)
+    main_conn = pool.connection()
+    seen = {}
+
+    def worker():
+        try:
+            pool.connection()
+        except PoolTimeoutError:
+            seen['timed_out'] = True
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen.get('timed_out')
+
+    pool.release()
+    assert pool.stats()['idle'] == 1
+    assert pool.connection() is main_conn
+    assert pool.stats()['waits'] == 1
+
+
+def test_schema_migrations_apply_once(tmp_path):
+    import sqlite3
+    from app import migrations
+
+    conn = sqlite3.connect(str(tmp_path / "fresh.db"))
+    conn.row_factory = sqlite3.Row
+
+    applied = migrations.upgrade(conn)
+    assert applied == [version for version, _, _ in migrations.discover()]
+    assert migrations.upgrade(conn) == []
+    assert migrations.current_version(conn) == applied[-1]
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {'users', 'leaves', 'attendance', 'payroll_records', 'schema_version'} <= tables
+
+
+def test_connections_use_configured_pragma_profile(tmp_path, monkeypatch):
+    from app.config import Config
+    from app.models.database import ConnectionPool, get_pool
+    from app.utils.db_maintenance import run_maintenance
+
+    pool = ConnectionPool(str(tmp_path / "wal.db"), pragmas=Config.SQLITE_PRAGMAS)
+    conn = pool.connection()
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == Config.SQLITE_PRAGMAS['journal_mode'].lower()
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == Config.SQLITE_PRAGMAS['busy_timeout']
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    assert run_maintenance(conn)['busy'] == 0
+
+    # without a connection it borrows one, leaving the caller's checked out
+    monkeypatch.setattr(Config, 'DATABASE', pool.database)
+    own = get_pool().connection()
+    assert run_maintenance()['busy'] == 0
+    assert get_pool().holds_connection() and get_pool().connection() is own
+    get_pool().release()
+    run_maintenance()
+    assert not get_pool().holds_connection()
+
+
+def test_attendance_queries_do_not_scan_full_table(tmp_path, monkeypatch):
+    """Every attendance query the models run must be index-driven on a 1M-row table."""
+    import re
+    from app import migrations
+    from app.config import Config
+    from app.models.attendence import Attendence
+    from app.models.admin_dashboard import AdminDashboard
+
+    monkeypatch.setattr(Config, 'DATABASE', str(tmp_path / "plans.db"))
+    attendance_model = Attendence()
+    dashboard_model = AdminDashboard()
+    conn = attendance_model.conn
+
+    # Load the data on the base schema, then build every later index/trigger on top of it
+    migrations.upgrade(conn, target=1)
+    with conn:
+        conn.execute('''
+            INSERT INTO users (employee_id, name, email, department, role, password_hash)
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000)
+            SELECT printf('EMP%04d', i), 'Employee ' || i, 'employee' || i || '@example.com',
+                   CASE i % 3 WHEN 0 THEN 'IT' WHEN 1 THEN 'HR' ELSE 'Finance' END, 'Employee', 'x'
+            FROM n
+        ''')
+        conn.execute('''
+            INSERT INTO attendance (employee_id, punch_in, date, status, is_manual, approval_status)
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < 999999)
+            SELECT printf('EMP%04d', i % 1000 + 1),
+                   date('2022-01-01', '+' || (i / 1000) || ' days') || 'T09:00:00',
+                   date('2022-01-01', '+' || (i / 1000) || ' days'),
+                   CASE WHEN i % 7 = 0 THEN 'Late' ELSE 'On Time' END,
+                   CASE WHEN i % 50 = 0 THEN 1 ELSE 0 END,
+                   CASE WHEN i % 500 = 0 THEN 'Pending' ELSE 'Approved' END
+            FROM n
+        ''')
+    migrations.upgrade(conn)
+    conn.execute('ANALYZE')
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        attendance_model.punch_out('EMP0001')
+        attendance_model.get_by_employee('EMP0001', '2023-01-01', '2023-03-31', 'date', 'desc')
+        attendance_model.get_pending_requests(1, 10)
+        attendance_model.get_pending_count()
+        attendance_model.getAttendenceNameAndPeriod('Employee 42', '2023-01-01', '2023-01-31')
+        attendance_model.get_all_employee_records('EMP0001', 3, 10)
+        attendance_model.get_all_employee_records_of_employee('EMP0001')
+        attendance_model.get_employee_id_for_record(1)
+        dashboard_model.get_pending_attendance_requests()
+        dashboard_model.get_approved_attendance_requests()
+        dashboard_model.get_employees_on_leave_today()
+        dashboard_model.get_weekly_attendance_for_chart()
+    finally:
+        conn.set_trace_callback(None)
+
+    queries = [sql for sql in statements if re.match(r'\s*(SELECT|UPDATE|DELETE|WITH)\b', sql, re.I)]
+    assert len(queries) >= 12
+    for sql in queries:
+        plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+        scans = [step for step in plan if re.match(r'SCAN (attendance|a)\b', step)]
+        assert not scans, f"Full attendance scan in:\n{sql}\nplan: {plan}"
+
+
+def test_users_cursor_pagination_matches_pages(client):
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    token = login_res.get_json()['access_token']
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get('/users?page=1&per_page=2', headers=headers).get_json()
+    second = client.get('/users?page=2&per_page=2', headers=headers).get_json()
+    assert first['next_cursor']
+
+    by_cursor = client.get(f"/users?per_page=2&cursor={first['next_cursor']}", headers=headers).get_json()
+    assert [u['id'] for u in by_cursor['items']] == [u['id'] for u in second['items']]
+    assert by_cursor['total'] == first['total']
+
+    bad = client.get('/users?per_page=2&cursor=not-a-cursor', headers=headers)
+    assert bad.status_code == 400
+
+    from app.utils.pagination import encode_cursor
+    nested = client.get(f"/users?per_page=2&cursor={encode_cursor([1, 2])}", headers=headers)
+    assert nested.status_code == 400
+
+
+def test_user_count_cache_skips_and_invalidates(client):
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    token = login_res.get_json()['access_token']
+    headers = {"Authorization": f"Bearer {token}"}
+
+    if User().get_by_email("countcache@example.com"):
+        User().hard_delete_by_email("countcache@example.com")
+
+    skipped = client.get('/users?per_page=2&include_total=false', headers=headers).get_json()
+    assert skipped['total'] is None and skipped['total_pages'] is None
+
+    before = client.get('/users?per_page=2', headers=headers).get_json()['total']
+    created = client.post('/users', json={
+        "name": "Count Cache",
+        "email": "countcache@example.com",
+        "phone": "1234567890",
+        "department": "IT",
+        "role": "Employee",
+        "password": "Password123"
+    }, headers=headers)
+    assert created.status_code == 201
+    after = client.get('/users?per_page=2', headers=headers).get_json()['total']
+    assert after == before + 1
+
+    search = client.get('/users/search?name=Count', headers=headers).get_json()
+    assert search['total'] == 1 and search['total_is_estimate'] is False
+
+
+def test_employee_search_index_follows_user_and_profile_writes(client):
+    users = User()
+    if users.get_by_email("ftsperson@example.com"):
+        users.hard_delete_by_email("ftsperson@example.com")
+    users.add("Fulltext Person", "ftsperson@example.com", "1234567890", "Research", "Employee", "x")
+    user = users.get_by_email("ftsperson@example.com")
+
+    # prefix matching on any indexed column
+    assert [u['email'] for u in users.search("fullt", 1, 10)] == ["ftsperson@example.com"]
+    assert [u['email'] for u in users.search(user['employee_id'][:5] + " resea", 1, 10)][:1] == ["ftsperson@example.com"]
+
+    users.update(user['id'], "Renamed Person", user['email'], user['phone'], user['department'], user['role'])
+    assert users.search("fulltext", 1, 10) == []
+    assert users.get_total_search_count("renamed") == (1, False)
+
+    EmployeeProfile().create_profile(user['employee_id'], {"job_details": {"title": "Spectroscopist"}})
+    profiles = EmployeeProfile().get_all(10, key="spectro")
+    assert [p['user_id'] for p in profiles] == [user['employee_id']]
+
+    users.hard_delete_by_employee_id(user['employee_id'])
+    assert users.search("renamed", 1, 10) == []
+
+
+def test_bulk_create_users_reports_per_row(client, monkeypatch):
+    from app.config import Config
+
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    token = login_res.get_json()['access_token']
+    headers = {"Authorization": f"Bearer {token}"}
+
+    emails = ["bulk1@example.com", "bulk2@example.com", "bulk3@example.com", "bulk4@example.com"]
+    for email in emails:
+        if User().get_by_email(email):
+            User().hard_delete_by_email(email)
+
+    rows = [
+        {"name": "Bulk One", "email": "Bulk1@example.com", "phone": "1", "department": "IT", "role": "Employee", "password": "Password123"},
+        {"name": "Bulk Dup", "email": "bulk1@example.com", "phone": "1", "department": "IT", "role": "Employee", "password": "Password123"},
+        {"name": "No Email", "role": "Employee", "password": "Password123"},
+        {"name": "Bulk Two", "email": "bulk2@example.com", "phone": "2", "department": "HR", "role": "Employee", "password": "Password123"},
+        "not an object",
+        None,
+    ]
+    response = client.post('/users/bulk', json=rows, headers=headers)
+    assert response.status_code == 207
+    report = response.get_json()
+    assert report['created'] == 2 and report['failed'] == 4
+    assert [r['status'] for r in report['results']] == ['created', 'error', 'error', 'created', 'error', 'error']
+    assert report['results'][4]['error'] == 'Row must be an object'
+
+    employee_id = report['results'][0]['employee_id']
+    assert EmployeeProfile().get_by_employee_id(employee_id) is not None
+    balance = Database().conn.execute(
+        'SELECT annual FROM leave_balances WHERE employee_id = ?', (employee_id,)
+    ).fetchone()
+    assert balance is not None
+
+    csv_body = "name,email,phone,department,role,password\nBulk Three,bulk3@example.com,,IT,Employee,Password123\n"
+    response = client.post('/users/bulk', data=csv_body, content_type='text/csv', headers=headers)
+    assert response.status_code == 201
+    assert client.post('/login', json={"email": "bulk3@example.com", "password": "Password123"}).status_code == 200
+
+    # a bad byte in a later batch: earlier batches stay created and are reported
+    monkeypatch.setattr(Config, 'BULK_BATCH_SIZE', 1)
+    csv_bytes = (b"name,email,phone,department,role,password\n"
+                 b"Bulk Four,bulk4@example.com,,IT,Employee,Password123\n"
+                 b"Bulk \xff,bulk5@example.com,,IT,Employee,Password123\n")
+    response = client.post('/users/bulk', data=csv_bytes, content_type='text/csv', headers=headers)
+    assert response.status_code == 207
+    report = response.get_json()
+    assert [(r['row'], r['status']) for r in report['results']] == [(1, 'created'), (2, 'error')]
+    assert report['results'][1]['error'].startswith('Unreadable CSV')
+    assert User().get_by_email("bulk4@example.com") and not User().get_by_email("bulk5@example.com")
+    response = client.post('/users/bulk', data=b"\xff\xfe", content_type='text/csv', headers=headers)
+    assert response.status_code == 400 and response.get_json()['failed'] == 1
+
+
+def test_employee_id_sequence_reserves_disjoint_ranges(client):
+    import threading
+    from app.models.sequence import Sequence
+    from app.models.user import format_employee_id
+    from app.models.database import release_connection
+
+    starts = []
+
+    def reserve():
+        starts.append(Sequence('employee_id').reserve(5))
+        release_connection()
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    assert all(later - earlier >= 5 for earlier, later in zip(starts, starts[1:]))
+
+    block = Sequence('employee_id', block_size=3)
+    first = block.next()
+    assert [block.next(), block.next()] == [first + 1, first + 2]
+    assert block.next() > starts[-1]
+
+    assert format_employee_id(42) == "EMP0042"
+    assert format_employee_id(12345) == "EMP12345"
+
+
+def test_write_behind_punches_are_visible_before_flush(client, monkeypatch, tmp_path):
+    from app.config import Config
+    from app.models.attendence import Attendence
+    from app.models.punch_queue import get_punch_queue
+    from app.utils.punch_flusher import flush_punches
+
+    monkeypatch.setattr(Config, 'ATTENDANCE_WRITE_BEHIND', True)
+    monkeypatch.setattr(Config, 'ATTENDANCE_QUEUE_DATABASE', str(tmp_path / 'queue.db'))
+
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    token = login_res.get_json()['access_token']
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post('/attendance/punch-in', headers=headers).status_code == 200
+    assert client.post('/attendance/punch-out', headers=headers).status_code == 200
+
+    queued = get_punch_queue().peek(10)
+    assert [event['kind'] for event in queued] == ['in', 'out']
+    records = client.get('/attendance/my-records?sort_by=punch_in&order=desc', headers=headers).get_json()
+    assert records[0]['pending'] is True
+    assert records[0]['punch_in'] == queued[0]['at'] and records[0]['punch_out'] == queued[1]['at']
+
+    assert flush_punches() == 2
+    assert get_punch_queue().depth() == 0
+    # a replayed batch (crash before acknowledge) must not duplicate the punch
+    Attendence().apply_punches(queued)
+    records = client.get('/attendance/my-records?sort_by=punch_in&order=desc', headers=headers).get_json()
+    matching = [r for r in records if r['punch_in'] == queued[0]['at']]
+    assert len(matching) == 1 and 'pending' not in matching[0]
+    assert matching[0]['punch_out'] == queued[1]['at']
+
+
+def test_attendance_daily_rollup_tracks_writes(migrated_db):
+    from app.models.attendence import Attendence
+
+    attendance = Attendence()
+    conn = migrated_db
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash) VALUES (?, ?, ?, ?, 'Employee', 'x')",
+            [('EMP0001', 'A', 'a@example.com', 'IT'), ('EMP0002', 'B', 'b@example.com', 'HR')]
+        )
+
+    def manual(employee_id, day, status, approval):
+        attendance.manual_request(employee_id, {
+            'punch_in': '09:00', 'punch_out': '17:00', 'date': day,
+            'status': status, 'approval_status': approval
+        })
+
+    manual('EMP0001', '2024-05-01', 'Late', 'Pending')
+    manual('EMP0001', '2024-05-02', 'Leave', 'Approved')
+    manual('EMP0002', '2024-05-01', 'On Time', 'Pending')
+    pending = conn.execute("SELECT id FROM attendance WHERE employee_id = 'EMP0002'").fetchone()['id']
+    attendance.approve_manual(pending, 'EMP0001')
+    with conn:
+        conn.execute("UPDATE users SET department = 'Finance' WHERE employee_id = 'EMP0002'")
+        conn.execute("DELETE FROM attendance WHERE employee_id = 'EMP0001' AND date = '2024-05-02'")
+
+    def snapshot():
+        return [tuple(row) for row in conn.execute(
+            'SELECT * FROM attendance_daily_rollup WHERE total > 0 ORDER BY date, department'
+        )]
+
+    incremental = snapshot()
+    assert [(row[0], row[1], row[2]) for row in incremental] == [
+        ('2024-05-01', 'Finance', 1), ('2024-05-01', 'IT', 1)
+    ]
+    attendance.rebuild_daily_rollup()
+    assert snapshot() == incremental
+
+    # deleting a user (cascading to attendance) takes their counts with them
+    with conn:
+        conn.execute("DELETE FROM users WHERE employee_id = 'EMP0001'")
+    assert [row[1] for row in snapshot()] == ['Finance']
+
+
+def test_weekly_attendance_chart_is_one_row_per_day(migrated_db):
+    from datetime import date, timedelta
+    from app.models.admin_dashboard import AdminDashboard
+
+    dashboard = AdminDashboard()
+    conn = migrated_db
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash) VALUES (?, ?, ?, ?, 'Employee', 'x')",
+            [('EMP0001', 'A', 'a@example.com', 'IT'), ('EMP0002', 'B', 'b@example.com', 'HR'),
+             ('EMP0003', 'C', 'c@example.com', 'IT')]
+        )
+        conn.execute("UPDATE users SET status = 'Inactive' WHERE employee_id = 'EMP0003'")
+        conn.executemany(
+            "INSERT INTO attendance (employee_id, date, punch_in, status, approval_status) VALUES (?, ?, '09:00:00', ?, ?)",
+            [('EMP0001', today.isoformat(), 'On Time', 'Approved'),
+             ('EMP0002', today.isoformat(), 'Leave', 'Approved'),
+             ('EMP0003', today.isoformat(), 'On Time', 'Approved'),
+             ('EMP0002', yesterday.isoformat(), 'On Time', 'Approved'),
+             ('EMP0001', (today - timedelta(days=7)).isoformat(), 'On Time', 'Approved')]
+        )
+
+    chart = dashboard.get_weekly_attendance_for_chart()
+    assert [day['name'] for day in chart] == ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    by_date = {day['date']: day for day in chart}
+    assert sorted(by_date) == [(today - timedelta(days=n)).isoformat() for n in range(6, -1, -1)]
+    assert by_date[today.isoformat()] == {
+        'name': today.strftime('%a'), 'present': 1, 'absent': 1,
+        'attendance_rate': 50.0, 'date': today.isoformat()
+    }
+    assert by_date[yesterday.isoformat()]['present'] == 1
+    # days without attendance are zero-filled; records older than a week and
+    # those of inactive employees are ignored
+    assert sum(day['present'] + day['absent'] for day in chart) == 3
+
+    it_chart = {day['date']: day for day in dashboard.get_weekly_attendance_for_chart('IT')}
+    assert len(it_chart) == 7
+    assert (it_chart[today.isoformat()]['present'], it_chart[today.isoformat()]['absent']) == (1, 0)
+    assert it_chart[yesterday.isoformat()]['present'] == 0
+
+
+def test_dashboard_stats_are_one_query_behind_shared_cache(migrated_db):
+    from datetime import date
+    from app.models.user import User
+    from app.service.admin_dashboard_service import AdminDashboardService
+    from app.utils.cache import dashboard_cache
+
+    service = AdminDashboardService()
+    model = service.model
+    conn = migrated_db
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash) VALUES (?, ?, ?, ?, 'Employee', 'x')",
+            [('EMP0001', 'A', 'a@example.com', 'IT'), ('EMP0002', 'B', 'b@example.com', 'HR')]
+        )
+        conn.execute(
+            "INSERT INTO attendance (employee_id, date, punch_in, status, is_manual, approval_status) "
+            "VALUES ('EMP0001', ?, '09:00:00', 'Leave', 1, 'Pending')", (date.today().isoformat(),)
+        )
+
+    stats = service.get_dashboard_stats()
+    assert stats == {
+        'total_employees': model.get_total_active_employees(),
+        'pending_requests': model.get_pending_attendance_requests(),
+        'approved_requests': model.get_approved_attendance_requests(),
+        'employees_on_leave': model.get_employees_on_leave_today(),
+    } == {'total_employees': 2, 'pending_requests': 1, 'approved_requests': 0, 'employees_on_leave': 1}
+    assert service.get_employee_counts_by_department() == {'IT': 1, 'HR': 1}
+
+    # Writes behind the models' back are served stale until invalidated
+    hits = dashboard_cache.stats()['hits']
+    with conn:
+        conn.execute("UPDATE users SET department = 'HR' WHERE employee_id = 'EMP0001'")
+    assert service.get_employee_counts_by_department() == {'IT': 1, 'HR': 1}
+    assert dashboard_cache.stats()['hits'] == hits + 1
+    User().invalidate('users')
+    assert service.get_employee_counts_by_department() == {'HR': 2}
+
+
+def test_employee_growth_returns_limit_months_with_running_totals(migrated_db):
+    from datetime import date
+    from app.models.admin_dashboard import AdminDashboard
+
+    dashboard = AdminDashboard()
+    conn = migrated_db
+    month = lambda offset: conn.execute(
+        "SELECT datetime(?, 'start of month', ?, '+3 days')", (date.today().isoformat(), f'{offset} months')
+    ).fetchone()[0]
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, role, status, password_hash, created_at) VALUES (?, ?, ?, ?, ?, 'x', ?)",
+            [('EMP0001', 'A', 'a@example.com', 'Employee', 'Active', month(-30)),
+             ('EMP0002', 'B', 'b@example.com', 'Employee', 'Active', month(-2)),
+             ('EMP0003', 'C', 'c@example.com', 'Employee', 'Active', month(0)),
+             ('EMP0004', 'D', 'd@example.com', 'Admin', 'Active', month(-1)),
+             ('EMP0005', 'E', 'e@example.com', 'Employee', 'Inactive', month(-1))]
+        )
+
+    growth = dashboard.get_employee_growth_data(limit=4)
+    # The hire from 30 months ago is outside the window but still counted
+    assert [row['employees'] for row in growth] == [1, 2, 2, 3]
+    labels = [conn.execute("SELECT strftime('%m', ?)", (month(offset),)).fetchone()[0] for offset in range(-3, 1)]
+    assert [row['month'] for row in growth] == [
+        'JanFebMarAprMayJunJulAugSepOctNovDec'[3 * int(m) - 3:3 * int(m)] for m in labels
+    ]
+    plan = ' '.join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM users WHERE role != 'Admin' AND status = 'Active' "
+        "AND created_at >= ? AND created_at < ?", ('2024-01-01', '2024-02-01')
+    ))
+    assert 'idx_users_status_created_at (status=? AND created_at>? AND created_at<?)' in plan
+
+
+def test_dashboard_stream_pushes_published_writes(client):
+    import json
+    from app.models.user import User
+    from app.service import attendence_service
+    from app.utils.events import dashboard_events
+
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    token = login_res.get_json()['access_token']
+    admin = User().get_by_email("testadmin@example.com")
+
+    response = client.get('/dashboard/stream', headers={"Authorization": f"Bearer {token}"}, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+
+    def next_event():
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+        return fields['event'], json.loads(fields['data']), fields.get('id')
+
+    assert next(chunks).strip() in ('retry: 3000', b'retry: 3000')
+    event, stats, _ = next_event()
+    assert event == 'stats' and set(stats) == {
+        'total_employees', 'pending_requests', 'approved_requests', 'employees_on_leave'
+    }
+
+    attendence_service.manual_request(admin['employee_id'], {
+        'punch_in': '09:00', 'punch_out': '17:00', 'date': '2001-01-01'
+    })
+    event, data, event_id = next_event()
+    assert event == 'attendance_request'
+    assert (data['employee_id'], data['approval_status']) == (admin['employee_id'], 'Pending')
+
+    # A reconnecting client gets what it missed from the backlog
+    resumed = dashboard_events.subscribe(int(event_id) - 1)
+    assert resumed.get(timeout=0)['type'] == 'attendance_request'
+    dashboard_events.unsubscribe(resumed)
+
+    response.close()
+    assert dashboard_events.subscriber_count() == 0
+    with User().conn as conn:
+        conn.execute("DELETE FROM attendance WHERE employee_id = ? AND date = '2001-01-01'", (admin['employee_id'],))
+
+
+def test_leave_calendar_counts_working_days_and_half_days():
+    from datetime import date, timedelta
+    from app.utils.leave_days import LeaveCalendar
+
+    holidays = ['2024-12-25', '2024-12-28', '2025-01-01']  # 28th is a Saturday
+    calendar = LeaveCalendar((5, 6), holidays)
+    start = date(2024, 12, 1)
+    for span in range(0, 60):
+        end = start + timedelta(days=span)
+        days = [start + timedelta(days=n) for n in range(span + 1)]
+        expected = sum(1 for d in days if d.weekday() < 5 and d.isoformat() not in holidays)
+        assert calendar.working_days(start, end) == expected
+        assert calendar.calendar_days(start, end) == span + 1
+
+    # Mon 23rd - Fri 27th around Christmas: 4 working days, the first taken as a half
+    assert calendar.duration('2024-12-23', '2024-12-27', working=True, start_half=True) == 3.5
+    assert calendar.duration('2024-12-24', '2024-12-24', end_half=True) == 0.5
+    # A half day on a weekend end date does not count twice
+    assert calendar.duration('2024-12-23', '2024-12-29', working=True, end_half=True) == 4
+    assert calendar.duration('2024-12-27', '2024-12-23') == 0
+    # A year-long leave is still arithmetic, not a day-by-day walk
+    assert calendar.calendar_days('2024-01-01', '2024-12-31') == 366
+
+
+def test_apply_leave_counts_working_days_against_holidays(client, monkeypatch):
+    from app.config import Config
+    from app.models.holiday import Holiday
+
+    setup_test_users()
+    monkeypatch.setattr(Config, 'LEAVE_WORKING_DAY_TYPES', frozenset({'annual'}))
+    admin_token = client.post('/login', json={"email": "adminleave@example.com", "password": "AdminPass123"}).get_json()['access_token']
+    emp_token = client.post('/login', json={"email": "leaveuser@example.com", "password": "EmpPass123"}).get_json()['access_token']
+
+    Holiday().delete('2025-08-06')
+    added = client.post('/leave/holidays', json={"date": "2025-08-06", "name": "Company Day"},
+                        headers={"Authorization": f"Bearer {admin_token}"})
+    assert added.status_code == 201
+
+    # Mon 4th - Sun 10th: 5 weekdays, one holiday, last working day is a half
+    apply = client.post('/leave/apply',
+        json={"leave_type": "annual", "start_date": "2025-08-04", "end_date": "2025-08-10",
+              "reason": "Trip", "start_half": True},
+        headers={"Authorization": f"Bearer {emp_token}"})
+    assert apply.status_code == 201
+    assert apply.get_json()['days'] == 3.5
+
+    weekend = client.post('/leave/apply',
+        json={"leave_type": "annual", "start_date": "2025-08-09", "end_date": "2025-08-10", "reason": "Weekend"},
+        headers={"Authorization": f"Bearer {emp_token}"})
+    assert weekend.status_code == 400
+
+    backwards = client.post('/leave/apply',
+        json={"leave_type": "casual", "start_date": "2025-08-10", "end_date": "2025-08-04", "reason": "Oops"},
+        headers={"Authorization": f"Bearer {emp_token}"})
+    assert backwards.status_code == 400
+
+    approve = client.put(f"/leave/{apply.get_json()['leave_id']}/status", json={"status": "Approved"},
+                         headers={"Authorization": f"Bearer {admin_token}"})
+    assert approve.status_code == 200
+    balance = client.get('/leave/balance', headers={"Authorization": f"Bearer {emp_token}"}).get_json()
+    assert balance['annual'] == 1.5
+
+    holidays = client.get('/leave/holidays?year=2025', headers={"Authorization": f"Bearer {emp_token}"}).get_json()
+    assert {"date": "2025-08-06", "name": "Company Day"} in holidays
+    assert client.delete('/leave/holidays/2025-08-06', headers={"Authorization": f"Bearer {admin_token}"}).status_code == 200
+
+
+def test_leave_approval_is_atomic_and_ledgered(client):
+    import threading
+    from app.models.leave import Leave
+
+    emp_emp_id, _ = setup_test_users()  # employee starts with 3 casual days
+    emp_token = client.post('/login', json={"email": "leaveuser@example.com", "password": "EmpPass123"}).get_json()['access_token']
+    admin_token = client.post('/login', json={"email": "adminleave@example.com", "password": "AdminPass123"}).get_json()['access_token']
+
+    leave_ids = []
+    for start, end in (("2025-09-01", "2025-09-02"), ("2025-09-08", "2025-09-09")):
+        apply = client.post('/leave/apply',
+            json={"leave_type": "casual", "start_date": start, "end_date": end, "reason": "Errand"},
+            headers={"Authorization": f"Bearer {emp_token}"})
+        assert apply.status_code == 201
+        leave_ids.append(apply.get_json()['leave_id'])
+
+    # Two approvals racing for 2 + 2 days out of 3: exactly one may win
+    leave_model = Leave()
+    leaves = [leave_model.get_by_id(leave_id) for leave_id in leave_ids]
+    outcomes = []
+    barrier = threading.Barrier(2)
+
+    def approve(leave):
+        barrier.wait()
+        outcomes.append(Leave().review(leave, 'Approved', 'ADMIN', 2))
+
+    threads = [threading.Thread(target=approve, args=(leave,)) for leave in leaves]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes) == ['insufficient_balance', 'reviewed']
+    assert leave_model.get_leave_balance(emp_emp_id, 'casual') == 1
+
+    approved = next(leave_id for leave_id in leave_ids if leave_model.get_by_id(leave_id)['status'] == 'Approved')
+    again = client.put(f'/leave/{approved}/status', json={"status": "Approved"},
+                       headers={"Authorization": f"Bearer {admin_token}"})
+    assert again.status_code == 409
+
+    ledger = client.get('/leave/ledger?leave_type=casual', headers={"Authorization": f"Bearer {emp_token}"}).get_json()
+    assert [(e['entry_type'], e['delta'], e['balance']) for e in ledger['items']] == [('debit', -2, 1), ('opening', 3, 3)]
+    assert ledger['items'][0]['leave_id'] == approved
+    others = client.get('/leave/ledger?employee_id=EMP0001', headers={"Authorization": f"Bearer {emp_token}"})
+    assert others.status_code == 403
+    as_admin = client.get(f'/leave/ledger?employee_id={emp_emp_id}', headers={"Authorization": f"Bearer {admin_token}"})
+    assert as_admin.get_json()['total'] == 5
+
+
+def test_bulk_leave_review_reports_per_item(client):
+    emp_emp_id, admin_emp_id = setup_test_users()  # employee: 3 casual, 2 sick days
+    emp_token = client.post('/login', json={"email": "leaveuser@example.com", "password": "EmpPass123"}).get_json()['access_token']
+    admin_token = client.post('/login', json={"email": "adminleave@example.com", "password": "AdminPass123"}).get_json()['access_token']
+
+    def apply(token, leave_type, start, end):
+        res = client.post('/leave/apply',
+            json={"leave_type": leave_type, "start_date": start, "end_date": end, "reason": "Bulk"},
+            headers={"Authorization": f"Bearer {token}"})
+        assert res.status_code == 201
+        return res.get_json()['leave_id']
+
+    first = apply(emp_token, "casual", "2025-10-01", "2025-10-02")
+    second = apply(emp_token, "casual", "2025-10-06", "2025-10-07")  # only 1 casual day left by then
+    sick = apply(emp_token, "sick", "2025-10-13", "2025-10-13")
+    own = apply(admin_token, "sick", "2025-10-20", "2025-10-20")
+
+    res = client.put('/leave/status/bulk', json={"decisions": [
+        {"leave_id": first, "status": "Approved"},
+        {"leave_id": second, "status": "Approved"},
+        {"leave_id": sick, "status": "Rejected"},
+        {"leave_id": own, "status": "Approved"},
+        {"leave_id": 999999, "status": "Approved"},
+        {"leave_id": first, "status": "Rejected"},
+    ]}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 207
+    report = res.get_json()
+    assert (report['reviewed'], report['failed']) == (2, 4)
+    assert [r['result'] for r in report['results']] == ['reviewed', 'error', 'reviewed', 'error', 'error', 'error']
+    assert 'Insufficient casual balance' in report['results'][1]['error']
+
+    balance = client.get('/leave/balance', headers={"Authorization": f"Bearer {emp_token}"}).get_json()
+    assert (balance['casual'], balance['sick']) == (1, 2)
+
+    again = client.put('/leave/status/bulk', json={"leave_ids": [first, sick], "status": "Approved"},
+                       headers={"Authorization": f"Bearer {admin_token}"})
+    assert again.status_code == 400
+    assert client.put('/leave/status/bulk', json={"decisions": [{"leave_id": "x"}]},
+                      headers={"Authorization": f"Bearer {admin_token}"}).status_code == 400
+
+
+def test_leave_overlap_rejected_and_calendar_lists_who_is_off(client):
+    from app.models.leave import Leave
+
+    emp_emp_id, admin_emp_id = setup_test_users()
+    emp_token = client.post('/login', json={"email": "leaveuser@example.com", "password": "EmpPass123"}).get_json()['access_token']
+    admin_token = client.post('/login', json={"email": "adminleave@example.com", "password": "AdminPass123"}).get_json()['access_token']
+
+    def apply(token, start, end, **extra):
+        return client.post('/leave/apply',
+            json={"leave_type": "annual", "start_date": start, "end_date": end, "reason": "Calendar", **extra},
+            headers={"Authorization": f"Bearer {token}"})
+
+    first = apply(emp_token, "2025-11-03", "2025-11-05", end_half=True)
+    assert first.status_code == 201
+    clash = apply(emp_token, "2025-11-05", "2025-11-06")
+    assert clash.status_code == 409
+    assert clash.get_json()['conflicting_leave_id'] == first.get_json()['leave_id']
+    # Other employees, and this employee's rejected leaves, do not block
+    assert apply(admin_token, "2025-11-04", "2025-11-04").status_code == 201
+    rejected = apply(emp_token, "2025-11-10", "2025-11-10")
+    Leave().review(Leave().get_by_id(rejected.get_json()['leave_id']), 'Rejected', admin_emp_id)
+    assert apply(emp_token, "2025-11-10", "2025-11-11").status_code == 201
+
+    res = client.get('/leave/calendar?from=2025-11-04&to=2025-11-06', headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 200
+    days = {day['date']: day['off'] for day in res.get_json()['days']}
+    assert list(days) == ['2025-11-04', '2025-11-05', '2025-11-06']
+    assert sorted(o['employee_id'] for o in days['2025-11-04']) == sorted([emp_emp_id, admin_emp_id])
+    assert [(o['employee_id'], o['half_day']) for o in days['2025-11-05']] == [(emp_emp_id, True)]
+    assert days['2025-11-06'] == []
+
+    # Employees only see their own department
+    it_only = client.get('/leave/calendar?from=2025-11-04&to=2025-11-04', headers={"Authorization": f"Bearer {emp_token}"})
+    assert [o['employee_id'] for o in it_only.get_json()['days'][0]['off']] == [emp_emp_id]
+    assert client.get('/leave/calendar?from=2025-11-04&to=2025-11-04&department=HR',
+                      headers={"Authorization": f"Bearer {emp_token}"}).status_code == 403
+
+    plan = ' '.join(row[3] for row in Leave().conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM leave_intervals WHERE start_day <= 2460990 AND end_day >= 2460980"
+    ))
+    assert 'VIRTUAL TABLE INDEX' in plan
+
+
+def test_leave_accrual_runs_once_per_month_with_year_end_reset(migrated_db):
+    from datetime import date
+    from app.models.leave_accrual import LeaveAccrual
+    from app.utils.leave_accrual import due_periods
+
+    accrual = LeaveAccrual()
+    conn = migrated_db
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, created_at) "
+            "VALUES (?, ?, ?, 'IT', 'Employee', 'x', ?)",
+            [('EMP0001', 'A', 'a@example.com', '2024-01-15'), ('EMP0002', 'B', 'b@example.com', '2025-03-02')]
+        )
+        conn.executemany(
+            "INSERT INTO leave_balances (employee_id, annual, casual, sick, maternity) VALUES (?, ?, 0, 0, 0)",
+            [('EMP0001', 24.5), ('EMP0002', 0)]
+        )
+    accrual.set_policy('annual', 1.75, max_balance=25, carry_over_cap=5)
+
+    def annual(employee_id):
+        return conn.execute('SELECT annual FROM leave_balances WHERE employee_id = ?', (employee_id,)).fetchone()[0]
+
+    december = accrual.run('2024-12')
+    assert (december['status'], december['employees'], december['entries']) == ('applied', 1, 1)
+    assert annual('EMP0001') == 25  # capped at max_balance
+    assert accrual.run('2024-12')['status'] == 'skipped'
+    assert annual('EMP0001') == 25
+
+    january = accrual.run('2025-01')
+    assert annual('EMP0001') == 6.75  # trimmed to the carry-over cap, then accrued
+    assert annual('EMP0002') == 0     # joined after the period
+    assert january['entries'] == 2
+
+    ledger = conn.execute(
+        "SELECT entry_type, delta, balance, created_by FROM leave_ledger "
+        "WHERE employee_id = 'EMP0001' AND entry_type != 'opening' ORDER BY id"
+    ).fetchall()
+    assert [tuple(row) for row in ledger] == [
+        ('accrual', 0.5, 25, 'accrual:2024-12'),
+        ('carry_over_reset', -20, 5, 'accrual:2025-01'),
+        ('accrual', 1.75, 6.75, 'accrual:2025-01'),
+    ]
+    assert accrual.last_period() == '2025-01'
+    assert due_periods('2025-01', date(2025, 3, 9)) == ['2025-02', '2025-03']
+    assert due_periods(None, date(2025, 3, 9)) == ['2025-03']
+    with pytest.raises(ValueError):
+        accrual.run('2025-13')
+
+
+def test_leave_accrual_never_lowers_a_balance_above_max(migrated_db):
+    from app.models.leave_accrual import LeaveAccrual
+
+    accrual = LeaveAccrual()
+    conn = migrated_db
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, created_at) "
+            "VALUES (?, ?, ?, 'IT', 'Employee', 'x', '2024-01-01')",
+            [('EMP0001', 'A', 'a@example.com'), ('EMP0002', 'B', 'b@example.com')]
+        )
+        conn.executemany(
+            "INSERT INTO leave_balances (employee_id, annual, casual, sick, maternity) VALUES (?, ?, 0, 0, 0)",
+            [('EMP0001', 21), ('EMP0002', 14.5)]
+        )
+    accrual.set_policy('annual', 1, max_balance=15)
+
+    assert accrual.run('2024-03')['entries'] == 1
+    balances = dict(conn.execute('SELECT employee_id, annual FROM leave_balances').fetchall())
+    assert balances == {'EMP0001': 21, 'EMP0002': 15}
+    assert conn.execute(
+        "SELECT COUNT(*) FROM leave_ledger WHERE entry_type = 'accrual' AND delta < 0"
+    ).fetchone()[0] == 0
+
+
+def test_payroll_run_pays_each_active_employee_once(migrated_db, monkeypatch):
+    from app.config import Config
+    from app.service.salary_service import SalaryService
+
+    monkeypatch.setattr(Config, 'PAYSLIP_PRERENDER', False)
+    service = SalaryService()
+    conn = migrated_db
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, status, created_at) "
+            "VALUES (?, ?, ?, 'IT', 'Employee', 'x', ?, ?)",
+            [('EMP0001', 'Profile', 'a@example.com', 'Active', '2024-01-01'),
+             ('EMP0002', 'History', 'b@example.com', 'Active', '2024-01-01'),
+             ('EMP0003', 'Nothing', 'c@example.com', 'Active', '2024-01-01'),
+             ('EMP0004', 'Gone', 'd@example.com', 'Inactive', '2024-01-01'),
+             ('EMP0005', 'Paid', 'e@example.com', 'Active', '2024-01-01'),
+             ('EMP0006', 'Later', 'f@example.com', 'Active', '2024-07-01')]
+        )
+        conn.execute(
+            "INSERT INTO employee_profiles (user_id, salary_details) VALUES ('EMP0001', ?)",
+            (json.dumps({'basic_salary': 5000, 'bonus': 250.5, 'deductions': 800, 'currency': 'USD'}),)
+        )
+    service.salary_model.add_salary_record('EMP0002', '2024-04', 4000, 100, 600, 3500)
+    service.salary_model.add_salary_record('EMP0002', '2024-05', 4200, 300, 650, 3850, pay_frequency='Fortnightly')
+    service.salary_model.add_salary_record('EMP0005', '2024-06', 3000, 0, 0, 3000)
+
+    assert service.run_payroll('2024-6', 'EMP0001')[1] == 400
+    summary, status = service.run_payroll('2024-06', 'EMP0001')
+    assert status == 201
+    assert {key: summary[key] for key in ('employees', 'inserted', 'existing', 'missing')} == {
+        'employees': 4, 'inserted': 2, 'existing': 1, 'missing': 1
+    }
+    assert summary['missing_employee_ids'] == ['EMP0003']
+
+    rows = {row['employee_id']: row for row in service.get_filtered_salary_records(month='2024-06')}
+    assert sorted(rows) == ['EMP0001', 'EMP0002', 'EMP0005']
+    assert (rows['EMP0001']['net_salary'], rows['EMP0001']['currency']) == (4450.5, 'USD')
+    # latest record supplies the recurring components; bonuses are not repeated
+    assert (rows['EMP0002']['basic_salary'], rows['EMP0002']['bonus'], rows['EMP0002']['net_salary'],
+            rows['EMP0002']['pay_frequency']) == (4200, 0, 3550, 'Fortnightly')
+
+    again, status = service.run_payroll('2024-06', 'EMP0001')
+    assert status == 200 and again['inserted'] == 2
+    assert conn.execute("SELECT COUNT(*) FROM payroll_records WHERE salary_month = '2024-06'").fetchone()[0] == 3
+
+
+def test_payroll_run_skips_unusable_salary_profiles(migrated_db, monkeypatch):
+    from app.config import Config
+    from app.service.salary_service import SalaryService
+
+    monkeypatch.setattr(Config, 'PAYSLIP_PRERENDER', False)
+    service = SalaryService()
+    conn = migrated_db
+    profiles = {
+        'EMP0001': {'basic_salary': 5000},
+        'EMP0002': {'basic_salary': '5,000'},
+        'EMP0003': {'basic_salary': 4000, 'deductions': [100]},
+        'EMP0004': {'basic_salary': None, 'currency': None},
+        'EMP0005': {'basic_salary': '3500.50', 'bonus': None},
+    }
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, created_at) "
+            "VALUES (?, ?, ?, 'IT', 'Employee', 'x', '2024-01-01')",
+            [(employee_id, employee_id, f'{employee_id}@example.com') for employee_id in profiles]
+        )
+        conn.executemany(
+            "INSERT INTO employee_profiles (user_id, salary_details) VALUES (?, ?)",
+            [(employee_id, json.dumps(details)) for employee_id, details in profiles.items()]
+        )
+    service.salary_model.add_salary_record('EMP0004', '2024-05', 4200, 0, 200, 4000, currency='AUD')
+
+    summary, status = service.run_payroll('2024-06', 'EMP0001')
+    assert status == 201
+    assert (summary['inserted'], sorted(summary['missing_employee_ids'])) == (3, ['EMP0002', 'EMP0003'])
+    rows = {row['employee_id']: row for row in service.get_filtered_salary_records(month='2024-06')}
+    # null profile values fall back to the latest record
+    assert (rows['EMP0004']['basic_salary'], rows['EMP0004']['currency']) == (4200, 'AUD')
+    assert rows['EMP0005']['net_salary'] == 3500.5
+
+
+def test_payroll_kernel_matches_scalar_path(migrated_db):
+    import math
+    import random
+    from app.service.salary_service import SalaryService
+    from app.utils.payroll import PayrollRules, compute_columns, parse_brackets, payslip
+
+    rules = PayrollRules(
+        tax_brackets=parse_brackets('15600:0.105,53500:0.175,78100:0.30,180000:0.33,:0.39'),
+        deduction_rate=0.03, fx_rates={'USD': 1.65}
+    )
+    rng = random.Random(11)
+    rows = [(round(rng.uniform(0, 20000), 2), rng.choice([0, 0, round(rng.uniform(0, 3000), 2)]),
+             round(rng.uniform(0, 900), 2), rng.choice(['NZD', 'USD', 'GBP'])) for _ in range(2000)]
+    periods = [rng.choice([52, 26, 12]) for _ in rows]
+    columns = compute_columns(*zip(*rows), rules, periods)
+    for n, row in enumerate(rows):
+        gross, tax, deductions, net, base = payslip(*row, rules, periods[n])
+        assert (columns['gross'][n], columns['tax'][n], columns['deductions'][n], columns['net'][n]) == \
+            (gross, tax, deductions, net)
+        assert math.isnan(columns['net_base'][n]) if base is None else columns['net_base'][n] == base
+
+    # 6000/month = 72000/year: 1638 + 6632.5 + 5550 = 13820.5 tax a year
+    assert payslip(6000, 0, 0, 'NZD', rules)[1] == 1151.71
+    # the same annual pay taxed fortnightly: 13820.5 / 26
+    assert payslip(72000 / 26, 0, 0, 'NZD', rules, 26)[1] == 531.56
+
+    service = SalaryService()
+    conn = migrated_db
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (employee_id, name, email, department, role, password_hash, created_at) "
+            "VALUES (?, ?, ?, 'IT', 'Employee', 'x', '2024-01-01')",
+            [('EMP0001', 'A', 'a@example.com'), ('EMP0002', 'B', 'b@example.com'),
+             ('EMP0003', 'C', 'c@example.com')]
+        )
+        conn.executemany(
+            "INSERT INTO employee_profiles (user_id, salary_details) VALUES (?, ?)",
+            [('EMP0001', json.dumps({'basic_salary': 6000})),
+             ('EMP0002', json.dumps({'basic_salary': 1000, 'currency': 'USD'})),
+             ('EMP0003', json.dumps({'basic_salary': 500, 'pay_frequency': 'Adjustment'}))]
+        )
+    result, status = service.simulate_payroll('2024-06', {
+        'tax_brackets': [{'upper': None, 'rate': 0.1}], 'fx_rates': {'usd': 2}
+    })
+    assert status == 200
+    assert result['by_currency'] == {
+        'NZD': {'gross': 6000, 'tax': 600, 'deductions': 600, 'net': 5400},
+        'USD': {'gross': 1000, 'tax': 100, 'deductions': 100, 'net': 900},
+    }
+    assert result['net_in_base_currency'] == 7200 and result['unconverted_currencies'] == []
+    assert result['employees'] == 2 and result['missing'] == 1  # no period count for 'Adjustment'
+    assert conn.execute('SELECT COUNT(*) FROM payroll_records').fetchone()[0] == 0
+
+
+def test_salary_export_streams_csv_and_ndjson_in_chunks(client, monkeypatch):
+    import csv
+    import io
+    from app.config import Config
+    from app.models.salary_model import SalaryModel
+    from app.models.user import User
+
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    headers = {"Authorization": f"Bearer {login_res.get_json()['access_token']}"}
+    admin = User().get_by_email("testadmin@example.com")
+    salary_model = SalaryModel()
+    for basic in (1000, 2000, 3000, 4000, 5000):
+        salary_model.add_salary_record(admin['employee_id'], '1999-01', basic, 0, 100, basic - 100)
+    monkeypatch.setattr(Config, 'EXPORT_CHUNK_SIZE', 2)
+
+    try:
+        response = client.get('/salary/export?format=csv&month=1999-01', headers=headers, buffered=False)
+        assert response.status_code == 200 and response.mimetype == 'text/csv'
+        chunks = list(response.response)
+        assert len(chunks) == 3  # 2 + 2 + 1 rows, the header in the first chunk
+        rows = list(csv.DictReader(io.StringIO(b''.join(
+            chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in chunks
+        ).decode())))
+        assert [float(row['net_salary']) for row in rows] == [900, 1900, 2900, 3900, 4900]
+        assert rows[0]['name'] == admin['name']
+
+        response = client.get('/salary/export?format=ndjson&month=1999-01', headers=headers)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [line['basic_salary'] for line in lines] == [1000, 2000, 3000, 4000, 5000]
+
+        # every filter streams in index order: no sort over the whole result
+        statements = []
+        salary_model.conn.set_trace_callback(statements.append)
+        try:
+            for employee_id, month in ((None, None), (admin['employee_id'], None),
+                                       (None, '1999-01'), (admin['employee_id'], '1999-01')):
+                list(salary_model.iter_salary_records(employee_id, month))
+        finally:
+            salary_model.conn.set_trace_callback(None)
+        for sql in statements:
+            sql = sql.strip()
+            plan = [row[3] for row in salary_model.conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+            assert not any('TEMP B-TREE' in step for step in plan), plan
+
+        empty = client.get('/salary/export?month=1899-01', headers=headers)
+        assert empty.get_data(as_text=True).strip() == ','.join(SalaryModel.EXPORT_COLUMNS)
+        assert client.get('/salary/export?format=xml', headers=headers).status_code == 400
+    finally:
+        with salary_model.conn as conn:
+            conn.execute("DELETE FROM payroll_records WHERE salary_month = '1999-01'")
+
+
+def test_salary_pdf_export_renders_inline_or_as_background_job(client, monkeypatch, tmp_path):
+    import time
+    from app.config import Config
+    from app.models.salary_model import SalaryModel
+    from app.models.user import User
+    from app.utils.pdf_report import render_table_report, SALARY_COLUMNS
+
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    headers = {"Authorization": f"Bearer {login_res.get_json()['access_token']}"}
+    admin = User().get_by_email("testadmin@example.com")
+    salary_model = SalaryModel()
+    for basic in (1000, 2000, 3000):
+        salary_model.add_salary_record(admin['employee_id'], '1998-01', basic, 0, 100, basic - 100)
+    monkeypatch.setattr(Config, 'REPORT_JOB_DIR', str(tmp_path))
+
+    try:
+        response = client.get('/salary/export-pdf?month=1998-01', headers=headers)
+        assert response.status_code == 200 and response.mimetype == 'application/pdf'
+        assert response.data.startswith(b'%PDF')
+        assert client.get('/salary/export-pdf?month=1898-01', headers=headers).status_code == 404
+
+        monkeypatch.setattr(Config, 'PDF_ASYNC_THRESHOLD', 2)
+        response = client.get('/salary/export-pdf?month=1998-01', headers=headers)
+        assert response.status_code == 202
+        job = response.get_json()
+        assert (job['rows'], job['params']) == (3, {'employee_id': None, 'month': '1998-01'})
+        assert 'path' not in job and response.headers['Location'] == job['url']
+
+        deadline = time.time() + 30
+        while True:
+            result = client.get(job['url'], headers=headers)
+            if result.status_code != 202 or time.time() > deadline:
+                break
+            time.sleep(0.05)
+        assert result.status_code == 200 and result.data.startswith(b'%PDF')
+        assert client.get('/salary/export-pdf/jobs/nope', headers=headers).status_code == 404
+    finally:
+        with salary_model.conn as conn:
+            conn.execute("DELETE FROM payroll_records WHERE salary_month = '1998-01'")
+
+    # 70 rows = 3 pages of ROWS_PER_PAGE
+    with open(tmp_path / 'report.pdf', 'wb') as output:
+        rows = [(n, 'EMP1', 'Name', '2024-01', 1.0, 0.0, 0.0, 1.0, 1.0, 'NZD', 'Monthly', '') for n in range(70)]
+        assert render_table_report(output, 'Test', SALARY_COLUMNS, [rows[:50], rows[50:]]) == 70
+    assert (tmp_path / 'report.pdf').read_bytes().count(b'/Type /Page\n') == 3
+
+
+def test_payslip_cache_serves_etag_and_evicts_least_recently_used(client, monkeypatch, tmp_path):
+    import io
+    import os
+    from app.config import Config
+    from app.models.salary_model import SalaryModel
+    from app.models.user import User
+    from app.utils import payslip_cache
+    from app.utils.pdf_report import render_payslip
+
+    monkeypatch.setattr(Config, 'PAYSLIP_CACHE_DIR', str(tmp_path / 'payslips'))
+    login_res = client.post('/login', json={
+        "email": "testadmin@example.com",
+        "password": "AdminPassword123"
+    })
+    headers = {"Authorization": f"Bearer {login_res.get_json()['access_token']}"}
+    admin = User().get_by_email("testadmin@example.com")
+    salary_model = SalaryModel()
+    salary_model.add_salary_record(admin['employee_id'], '1997-01', 1000, 0, 100, 900, direct_deposit_amount=900)
+
+    try:
+        first = client.get('/salary/my-records/payslip?month=1997-01', headers=headers)
+        assert first.status_code == 200 and first.data.startswith(b'%PDF')
+        etag = first.headers['ETag']
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+
+        revalidated = client.get('/salary/my-records/payslip?month=1997-01',
+                                 headers=dict(headers, **{'If-None-Match': etag}))
+        assert revalidated.status_code == 304 and revalidated.headers['ETag'] == etag
+
+        # a new version of the record is a new cache entry and ETag
+        with salary_model.conn as conn:
+            conn.execute("UPDATE payroll_records SET bonus = 50, generated_at = '2030-01-01 00:00:00' "
+                         "WHERE employee_id = ? AND salary_month = '1997-01'", (admin['employee_id'],))
+        changed = client.get('/salary/my-records/payslip?month=1997-01',
+                             headers=dict(headers, **{'If-None-Match': etag}))
+        assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    finally:
+        with salary_model.conn as conn:
+            conn.execute("DELETE FROM payroll_records WHERE salary_month = '1997-01'")
+
+    def record(n):
+        return {'id': n, 'generated_at': '2024-01-31', 'name': f'E{n}', 'employee_id': f'EMP{n}',
+                'salary_month': '2024-01', 'pay_frequency': 'Monthly', 'basic_salary': 1000.0,
+                'bonus': 0.0, 'deductions': 0.0, 'direct_deposit_amount': 1000.0, 'currency': 'NZD'}
+
+    # content-addressed: the same record version always renders the same bytes
+    rendered = []
+    for _ in range(2):
+        output = io.BytesIO()
+        render_payslip(output, record(1))
+        rendered.append(output.getvalue())
+    assert rendered[0] == rendered[1]
+
+    assert payslip_cache.prerender([[record(n) for n in range(1, 4)]]) == 3
+    assert payslip_cache.prerender([[record(n) for n in range(1, 4)]]) == 0
+    size = os.path.getsize(payslip_cache.get_cache().get(record(1))[0])
+    small = payslip_cache.PayslipCache(str(tmp_path / 'payslips'), max_bytes=size * 2 + size // 2)
+    small.get(record(1))  # record 1 is now the most recently used
+    small.get(record(4))  # over the limit: evicts records 2 and 3
+    kept = sorted(name for _, _, names in os.walk(tmp_path / 'payslips') for name in names)
+    assert kept == sorted(f'{payslip_cache.payslip_key(record(n))}.pdf' for n in (1, 4))
+    assert small.total_size() <= small.max_bytes
+
+    # evicted between the lookup and the open: rendered again instead of failing
+    from app.service.salary_service import SalaryService
+    lookup = payslip_cache.PayslipCache.get
+    evictions = []
+
+    def get_then_evict(cache, record):
+        path, key = lookup(cache, record)
+        if not evictions:
+            evictions.append(key)
+            os.remove(path)
+        return path, key
+
+    monkeypatch.setattr(payslip_cache.PayslipCache, 'get', get_then_evict)
+    with SalaryService().open_payslip(record(5)) as payslip:
+        assert payslip.read().startswith(b'%PDF')
+    assert evictions == [payslip_cache.payslip_key(record(5))]